@@ -0,0 +1 @@
+"""Benchmarks for the agents python package."""
@@ -0,0 +1,319 @@
+"""
+Load test of one process running many simulated users against a local fake endpoint.
+
+Every user holds multi-turn conversations like examples/tool.py combined with
+examples/session_example_external.py: each turn adds a user message to a `Session`,
+calls `run` with the whole history and a tool, and stores the answer. The fake endpoint
+asks for one tool call per turn and then answers.
+
+Concurrency is ramped up in stages. For each stage the report shows throughput,
+p50/p95/p99 latency of the whole turn, LLM wait, tool execution and orchestrator
+overhead (everything else in `run`), event-loop lag and RSS, and it points out where
+throughput stops scaling:
+
+    python -m benchmarks.loadtest --users 1 4 16 64 256 --duration 10
+"""
+
+import argparse
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+from src.client import ClientConfig, ClientProvider
+from src.fake_responses import (
+    FakeLatency,
+    FakeResponsesTransport,
+    function_call,
+    message,
+)
+from src.orchestrator import run
+from src.session import Session
+from src.tool import ToolManager
+
+PHASES = ["turn", "llm_wait", "tool", "overhead", "loop_lag"]
+
+# Time spent waiting on the LLM and on tools during the current turn of a simulated
+# user. Tool calls run in tasks that copy the context, so they add to the same dict.
+_turn_timings: contextvars.ContextVar[dict[str, float]] = contextvars.ContextVar(
+    "turn_timings"
+)
+
+
+@dataclass
+class StageResult:
+    users: int
+    duration: float = 0.0
+    turns: int = 0
+    errors: int = 0
+    rss_mb: float = 0.0
+    samples: dict[str, list[float]] = field(
+        default_factory=lambda: {p: [] for p in PHASES}
+    )
+
+    @property
+    def throughput(self) -> float:
+        return self.turns / self.duration if self.duration else 0.0
+
+    def percentiles(self, phase: str) -> dict[str, float]:
+        samples = self.samples[phase]
+        if len(samples) < 2:
+            value = samples[0] * 1000 if samples else 0.0
+            return {"p50": value, "p95": value, "p99": value}
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        return {"p50": cuts[49] * 1000, "p95": cuts[94] * 1000, "p99": cuts[98] * 1000}
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "users": self.users,
+            "duration": self.duration,
+            "turns": self.turns,
+            "errors": self.errors,
+            "turns_per_second": self.throughput,
+            "rss_mb": self.rss_mb,
+            "latency_ms": {phase: self.percentiles(phase) for phase in PHASES},
+        }
+
+
+def _timed(
+    phase: str, fn: Callable[..., Awaitable[Any]]
+) -> Callable[..., Awaitable[Any]]:
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            timings = _turn_timings.get(None)
+            if timings is not None:
+                timings[phase] += time.perf_counter() - start
+
+    return wrapper
+
+
+class _TimedClient:
+    """Exposes `responses.create` of a client, timed as LLM wait."""
+
+    def __init__(self, client: Any) -> None:
+        self.responses = SimpleNamespace(
+            create=_timed("llm_wait", client.responses.create)
+        )
+
+
+def _script(body: dict[str, Any]) -> list[Any]:
+    """Ask for a tool call on a user message and answer once the tool output is sent."""
+    items = body.get("input")
+    last = items[-1] if isinstance(items, list) and items else {}
+    if isinstance(last, dict) and last.get("type") == "function_call_output":
+        return [message(f"The weather is {last.get('output')}.")]
+    return [function_call("get_weather", '{"city": "Tokyo"}')]
+
+
+def _make_tool(io_ms: float, cpu_ms: float) -> Callable[[str], str]:
+    def get_weather(city: str) -> str:
+        """Get the weather for a city."""
+        deadline = time.perf_counter() + cpu_ms / 1000
+        while time.perf_counter() < deadline:
+            pass
+        time.sleep(io_ms / 1000)
+        return f"sunny in {city}"
+
+    return get_weather
+
+
+async def _user(
+    stage: StageResult,
+    client: Any,
+    tool_manager: ToolManager,
+    turns_per_conversation: int,
+    stop_at: float,
+) -> None:
+    while time.perf_counter() < stop_at:
+        session = Session("load-test")
+        for turn in range(turns_per_conversation):
+            if time.perf_counter() >= stop_at:
+                return
+            session.add_items([{"role": "user", "content": f"Weather, turn {turn}?"}])
+            timings = {"llm_wait": 0.0, "tool": 0.0}
+            _turn_timings.set(timings)
+            start = time.perf_counter()
+            try:
+                _, final_output = await run(
+                    session.get_items(), tool_manager=tool_manager, client=client
+                )
+            except Exception:  # noqa: BLE001
+                # Any failure of a turn counts as an error of the stage.
+                stage.errors += 1
+                continue
+            elapsed = time.perf_counter() - start
+            stage.turns += 1
+            stage.samples["turn"].append(elapsed)
+            stage.samples["llm_wait"].append(timings["llm_wait"])
+            stage.samples["tool"].append(timings["tool"])
+            stage.samples["overhead"].append(
+                max(0.0, elapsed - timings["llm_wait"] - timings["tool"])
+            )
+            session.add_items([{"role": "assistant", "content": final_output or ""}])
+
+
+async def _monitor_loop_lag(samples: list[float], interval: float = 0.01) -> None:
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, time.perf_counter() - start - interval))
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+async def run_stage(
+    users: int,
+    duration: float,
+    client: Any,
+    tool_manager: ToolManager,
+    turns_per_conversation: int,
+) -> StageResult:
+    """Run `users` concurrent simulated users for `duration` seconds."""
+    stage = StageResult(users)
+    monitor = asyncio.create_task(_monitor_loop_lag(stage.samples["loop_lag"]))
+    start = time.perf_counter()
+    stop_at = start + duration
+    try:
+        await asyncio.gather(
+            *(
+                _user(stage, client, tool_manager, turns_per_conversation, stop_at)
+                for _ in range(users)
+            )
+        )
+    finally:
+        monitor.cancel()
+    stage.duration = time.perf_counter() - start
+    stage.rss_mb = _rss_mb()
+    return stage
+
+
+def find_saturation(
+    stages: list[StageResult], min_gain: float = 0.1
+) -> StageResult | None:
+    """Return the last stage before adding users stopped paying off.
+
+    That is the stage after which throughput grew by less than `min_gain` of the
+    proportional increase in users.
+    """
+    for previous, stage in zip(stages, stages[1:]):
+        expected = stage.users / previous.users
+        gain = (
+            stage.throughput / previous.throughput - 1 if previous.throughput else 0.0
+        )
+        if expected > 1 and gain < min_gain * (expected - 1):
+            return previous
+    return None
+
+
+def print_report(stages: list[StageResult]) -> None:
+    header = f"{'users':>6} {'turns/s':>9} {'errors':>7} {'rss MB':>8}"
+    for phase in PHASES:
+        header += f" {phase + ' p50/p95/p99 ms':>28}"
+    print(header)
+    for stage in stages:
+        line = (
+            f"{stage.users:>6} {stage.throughput:>9.1f} {stage.errors:>7} "
+            f"{stage.rss_mb:>8.1f}"
+        )
+        for phase in PHASES:
+            p = stage.percentiles(phase)
+            line += f" {p['p50']:>8.1f} {p['p95']:>9.1f} {p['p99']:>9.1f}"
+        print(line)
+
+    saturated = find_saturation(stages)
+    if saturated is None:
+        print("\nThroughput kept scaling with the number of users.")
+        return
+    busiest = max(stages, key=lambda stage: stage.throughput)
+    overhead = saturated.percentiles("overhead")["p50"]
+    lag = saturated.percentiles("loop_lag")["p95"]
+    print(
+        f"\nThroughput saturates at about {saturated.users} users "
+        f"({saturated.throughput:.1f} turns/s, peak {busiest.throughput:.1f} turns/s). "
+        f"At that point the median orchestrator overhead per turn is {overhead:.1f} ms "
+        f"and the p95 event-loop lag is {lag:.1f} ms."
+    )
+
+
+async def main(args: argparse.Namespace) -> list[StageResult]:
+    transport = FakeResponsesTransport(
+        _script,
+        latency=FakeLatency(
+            ttft=args.ttft_ms / 1000, inter_token_delay=args.token_ms / 1000
+        ),
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    provider = ClientProvider(
+        ClientConfig(api_key="fake", transport=transport, max_retries=args.max_retries)
+    )
+    client = _TimedClient(provider.get_client())
+    tool_manager = ToolManager(max_workers=args.tool_workers)
+    tool_manager.register_function(_make_tool(args.tool_io_ms, args.tool_cpu_ms))
+    tool_manager.execute_function = _timed(  # type: ignore[method-assign, assignment]
+        "tool", tool_manager.execute_function
+    )
+
+    stages = []
+    try:
+        for users in args.users:
+            print(f"Running {users} users for {args.duration}s", file=sys.stderr)
+            stages.append(
+                await run_stage(users, args.duration, client, tool_manager, args.turns)
+            )
+    finally:
+        tool_manager.shutdown()
+        await provider.aclose()
+    return stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 4, 16, 64, 256])
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="Seconds per stage."
+    )
+    parser.add_argument("--turns", type=int, default=3, help="Turns per conversation.")
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--token-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument(
+        "--tool-io-ms", type=float, default=20.0, help="Blocking I/O per tool."
+    )
+    parser.add_argument(
+        "--tool-cpu-ms", type=float, default=0.0, help="CPU work per tool."
+    )
+    parser.add_argument("--tool-workers", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    logging.getLogger("src").setLevel(logging.WARNING)
+
+    stages = asyncio.run(main(args))
+    print_report(stages)
+    if args.output:
+        args.output.write_text(
+            json.dumps([stage.summary() for stage in stages], indent=2)
+        )
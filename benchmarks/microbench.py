@@ -0,0 +1,446 @@
+"""
+Microbenchmarks of the orchestrator, tool dispatch and session hot paths.
+
+Every benchmark runs a fixed number of operations several times and records the time per
+operation. Results are written as JSON together with the git commit, so two runs can be
+compared to spot regressions:
+
+    python -m benchmarks.microbench --output before.json
+    python -m benchmarks.microbench --output after.json --compare before.json
+
+The OpenAI client is replaced by an in-memory fake, so only local overhead is measured.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable
+
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseInputItemParam,
+    ResponseStreamEvent,
+    ResponseTextDeltaEvent,
+)
+
+from src.compact_session import CompactSession, ItemCodec
+from src.fake_responses import function_call, message, reasoning
+from src.orchestrator import run, run_streamed
+from src.session import Session
+from src.sqlite_session import SQLiteSession
+from src.tool import ExecutionMode, ToolManager
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    params: dict[str, Any]
+    ops: int
+    seconds_per_op: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "min_us": min(self.seconds_per_op) * 1e6,
+            "median_us": statistics.median(self.seconds_per_op) * 1e6,
+            "ops_per_second": 1 / statistics.median(self.seconds_per_op),
+        }
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{params}]" if params else self.name
+
+
+def measure(
+    name: str, fn: Callable[[], Any], ops: int, repeat: int, **params: Any
+) -> BenchmarkResult:
+    """Time `ops` calls of `fn`, `repeat` times."""
+    result = BenchmarkResult(name, params, ops)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(ops):
+            fn()
+        result.seconds_per_op.append((time.perf_counter() - start) / ops)
+    return result
+
+
+async def measure_async(
+    name: str, fn: Callable[[], Awaitable[Any]], ops: int, repeat: int, **params: Any
+) -> BenchmarkResult:
+    """Time `ops` sequential awaits of `fn()`, `repeat` times."""
+    result = BenchmarkResult(name, params, ops)
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(ops):
+            await fn()
+        result.seconds_per_op.append((time.perf_counter() - start) / ops)
+    return result
+
+
+def _response(output: list[Any]) -> Response:
+    return Response(
+        id="resp_benchmark",
+        object="response",
+        created_at=0,
+        model="gpt-5-nano",
+        output=output,
+        parallel_tool_calls=True,
+        tool_choice="auto",
+        tools=[],
+    )
+
+
+class _FakeResponses:
+    """Returns canned responses in a cycle, or streams canned events."""
+
+    def __init__(
+        self, responses: list[Response], events: list[ResponseStreamEvent] | None = None
+    ):
+        self.responses = responses
+        self.events = events or []
+        self.index = 0
+
+    async def create(self, **kwargs: Any) -> Any:
+        if kwargs.get("stream"):
+            return _FakeStream(self.events)
+        response = self.responses[self.index % len(self.responses)]
+        self.index += 1
+        return response
+
+
+class _FakeStream:
+    def __init__(self, events: list[ResponseStreamEvent]) -> None:
+        self.events = events
+
+    async def __aiter__(self) -> Any:
+        for event in self.events:
+            yield event
+
+    async def close(self) -> None:
+        pass
+
+
+def _fake_client(
+    *responses: Response, events: list[ResponseStreamEvent] | None = None
+) -> Any:
+    return SimpleNamespace(responses=_FakeResponses(list(responses), events))
+
+
+def add(a: int, b: int) -> int:
+    """Add two numbers."""
+    return a + b
+
+
+async def bench_run(repeat: int, quick: bool) -> list[BenchmarkResult]:
+    results = []
+    client = _fake_client(_response([message("done")]))
+    results.append(
+        await measure_async(
+            "run", partial(run, "hi", client=client), 2000, repeat, tool_calls=0
+        )
+    )
+
+    tool_manager = ToolManager()
+    tool_manager.register_function(add, execution_mode="inline")
+    client = _fake_client(
+        _response([function_call("add", '{"a": 1, "b": 2}', call_id="call_1")]),
+        _response([message("3")]),
+    )
+    results.append(
+        await measure_async(
+            "run",
+            lambda: run("hi", client=client, tool_manager=tool_manager),
+            1000,
+            repeat,
+            tool_calls=1,
+        )
+    )
+
+    for size in [1_000] if quick else [1_000, 10_000]:
+        output = [reasoning("step") for _ in range(size)] + [message("done")]
+        client = _fake_client(_response(output))
+        results.append(
+            await measure_async(
+                "run_output_dispatch",
+                partial(run, "hi", client=client),
+                max(1, 100_000 // size),
+                repeat,
+                output_items=size,
+            )
+        )
+    return results
+
+
+async def bench_tools(repeat: int, quick: bool) -> list[BenchmarkResult]:
+    results = [
+        measure(
+            "register_function",
+            lambda: ToolManager().register_function(add),
+            500,
+            repeat,
+        )
+    ]
+    modes: list[ExecutionMode] = ["inline", "thread"]
+    for mode in modes:
+        tool_manager = ToolManager()
+        tool_manager.register_function(add, execution_mode=mode)
+        results.append(
+            await measure_async(
+                "execute_function",
+                partial(tool_manager.execute_function, "add", '{"a": 1, "b": 2}'),
+                2000,
+                repeat,
+                execution_mode=mode,
+            )
+        )
+        tool_manager.shutdown()
+    return results
+
+
+def bench_session(repeat: int, quick: bool) -> list[BenchmarkResult]:
+    results = []
+    item: ResponseInputItemParam = {"role": "user", "content": "hello"}
+    for size in [10_000, 100_000] if quick else [10_000, 100_000, 1_000_000]:
+        session = Session("benchmark")
+        session.add_items([item] * size)
+        results.append(
+            measure(
+                "session_add_items",
+                partial(session.add_items, [item]),
+                10_000,
+                repeat,
+                items=size,
+            )
+        )
+        results.append(
+            measure(
+                "session_get_items",
+                partial(session.get_items, limit=20),
+                10_000,
+                repeat,
+                items=size,
+                limit=20,
+            )
+        )
+        results.append(
+            measure(
+                "session_get_items",
+                partial(session.get_items, max_tokens=2_000),
+                10_000,
+                repeat,
+                items=size,
+                max_tokens=2_000,
+            )
+        )
+        results.append(
+            measure(
+                "session_get_items",
+                session.get_items,
+                max(1, 1_000_000 // size),
+                repeat,
+                items=size,
+                limit=None,
+            )
+        )
+
+    for codec in [ItemCodec(), ItemCodec(compression="zlib")]:
+        compact_session = CompactSession("benchmark", codec)
+        compact_session.add_items([item] * 10_000)
+        compression = codec.compression or "none"
+        results.append(
+            measure(
+                "compact_session_add_items",
+                partial(compact_session.add_items, [item]),
+                10_000,
+                repeat,
+                compression=compression,
+            )
+        )
+        results.append(
+            measure(
+                "compact_session_get_items",
+                partial(compact_session.get_items, limit=20),
+                10_000,
+                repeat,
+                compression=compression,
+                limit=20,
+            )
+        )
+        results.append(
+            measure(
+                "compact_session_encoded_input",
+                compact_session.encoded_input,
+                100,
+                repeat,
+                compression=compression,
+            )
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [10_000, 100_000]:
+            sqlite_session = SQLiteSession(
+                f"benchmark-{size}", Path(tmp) / "sessions.sqlite3"
+            )
+            sqlite_session.add_items([item] * size)
+            results.append(
+                measure(
+                    "sqlite_session_add_items",
+                    partial(sqlite_session.add_items, [item, item]),
+                    1_000,
+                    repeat,
+                    items=size,
+                    batch=2,
+                )
+            )
+            results.append(
+                measure(
+                    "sqlite_session_get_items",
+                    partial(sqlite_session.get_items, limit=20),
+                    1_000,
+                    repeat,
+                    items=size,
+                    limit=20,
+                )
+            )
+            results.append(
+                measure(
+                    "sqlite_session_pop_item",
+                    sqlite_session.pop_item,
+                    1_000,
+                    repeat,
+                    items=size,
+                )
+            )
+            sqlite_session.close()
+    return results
+
+
+async def bench_streaming(repeat: int, quick: bool) -> list[BenchmarkResult]:
+    deltas = 10_000 if quick else 100_000
+    events: list[ResponseStreamEvent] = [
+        ResponseTextDeltaEvent(
+            type="response.output_text.delta",
+            item_id="msg_1",
+            output_index=0,
+            content_index=0,
+            delta="tok ",
+            logprobs=[],
+            sequence_number=i,
+        )
+        for i in range(deltas)
+    ]
+    events.append(
+        ResponseCompletedEvent(
+            type="response.completed",
+            sequence_number=deltas,
+            response=_response([message("tok " * deltas)]),
+        )
+    )
+    client = _fake_client(events=events)
+
+    async def consume() -> None:
+        async for _ in run_streamed("hi", client=client).stream_events():
+            pass
+
+    result = await measure_async(
+        "stream_events", consume, 1, repeat, text_deltas=deltas
+    )
+    result.ops = deltas
+    result.seconds_per_op = [seconds / deltas for seconds in result.seconds_per_op]
+    return [result]
+
+
+async def run_benchmarks(
+    repeat: int, quick: bool, selected: set[str]
+) -> list[BenchmarkResult]:
+    suites: dict[str, Callable[[int, bool], Any]] = {
+        "run": bench_run,
+        "tools": bench_tools,
+        "session": bench_session,
+        "streaming": bench_streaming,
+    }
+    results: list[BenchmarkResult] = []
+    for name, suite in suites.items():
+        if selected and name not in selected:
+            continue
+        print(f"Running {name} benchmarks", file=sys.stderr)
+        outcome = suite(repeat, quick)
+        results.extend(await outcome if asyncio.iscoroutine(outcome) else outcome)
+    return results
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _print_report(
+    results: list[dict[str, Any]], baseline: dict[str, Any] | None
+) -> None:
+    previous = (
+        {entry["key"]: entry for entry in baseline["results"]} if baseline else {}
+    )
+    for entry in results:
+        line = f"{entry['key']:<60} {entry['median_us']:>12.2f} us/op"
+        if entry["key"] in previous:
+            change = entry["median_us"] / previous[entry["key"]]["median_us"] - 1
+            line += f" {change:>+8.1%}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", type=Path, default=Path("benchmarks/results.json"))
+    parser.add_argument(
+        "--compare", type=Path, help="Previous results to compare against."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="Skip the largest sizes.")
+    parser.add_argument(
+        "--only", nargs="*", default=[], help="Suites: run tools session streaming"
+    )
+    parser.add_argument(
+        "--log", action="store_true", help="Keep the orchestrator's INFO logs."
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s: %(message)s")
+    if not args.log:
+        logging.getLogger("src").setLevel(logging.WARNING)
+
+    results = asyncio.run(run_benchmarks(args.repeat, args.quick, set(args.only)))
+    report = {
+        "commit": _git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [{"key": result.key, **result.summary()} for result in results],
+    }
+    baseline = json.loads(args.compare.read_text()) if args.compare else None
+    _print_report(report["results"], baseline)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2))
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Cold-start import time of the package, measured with `python -X importtime`.
+
+Each target is imported in a fresh interpreter several times and the median is reported:
+the total import time, the time spent in the package's own modules and whether openai
+got loaded.
+
+Budgets are percentages of the import time of a baseline module, `openai` by default,
+measured the same way, so they hold on fast and slow machines alike. Violations are
+reported; with `--check` the command also exits with status 1, so it can guard CLI and
+serverless startup in CI. `--budget-scale` (or `STARTUP_BUDGET_SCALE`) loosens or
+tightens every budget:
+
+    python -m benchmarks.startup
+    python -m benchmarks.startup --repeat 11 --output startup.json
+    python -m benchmarks.startup --check --budget-scale 1.5
+
+Importing openai takes several hundred milliseconds on its own and `src.orchestrator`
+needs it, so for the orchestrator only the package's own share is budgeted.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+
+BASELINE = "openai"
+
+
+@dataclass
+class Budget:
+    """Limits for importing one module, in percent of the baseline import time.
+
+    None means not checked.
+    """
+
+    total_pct: float | None = None
+    own_pct: float | None = None
+    allow_openai: bool = True
+
+
+BUDGETS = {
+    # The public API; names are resolved on first access.
+    "src": Budget(total_pct=3, own_pct=1, allow_openai=False),
+    "src.session": Budget(total_pct=3, own_pct=1, allow_openai=False),
+    "src.client": Budget(total_pct=12, own_pct=1, allow_openai=False),
+    "src.log": Budget(total_pct=6, own_pct=1, allow_openai=False),
+    "src.tracing": Budget(total_pct=6, own_pct=1, allow_openai=False),
+    "src.tool": Budget(own_pct=5, allow_openai=False),
+    "src.orchestrator": Budget(own_pct=8),
+}
+
+
+@dataclass
+class StartupResult:
+    module: str
+    total_ms: float
+    own_ms: float
+    openai_loaded: bool
+    violations: list[str]
+
+
+def import_times(module: str) -> dict[str, tuple[float, float]]:
+    """Import `module` in a new interpreter.
+
+    Returns:
+        The self and cumulative import time in ms of every module that got loaded.
+    """
+    env = {
+        **os.environ,
+        "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "benchmark"),
+    }
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return times
+
+
+def measure(module: str, repeat: int) -> StartupResult:
+    totals, owns, openai_loaded = [], [], False
+    for _ in range(repeat):
+        times = import_times(module)
+        totals.append(times[module][1])
+        owns.append(
+            sum(t for name, (t, _) in times.items() if name.split(".")[0] == "src")
+        )
+        openai_loaded = openai_loaded or "openai" in times
+    return StartupResult(
+        module=module,
+        total_ms=statistics.median(totals),
+        own_ms=statistics.median(owns),
+        openai_loaded=openai_loaded,
+        violations=[],
+    )
+
+
+def check(
+    result: StartupResult, budget: Budget, baseline: StartupResult, scale: float
+) -> None:
+    """Record the budget violations of `result` on it."""
+    limits = {"total": budget.total_pct, "own": budget.own_pct}
+    measured = {"total": result.total_ms, "own": result.own_ms}
+    for kind, pct in limits.items():
+        if pct is None:
+            continue
+        limit_ms = baseline.total_ms * pct * scale / 100
+        if measured[kind] > limit_ms:
+            result.violations.append(
+                f"{kind} {measured[kind]:.1f} ms > {limit_ms:.1f} ms "
+                f"({pct * scale:g}% of {baseline.module})"
+            )
+    if not budget.allow_openai and result.openai_loaded:
+        result.violations.append("loads openai")
+
+
+def _print_report(baseline: StartupResult, results: list[StartupResult]) -> None:
+    print(f"{'module':<20} {'total ms':>10} {'own ms':>8} {'openai':>7}  budget")
+    print(f"{baseline.module:<20} {baseline.total_ms:>10.1f} {'':>8} {'':>7}  baseline")
+    for result in results:
+        status = "; ".join(result.violations) or "ok"
+        openai = "yes" if result.openai_loaded else "no"
+        print(
+            f"{result.module:<20} {result.total_ms:>10.1f} {result.own_ms:>8.1f} "
+            f"{openai:>7}  {status}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--only", nargs="*", default=[], help="Modules to measure.")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON.")
+    parser.add_argument(
+        "--baseline",
+        default=BASELINE,
+        help="Module whose import time the budgets are relative to.",
+    )
+    parser.add_argument(
+        "--budget-scale",
+        type=float,
+        default=float(os.environ.get("STARTUP_BUDGET_SCALE", 1)),
+        help="Factor applied to every budget.",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit with status 1 when a budget is exceeded.",
+    )
+    args = parser.parse_args()
+
+    baseline = measure(args.baseline, args.repeat)
+    results = []
+    for module in args.only or list(BUDGETS):
+        result = measure(module, args.repeat)
+        check(result, BUDGETS.get(module, Budget()), baseline, args.budget_scale)
+        results.append(result)
+    _print_report(baseline, results)
+    if args.output:
+        output = {
+            "baseline": asdict(baseline),
+            "results": [asdict(result) for result in results],
+        }
+        args.output.write_text(json.dumps(output, indent=2))
+    if args.check and any(result.violations for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
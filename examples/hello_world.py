@@ -1,11 +1,9 @@
 import asyncio
 import logging as logger
-import os
-from openai import AsyncOpenAI
 from openai.types import Reasoning
 from openai.types.responses import ResponseOutputMessage
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from src.client import get_client
 
 
 async def main():
@@ -20,7 +18,7 @@ async def main():
             logger.info("Max iterations reached. Exiting.")
             break
 
-        response = await async_client.responses.create(
+        response = await get_client().responses.create(
             model="gpt-5-nano",
             input=input_text,
             temperature=1.0,
@@ -30,18 +28,18 @@ async def main():
             instructions="You are a helpful assistant.",
         )
 
-        logger.info(f"Response: {response}")
+        logger.info("Response: %s", response)
         breakpoint()
 
         # if output is of type string. then we have reached final response.
         for output in response.output:
-            logger.info(f"Output: {output}")
+            logger.info("Output: %s", output)
             if isinstance(output, ResponseOutputMessage):
                 if output.content[0].type == "output_text":
-                    logger.info(f"Final response: {output.content[0].text}")
+                    logger.info("Final response: %s", output.content[0].text)
                     agent_should_stop = True
                 else:
-                    logger.warning(f"Unsupported output type: {output.content[0]}")
+                    logger.warning("Unsupported output type: %s", output.content[0])
 
             else:
                 current_iteration += 1
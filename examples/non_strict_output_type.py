@@ -20,9 +20,10 @@ from openai.types.responses import (
     ResponseFormatTextJSONSchemaConfigParam,
 )
 from pydantic import BaseModel
+from src.log import configure_logging
 from src.orchestrator import run
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -44,7 +45,7 @@ async def main() -> None:
 
     # let's convert the pydantic model to a json schema
     json_schema = Joke.model_json_schema()
-    logger.info(f"JSON schema: {json_schema}")
+    logger.info("JSON schema: %s", json_schema)
 
     output_type = ResponseTextConfigParam(
         format=ResponseFormatTextJSONSchemaConfigParam(
@@ -56,8 +57,8 @@ async def main() -> None:
     )
 
     response, final_output = await run(prepared_input, output_type=output_type)
-    logger.info(f"Response: {response}")
-    logger.info(f"Final output: {final_output}")
+    logger.info("Response: %s", response)
+    logger.info("Final output: %s", final_output)
 
     # convert the output to a Joke class using pydantic
     # first conver str to dictionary
@@ -67,7 +68,7 @@ async def main() -> None:
     dict_output = json.loads(final_output)
 
     joke = Joke.model_validate(dict_output)
-    logger.info(f"Joke: {joke}")
+    logger.info("Joke: %s", joke)
 
     breakpoint()
 
@@ -14,9 +14,10 @@ from openai.types.responses.response_input_param import ResponseInputParam
 from openai.types.responses.response_input_text_param import ResponseInputTextParam
 from openai.types.responses.response_input_param import Message
 
+from src.log import configure_logging
 from src.orchestrator import run
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -35,7 +36,7 @@ async def main() -> None:
     ]
 
     response, _ = await run(prepared_input)
-    logger.info(f"First response: {response}")
+    logger.info("First response: %s", response)
 
     previous_response_id = response.id
     prepared_input = [
@@ -49,7 +50,7 @@ async def main() -> None:
         )
     ]
     response, _ = await run(prepared_input, previous_response_id)
-    logger.info(f"Second response: {response}")
+    logger.info("Second response: %s", response)
 
 
 if __name__ == "__main__":
@@ -11,10 +11,8 @@ Write a poem in {{poem_style}}
 ```
 """
 
-import os
 import logging
 import asyncio
-from openai import AsyncOpenAI
 from openai.types.responses.response_input_param import ResponseInputParam
 from openai.types.responses.response_input_text_param import ResponseInputTextParam
 from openai.types.responses.response_input_param import Message
@@ -26,11 +24,13 @@ from openai.types.responses import (
 )
 from openai.types import Reasoning
 
+from src.client import get_client
+from src.log import configure_logging
+
 PROMPT_ID = "pmpt_68a698cbc4e08196860107b4f2d318a10ed4ffeb0cc3bad6"
 
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -56,7 +56,7 @@ async def main() -> None:
             logger.info("Max iterations reached. Exiting.")
             break
 
-        response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+        response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
             model="gpt-5-nano",
             input=prepared_input,
             reasoning=Reasoning(summary="auto"),
@@ -69,23 +69,23 @@ async def main() -> None:
             ),
         )
 
-        logger.info(f"Response: {response}")
+        logger.info("Response: %s", response)
 
         for output in response.output:
             if isinstance(output, ResponseReasoningItem):
                 if output.summary:
                     for summary_item in output.summary:
-                        logger.info(f"Reasoning summary: {summary_item.text}")
+                        logger.info("Reasoning summary: %s", summary_item.text)
                 else:
                     logger.info("Reasoning summary: None")
             elif isinstance(output, ResponseOutputMessage):
                 if isinstance(output.content[0], ResponseOutputText):
-                    logger.info(f"Final response: {output.content[0].text}")
+                    logger.info("Final response: %s", output.content[0].text)
                     agent_should_stop = True
                 else:
-                    logger.warning(f"Unsupported output type: {output.content[0]}")
+                    logger.warning("Unsupported output type: %s", output.content[0])
             else:
-                logger.warning(f"Unsupported output type: {output}")
+                logger.warning("Unsupported output type: %s", output)
 
         breakpoint()
         if agent_should_stop:
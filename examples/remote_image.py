@@ -3,9 +3,7 @@ This example shows how to use the OpenAI SDK to provide remote image and use it
 """
 
 import asyncio
-import os
 import logging
-from openai import AsyncOpenAI
 from openai.types import Reasoning
 from openai.types.responses.response_input_param import ResponseInputParam, Message
 from openai.types.responses.response_input_image_param import ResponseInputImageParam
@@ -16,10 +14,11 @@ from openai.types.responses import (
     ResponseReasoningItem,
 )
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
-logger = logging.getLogger(__name__)
+from src.client import get_client
+from src.log import configure_logging
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+configure_logging(logging.INFO)
+logger = logging.getLogger(__name__)
 
 
 async def main() -> None:
@@ -61,30 +60,30 @@ async def main() -> None:
             logger.info("Max iterations reached. Exiting.")
             break
 
-        response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+        response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
             model="gpt-5-nano",
             input=prepared_input,
             reasoning=Reasoning(summary="auto"),
             instructions="You are a helpful assistant.",
         )
 
-        logger.info(f"Response: {response}")
+        logger.info("Response: %s", response)
 
         for output in response.output:
             if isinstance(output, ResponseReasoningItem):
                 if output.summary:
                     for summary_item in output.summary:
-                        logger.info(f"Reasoning summary: {summary_item.text}")
+                        logger.info("Reasoning summary: %s", summary_item.text)
                 else:
                     logger.info("Reasoning summary: None")
             elif isinstance(output, ResponseOutputMessage):
                 if isinstance(output.content[0], ResponseOutputText):
-                    logger.info(f"Final response: {output.content[0].text}")
+                    logger.info("Final response: %s", output.content[0].text)
                     agent_should_stop = True
                 else:
-                    logger.warning(f"Unsupported output type: {output.content[0]}")
+                    logger.warning("Unsupported output type: %s", output.content[0])
             else:
-                logger.warning(f"Unsupported output type: {output}")
+                logger.warning("Unsupported output type: %s", output)
 
         breakpoint()
         if agent_should_stop:
@@ -0,0 +1,64 @@
+"""
+This example shows how to stream a multi-step tool run with `run_streamed`.
+
+Instead of matching raw response stream events, the orchestrator yields normalized
+events for reasoning, text, tool calls and tool results across every iteration of the
+tool loop.
+"""
+
+import asyncio
+import logging
+from openai.types.responses import EasyInputMessageParam
+from openai.types.responses.response_input_param import ResponseInputParam
+
+from src.log import configure_logging
+from src.orchestrator import run_streamed
+from src.tool import ToolManager
+
+configure_logging(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+tool_manager = ToolManager()
+
+
+def get_weather(city: str) -> str:
+    """Get the current weather information for a specified city."""
+    return f"The weather in {city} is sunny with wind, 14-20C."
+
+
+tool_manager.register_function(get_weather)
+
+
+async def main() -> None:
+    """Stream a run that calls a tool before answering."""
+
+    prepared_input: ResponseInputParam = [
+        EasyInputMessageParam(
+            content="What is the weather in Kathmandu and Pokhara?",
+            role="user",
+            type="message",
+        )
+    ]
+
+    streamed = run_streamed(prepared_input, tool_manager=tool_manager)
+    async for event in streamed.stream_events():
+        if event.type == "reasoning_delta":
+            print(event.delta, end="", flush=True)
+        elif event.type == "text_delta":
+            print(event.delta, end="", flush=True)
+        elif event.type == "tool_call_started":
+            print(f"\n📞 {event.name}(", end="", flush=True)
+        elif event.type == "tool_call_arguments_delta":
+            print(event.delta, end="", flush=True)
+        elif event.type == "tool_call_completed":
+            print(")")
+        elif event.type == "tool_result":
+            print(f"🔧 {event.name} -> {event.output}")
+        elif event.type == "iteration_completed":
+            print(f"\n--- iteration {event.iteration} done ---")
+
+    print(f"\nFinal output: {streamed.final_output}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,62 @@
+"""
+Session example where older turns are folded into a summary in the background.
+
+Once the history is over `trigger_tokens`, `maybe_compact()` starts summarizing the
+oldest turns while the conversation goes on. When the summary is ready it replaces those
+turns, and the next `run()` sends the shorter history.
+"""
+
+import asyncio
+import logging
+from openai.types.responses import EasyInputMessageParam
+
+from src.compaction import LLMSummarizer, SessionCompactor
+from src.log import configure_logging
+from src.orchestrator import run
+from src.session import Session
+
+configure_logging(logging.INFO)
+logger = logging.getLogger(__name__)
+
+QUESTIONS = [
+    "What city is the Golden Gate Bridge in?",
+    "When was it built?",
+    "Who designed it?",
+    "How long is its main span?",
+    "What color is it, and why?",
+    "What other bridges in the area are worth seeing?",
+]
+
+
+async def main() -> None:
+    session = Session("conversation_1")
+    compactor = SessionCompactor(
+        session,
+        LLMSummarizer(model="gpt-5-nano"),
+        trigger_tokens=1500,
+        keep_recent_tokens=500,
+    )
+
+    for question in QUESTIONS:
+        logger.info("User: %s", question)
+        session.add_items(
+            [EasyInputMessageParam(content=question, role="user", type="message")]
+        )
+        _, final_output = await run(session.get_items())
+        logger.info("Assistant: %s", final_output)
+        session.add_items(
+            [
+                EasyInputMessageParam(
+                    content=final_output or "", role="assistant", type="message"
+                )
+            ]
+        )
+        compactor.maybe_compact()
+
+    await compactor.wait()
+    logger.info("Compaction stats: %s", compactor.stats)
+    logger.info("History now starts with: %s", session.get_items(limit=1))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,15 +6,14 @@ orchestrator.
 """
 
 import asyncio
-import os
 import logging
 from openai.types.responses import EasyInputMessageParam
+from src.client import get_client
+from src.log import configure_logging
 from src.session import Session
-from openai import AsyncOpenAI
 from openai.types import Reasoning
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -31,7 +30,7 @@ async def main() -> None:
     logger.info("First Turn")
     logger.info("User: %s", input_text)
 
-    response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+    response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
         model="gpt-5-nano",
         input=session.get_items(),
         reasoning=Reasoning(summary="auto"),
@@ -52,7 +51,7 @@ async def main() -> None:
         [EasyInputMessageParam(content=input_text, role="user", type="message")]
     )
 
-    response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+    response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
         model="gpt-5-nano",
         input=session.get_items(),
     )
@@ -72,7 +71,7 @@ async def main() -> None:
         [EasyInputMessageParam(content=input_text, role="user", type="message")]
     )
 
-    response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+    response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
         model="gpt-5-nano",
         input=session.get_items(),
     )
@@ -3,7 +3,6 @@ import os
 import json
 
 from typing import Any, Callable
-from openai import AsyncOpenAI
 from openai.types.responses.response_input_param import ResponseInputParam
 from openai.types.responses import (
     EasyInputMessageParam,
@@ -20,6 +19,9 @@ from openai.types.responses import (
 )
 from openai.types import Reasoning
 
+from src.client import get_client
+from src.log import configure_logging
+from src.streaming import StreamingArguments
 from src.tool import ToolManager
 from openai.types.responses import (
     FunctionTool,
@@ -29,9 +31,8 @@ from openai.types.responses.response_input_item_param import FunctionCallOutput
 import logging
 
 
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 tool_manager = ToolManager()
 
 
@@ -111,7 +112,7 @@ async def main() -> None:
             )
             break
 
-        response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+        response = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
             model="gpt-5-nano",
             input=prepared_input,
             instructions="You are a helpful coding assistant. Use the provided tools to create files and configurations",
@@ -134,14 +135,22 @@ async def main() -> None:
                     function_name = chunk.item.name
                     call_id = chunk.item.call_id
 
-                    function_calls[call_id] = {"name": function_name, "arguments": ""}
+                    function_calls[call_id] = {
+                        "name": function_name,
+                        "arguments": StreamingArguments(),
+                    }
                     current_active_call_id = call_id
                     print(f"\n📞 Function call streaming started: {function_name}()")
                     print("📝 Arguments building...")
             elif isinstance(chunk, ResponseFunctionCallArgumentsDeltaEvent):
                 if current_active_call_id and current_active_call_id in function_calls:
-                    function_calls[current_active_call_id]["arguments"] += chunk.delta
+                    arguments = function_calls[current_active_call_id]["arguments"]
+                    completed_fields = arguments.append(chunk.delta)
                     print(chunk.delta, end="", flush=True)
+                    # Fields can be used before the rest of the arguments finish
+                    # streaming.
+                    if "file_path" in completed_fields:
+                        print(f"\n📁 Target file: {arguments.partial['file_path']}")
             elif isinstance(chunk, ResponseOutputItemDoneEvent):
                 if isinstance(chunk.item, ResponseFunctionToolCall):
                     call_id = chunk.item.call_id
@@ -151,8 +160,8 @@ async def main() -> None:
                             f"\n✅ Function call streaming completed: {function_info['name']}\n\n"
                         )
                         # Execute the function
-                        tool_response = tool_manager.execute_function(
-                            function_info["name"], function_info["arguments"]
+                        tool_response = await tool_manager.execute_function(
+                            function_info["name"], function_info["arguments"].text
                         )
                         print(f"🔧 Tool response: {tool_response}\n")
 
@@ -161,7 +170,7 @@ async def main() -> None:
                             ResponseFunctionToolCallParam(
                                 call_id=call_id,
                                 name=function_info["name"],
-                                arguments=function_info["arguments"],
+                                arguments=function_info["arguments"].text,
                                 type="function_call",
                             )
                         )
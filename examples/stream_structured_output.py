@@ -0,0 +1,56 @@
+"""
+This example streams a structured output and shows the partially filled model as it
+arrives.
+
+Compared to non_strict_output_type.py, the output isn't parsed once at the end: every
+field is validated as soon as it closes, and the request is aborted early if the output
+can't match the model.
+"""
+
+import asyncio
+import logging
+from openai.types.responses.response_input_param import Message, ResponseInputParam
+from openai.types.responses.response_input_text_param import ResponseInputTextParam
+from pydantic import BaseModel
+
+from src.log import configure_logging
+from src.orchestrator import run_streamed
+from src.structured_output import StructuredOutputError
+
+configure_logging(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+
+class Joke(BaseModel):
+    topic: str
+    jokes: list[str]
+
+
+async def main() -> None:
+    """Example of streaming a structured output into partial pydantic objects."""
+
+    prepared_input: ResponseInputParam = [
+        Message(
+            role="user",
+            content=[
+                ResponseInputTextParam(type="input_text", text="Tell me 3 short jokes")
+            ],
+        )
+    ]
+
+    streamed = run_streamed(prepared_input, output_model=Joke)
+    try:
+        async for event in streamed.stream_events():
+            if event.type == "partial_output":
+                print(f"\r{event.output!r}", end="", flush=True)
+                for field in event.completed_fields:
+                    print(f"\n✅ {field} is complete and valid")
+    except StructuredOutputError as e:
+        logger.error("Output aborted at field %s: %s", e.field, e)
+        return
+
+    logger.warning("Final output: %r", streamed.final_output_model)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,7 +1,6 @@
 import asyncio
-import os
 import logging
-from openai import AsyncOpenAI, AsyncStream
+from openai import AsyncStream
 from openai.types import Reasoning
 from openai.types.responses import (
     EasyInputMessageParam,
@@ -15,8 +14,10 @@ from openai.types.responses import (
 )
 from openai.types.responses.response_input_param import ResponseInputParam
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+from src.client import get_client
+from src.log import configure_logging
+
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -39,7 +40,7 @@ async def main() -> None:
 
         response: AsyncStream[
             ResponseStreamEvent
-        ] = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
+        ] = await get_client().responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
             model="gpt-5-nano",
             input=prepared_input,
             instructions="You are a helpful assistant which just tells jokes. No questions asked.",
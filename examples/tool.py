@@ -1,28 +1,20 @@
 import asyncio
-import os
 from typing import Callable
 import logging
 
 # Configure logging
-from openai import AsyncOpenAI
-from openai.types import Reasoning
 from openai.types.responses import (
     FunctionTool,
-    ResponseOutputMessage,
-    ResponseOutputText,
-    ResponseFunctionToolCall,
-    ResponseFunctionToolCallParam,
-    ResponseReasoningItem,
     EasyInputMessage,
 )
 
-from openai.types.responses.response_input_item_param import FunctionCallOutput
 from pydantic import BaseModel
 
+from src.log import configure_logging
+from src.orchestrator import run
 from src.tool import ToolManager
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Global tool manager instance
@@ -64,67 +56,11 @@ async def main():
     # test decorator
     print(get_weather)
 
-    max_iterations = 10
-    current_iteration = 0
-    agent_should_stop = False
-    while True:
-        if current_iteration >= max_iterations:
-            logger.info("Max iterations reached. Exiting.")
-            break
-
-        response = await async_client.responses.create(
-            model="gpt-5-nano",
-            input=prepared_input,
-            tools=tool_manager.tools,
-            instructions="You are a helpful assistant.",
-            reasoning=Reasoning(
-                summary="auto",
-            ),
-        )
-
-        logger.info(f"Response: {response}")
-        breakpoint()
-
-        for output in response.output:
-            if isinstance(output, ResponseReasoningItem):
-                if output.summary:
-                    for summary_item in output.summary:
-                        logger.info(f"Reasoning summary: {summary_item.text}")
-                else:
-                    logger.info("Reasoning summary: None")
-            if isinstance(output, ResponseOutputMessage):
-                if isinstance(output.content[0], ResponseOutputText):
-                    logger.info(f"Final response: {output.content[0].text}")
-                    agent_should_stop = True
-                else:
-                    logger.warning(f"Unsupported output type: {output.content[0]}")
-            elif isinstance(output, ResponseFunctionToolCall):
-                # tool call should be first in prepared input
-                logger.info(f"Tool call: {output}")
-                prepared_input.append(
-                    ResponseFunctionToolCallParam(
-                        call_id=output.call_id,
-                        name=output.name,
-                        arguments=output.arguments,
-                        type="function_call",
-                    ),
-                )
-                # execute the tool call using tool manager
-                tool_response = tool_manager.execute_function(
-                    output.name, output.arguments
-                )
-                logger.info(f"Tool response: {tool_response}")
-                prepared_input.append(
-                    FunctionCallOutput(
-                        call_id=output.call_id,
-                        output=tool_response,
-                        type="function_call_output",
-                    ),
-                )
-                current_iteration += 1
-
-        if agent_should_stop:
-            break
+    # run() sends the tools with every request and executes the function calls of each
+    # response concurrently, sending their outputs back until the model answers.
+    response, final_output = await run(prepared_input, tool_manager=tool_manager)
+    logger.info("Response: %s", response)
+    logger.info("Final output: %s", final_output)
 
     breakpoint()
 
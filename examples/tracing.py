@@ -0,0 +1,57 @@
+"""
+This example traces a tool run and prints where the time went.
+
+Every run, iteration, `responses.create` call and tool call becomes a span. Spans are
+kept in memory for the summary below and also written to traces.jsonl; use
+`OTLPJSONExporter` instead to feed an OpenTelemetry collector.
+"""
+
+import asyncio
+import logging
+from openai.types.responses import EasyInputMessageParam
+from openai.types.responses.response_input_param import ResponseInputParam
+
+from src import tracing
+from src.log import configure_logging
+from src.orchestrator import run
+from src.tool import ToolManager
+
+configure_logging(logging.WARNING)
+logger = logging.getLogger(__name__)
+
+tool_manager = ToolManager()
+
+
+def get_weather(city: str) -> str:
+    """Get the current weather information for a specified city."""
+    return f"The weather in {city} is sunny with wind, 14-20C."
+
+
+tool_manager.register_function(get_weather)
+
+
+async def main() -> None:
+    """Trace a run that calls a tool before answering."""
+
+    spans = tracing.InMemoryExporter()
+    tracer = tracing.Tracer([spans, tracing.JSONLExporter("traces.jsonl")])
+    tracing.set_tracer(tracer)
+
+    prepared_input: ResponseInputParam = [
+        EasyInputMessageParam(
+            content="What is the weather in Kathmandu?", role="user", type="message"
+        )
+    ]
+    _, final_output = await run(prepared_input, tool_manager=tool_manager)
+    tracer.shutdown()
+
+    print(f"Final output: {final_output}\n")
+    depth = {}
+    for span in sorted(spans.spans, key=lambda span: span.start_time):
+        depth[span.span_id] = depth.get(span.parent_id, -1) + 1
+        indent = "  " * depth[span.span_id]
+        print(f"{indent}{span.name}: {span.duration * 1000:.1f} ms {span.attributes}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
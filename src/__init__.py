@@ -1 +1,81 @@
-"""Agents python package."""
\ No newline at end of file
+"""Agents python package."""
+
+import importlib
+import logging
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from src.client import ClientConfig, ClientProvider, get_client
+    from src.compact_session import CompactSession
+    from src.compaction import SessionCompactor
+    from src.log import configure_logging
+    from src.orchestrator import BatchResult, build_request, run, run_many, run_streamed
+    from src.rate_limit import RateLimiter
+    from src.response_cache import ResponseCache
+    from src.session import Session
+    from src.session_manager import SessionManager
+    from src.sqlite_session import SQLiteSession
+    from src.streaming import StreamedRun
+    from src.tool import ToolManager
+
+# Public names and the modules defining them. Modules are imported on first access, so
+# `import src` stays cheap and doesn't load openai.
+_LAZY_ATTRIBUTES = {
+    "BatchResult": "src.orchestrator",
+    "build_request": "src.orchestrator",
+    "run": "src.orchestrator",
+    "run_many": "src.orchestrator",
+    "run_streamed": "src.orchestrator",
+    "ToolManager": "src.tool",
+    "Session": "src.session",
+    "CompactSession": "src.compact_session",
+    "SessionCompactor": "src.compaction",
+    "SessionManager": "src.session_manager",
+    "SQLiteSession": "src.sqlite_session",
+    "ClientConfig": "src.client",
+    "ClientProvider": "src.client",
+    "get_client": "src.client",
+    "RateLimiter": "src.rate_limit",
+    "ResponseCache": "src.response_cache",
+    "StreamedRun": "src.streaming",
+    "configure_logging": "src.log",
+}
+
+__all__ = [
+    "BatchResult",
+    "build_request",
+    "run",
+    "run_many",
+    "run_streamed",
+    "ToolManager",
+    "Session",
+    "CompactSession",
+    "SessionCompactor",
+    "SessionManager",
+    "SQLiteSession",
+    "ClientConfig",
+    "ClientProvider",
+    "get_client",
+    "RateLimiter",
+    "ResponseCache",
+    "StreamedRun",
+    "configure_logging",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
+
+
+# Records are dropped unless the application configures logging, e.g. with
+# `src.log.configure_logging()`.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,318 @@
+"""Offline batch mode: export `run` requests as Batch API JSONL and ingest the results.
+
+A typical round trip is:
+
+1. `export_requests` writes the first `responses.create` payload of every input to
+   sharded JSONL files, ready to upload to the Batch API (or to `run_batch_locally`).
+2. `read_results` streams the result files back; `join_results` pairs them with the
+   original request lines by `custom_id`.
+3. `continue_tool_loops` executes the function calls of unfinished runs, writes their
+   follow-up requests to a new set of files and yields the runs that are complete.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from types import TracebackType
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+import pydantic_core
+from openai import AsyncOpenAI
+from openai.types.responses import Response, ResponseFunctionToolCall
+from openai.types.responses.response_input_param import ResponseInputParam
+from openai.types.responses.response_text_config_param import ResponseTextConfigParam
+
+from src.client import get_client
+from src.orchestrator import _final_output, build_request, execute_tool_calls
+from src.tool import ToolManager
+
+logger = logging.getLogger(__name__)
+
+BATCH_URL = "/v1/responses"
+MAX_REQUESTS_PER_FILE = 50_000
+MAX_BYTES_PER_FILE = 200 * 1024 * 1024
+
+
+def _dumps(value: Any) -> bytes:
+    return pydantic_core.to_json(value, exclude_none=True)
+
+
+class BatchFileWriter:
+    """Writes Batch API request lines to JSONL files, starting a new file when full.
+
+    Lines are written as they come, so memory use doesn't grow with the number of
+    requests.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        prefix: str = "batch",
+        max_requests_per_file: int = MAX_REQUESTS_PER_FILE,
+        max_bytes_per_file: int = MAX_BYTES_PER_FILE,
+    ) -> None:
+        self.directory = Path(directory)
+        self.prefix = prefix
+        self.max_requests_per_file = max_requests_per_file
+        self.max_bytes_per_file = max_bytes_per_file
+        self.paths: list[Path] = []
+        self._file: Any = None
+        self._requests_in_file = 0
+        self._bytes_in_file = 0
+
+    def write(self, custom_id: str, body: dict[str, Any]) -> None:
+        """Write one request line for a `responses.create` payload."""
+        line = _dumps(
+            {"custom_id": custom_id, "method": "POST", "url": BATCH_URL, "body": body}
+        )
+        line += b"\n"
+        if len(line) > self.max_bytes_per_file:
+            raise ValueError(f"Request {custom_id} is larger than max_bytes_per_file")
+        if (
+            self._file is None
+            or self._requests_in_file >= self.max_requests_per_file
+            or self._bytes_in_file + len(line) > self.max_bytes_per_file
+        ):
+            self._next_file()
+        self._file.write(line)
+        self._requests_in_file += 1
+        self._bytes_in_file += len(line)
+
+    def _next_file(self) -> None:
+        self.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{self.prefix}-{len(self.paths):05d}.jsonl"
+        self._file = path.open("wb")
+        self.paths.append(path)
+        self._requests_in_file = 0
+        self._bytes_in_file = 0
+
+    def close(self) -> None:
+        """Close the current file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "BatchFileWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+
+def export_requests(
+    requests: Iterable[tuple[str, ResponseInputParam]],
+    directory: str | Path,
+    output_type: ResponseTextConfigParam | None = None,
+    tool_manager: ToolManager | None = None,
+    prefix: str = "batch",
+    max_requests_per_file: int = MAX_REQUESTS_PER_FILE,
+    max_bytes_per_file: int = MAX_BYTES_PER_FILE,
+) -> list[Path]:
+    """Write the first `responses.create` payload `run` would send for each input.
+
+    Args:
+        requests: `(custom_id, input)` pairs. Custom ids must be unique.
+        directory: Where to write the JSONL files.
+        output_type: Same as for `run`.
+        tool_manager: Same as for `run`; its tools are included in every request.
+        prefix: File name prefix of the shards.
+        max_requests_per_file: Maximum number of requests per file.
+        max_bytes_per_file: Maximum size of a file in bytes.
+
+    Returns:
+        The paths of the written files.
+    """
+    with BatchFileWriter(
+        directory, prefix, max_requests_per_file, max_bytes_per_file
+    ) as writer:
+        for custom_id, input in requests:
+            writer.write(
+                custom_id,
+                build_request(
+                    input, output_type=output_type, tool_manager=tool_manager
+                ),
+            )
+    return writer.paths
+
+
+@dataclass
+class BatchOutput:
+    """One line of a Batch API result file."""
+
+    custom_id: str
+    response: Response | None = None
+    error: dict[str, Any] | None = None
+
+    @property
+    def final_output(self) -> str | None:
+        """The text of the last output message, if the request succeeded."""
+        return _final_output(self.response) if self.response is not None else None
+
+
+def read_results(paths: Iterable[str | Path]) -> Iterator[BatchOutput]:
+    """Stream the lines of Batch API result files."""
+    for path in paths:
+        with Path(path).open("rb") as f:
+            for line in f:
+                if line.strip():
+                    yield _parse_result_line(json.loads(line))
+
+
+def _parse_result_line(data: dict[str, Any]) -> BatchOutput:
+    custom_id = data["custom_id"]
+    result = data.get("response")
+    if result is not None and result.get("status_code") == 200:
+        return BatchOutput(custom_id, response=Response.model_validate(result["body"]))
+    error = data.get("error")
+    if error is None and result is not None:
+        error = result.get("body", {}).get("error") or {
+            "status_code": result.get("status_code")
+        }
+    return BatchOutput(custom_id, error=error)
+
+
+def join_results(
+    request_paths: Iterable[str | Path], result_paths: Iterable[str | Path]
+) -> Iterator[tuple[dict[str, Any], BatchOutput]]:
+    """Pair every result with the request line it answers, matched by `custom_id`.
+
+    Only the position of each request line is kept in memory; request lines are read
+    back from disk as their results arrive.
+    """
+    paths = [Path(path) for path in request_paths]
+    offsets: dict[str, tuple[int, int]] = {}
+    for file_index, path in enumerate(paths):
+        with path.open("rb") as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    offsets[json.loads(line)["custom_id"]] = (file_index, offset)
+                offset += len(line)
+
+    files = [path.open("rb") for path in paths]
+    try:
+        for output in read_results(result_paths):
+            location = offsets.get(output.custom_id)
+            if location is None:
+                logger.warning("No request found for result %s", output.custom_id)
+                continue
+            f = files[location[0]]
+            f.seek(location[1])
+            yield json.loads(f.readline()), output
+    finally:
+        for f in files:
+            f.close()
+
+
+async def continue_tool_loops(
+    outputs: Iterable[BatchOutput],
+    writer: BatchFileWriter,
+    tool_manager: ToolManager,
+    output_type: ResponseTextConfigParam | None = None,
+) -> AsyncIterator[BatchOutput]:
+    """Resume runs whose responses asked for function calls.
+
+    The function calls of each unfinished run are executed and the follow-up request,
+    which continues from the stored response with `previous_response_id`, is written to
+    `writer` under the same `custom_id`. Runs that are finished or failed are yielded.
+    """
+    for output in outputs:
+        response = output.response
+        function_calls = (
+            [
+                item
+                for item in response.output
+                if isinstance(item, ResponseFunctionToolCall)
+            ]
+            if response is not None
+            else []
+        )
+        if response is None or not function_calls:
+            yield output
+            continue
+        function_outputs = await execute_tool_calls(tool_manager, function_calls)
+        writer.write(
+            output.custom_id,
+            build_request(
+                function_outputs,  # type: ignore[arg-type]
+                previous_response_id=response.id,
+                output_type=output_type,
+                tool_manager=tool_manager,
+            ),
+        )
+
+
+async def run_batch_locally(
+    request_path: str | Path,
+    result_path: str | Path,
+    handler: Callable[[dict[str, Any]], Awaitable[Response]] | None = None,
+    client: AsyncOpenAI | None = None,
+    max_concurrency: int = 8,
+) -> Path:
+    """Local stand-in for the Batch API endpoint.
+
+    Reads a request file, sends every body to `handler` (by default `responses.create`
+    on `client`) and writes a result file in the Batch API output format. Use it with a
+    fake handler or client to test batch workflows without network access.
+    """
+    if handler is None:
+        batch_client = client or get_client()
+
+        async def handler(body: dict[str, Any]) -> Response:
+            return await batch_client.responses.create(**body)
+
+    request_path = Path(request_path)
+    result_path = Path(result_path)
+    lines: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=max_concurrency)
+    results: list[bytes] = []
+
+    async def worker() -> None:
+        while (line := await lines.get()) is not None:
+            request = json.loads(line)
+            result: dict[str, Any] = {
+                "id": f"batch_req_{uuid.uuid4().hex}",
+                "custom_id": request["custom_id"],
+            }
+            try:
+                response = await handler(request["body"])
+                result["response"] = {
+                    "status_code": 200,
+                    "request_id": uuid.uuid4().hex,
+                    "body": response.model_dump(mode="json"),
+                }
+                result["error"] = None
+            except Exception as e:
+                logger.warning(
+                    "Batch request %s failed: %r",
+                    request["custom_id"],
+                    e,
+                    exc_info=True,
+                )
+                result["response"] = None
+                result["error"] = {"code": type(e).__name__, "message": str(e)}
+            results.append(json.dumps(result).encode() + b"\n")
+
+    # File access runs in a thread so it doesn't block the event loop.
+    requests = await asyncio.to_thread(request_path.read_bytes)
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    try:
+        for line in requests.splitlines():
+            if line.strip():
+                await lines.put(line)
+        for _ in workers:
+            await lines.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    await asyncio.to_thread(result_path.write_bytes, b"".join(results))
+    return result_path
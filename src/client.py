@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+import weakref
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import httpx
+    from openai import AsyncOpenAI
+
+
+@dataclass
+class ClientConfig:
+    """Connection settings for the shared OpenAI client.
+
+    `http2` requires the `h2` package (`pip install 'httpx[http2]'`). A custom
+    `transport`, such as `src.fake_responses.FakeResponsesTransport`, replaces the
+    network connection pool and its limits.
+    """
+
+    api_key: str | None = None
+    base_url: str | None = None
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = False
+    timeout: float = 600.0
+    connect_timeout: float = 5.0
+    max_retries: int = 2
+    transport: httpx.AsyncBaseTransport | None = None
+
+
+class ClientProvider:
+    """Creates and reuses `AsyncOpenAI` clients that share one tuned connection pool.
+
+    Clients are created lazily on first use, one per event loop, because httpx
+    connections can't be shared across loops. Every caller on the same loop gets the
+    same client, so connections and TLS sessions stay warm between calls.
+    """
+
+    def __init__(self, config: ClientConfig | None = None) -> None:
+        self.config = config or ClientConfig()
+        self._clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, AsyncOpenAI
+        ] = weakref.WeakKeyDictionary()
+        self._loopless_client: AsyncOpenAI | None = None
+
+    def get_client(self) -> AsyncOpenAI:
+        """Return the client for the running event loop, creating it on first use."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            if self._loopless_client is None:
+                self._loopless_client = self._create_client()
+            return self._loopless_client
+
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._create_client()
+            self._clients[loop] = client
+        return client
+
+    def _create_client(self) -> AsyncOpenAI:
+        # Imported here so importing this module doesn't load openai and httpx.
+        import httpx
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        config = self.config
+        http_client = DefaultAsyncHttpxClient(
+            limits=httpx.Limits(
+                max_connections=config.max_connections,
+                max_keepalive_connections=config.max_keepalive_connections,
+                keepalive_expiry=config.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+            http2=config.http2,
+            transport=config.transport,
+        )
+        return AsyncOpenAI(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            max_retries=config.max_retries,
+            http_client=http_client,
+        )
+
+    async def aclose(self) -> None:
+        """Close all clients created by this provider.
+
+        The clients of other event loops are closed on their own loop while it runs.
+        Clients of loops that are no longer running are only dropped: their connections
+        can't be used from another loop and are released with the loop. Later calls to
+        `get_client()` create new clients.
+        """
+        running_loop = asyncio.get_running_loop()
+        clients = list(self._clients.items())
+        self._clients.clear()
+        loopless_client, self._loopless_client = self._loopless_client, None
+        for loop, client in clients:
+            if loop is running_loop:
+                await client.close()
+            elif loop.is_running():
+                await asyncio.wrap_future(
+                    asyncio.run_coroutine_threadsafe(client.close(), loop)
+                )
+        if loopless_client is not None:
+            await loopless_client.close()
+
+
+_default_provider: ClientProvider | None = None
+
+
+def get_default_provider() -> ClientProvider:
+    """Return the process-wide client provider, creating it on first use."""
+    global _default_provider
+    if _default_provider is None:
+        _default_provider = ClientProvider()
+    return _default_provider
+
+
+def set_default_provider(provider: ClientProvider) -> None:
+    """Replace the process-wide client provider, e.g. to change connection limits."""
+    global _default_provider
+    _default_provider = provider
+
+
+def get_client() -> AsyncOpenAI:
+    """Return the shared client for the running event loop."""
+    return get_default_provider().get_client()
@@ -0,0 +1,302 @@
+from __future__ import annotations
+
+import struct
+import zlib
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Literal
+
+import pydantic_core
+
+from src.session import complete_tool_calls_start
+from src.tokens import TokenCounter, estimate_tokens
+
+try:
+    import msgpack  # type: ignore[import-untyped, import-not-found]
+except ImportError:
+    # msgpack is an optional dependency, installed with the `compact` extra.
+    msgpack = None
+
+try:
+    from compression import zstd  # type: ignore[import-not-found]  # Python 3.14+
+except ImportError:
+    try:
+        import zstandard as zstd  # type: ignore[no-redef]
+    except ImportError:
+        # zstandard is an optional dependency, installed with the `compact` extra.
+        zstd = None
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseInputItemParam
+
+ItemFormat = Literal["json", "msgpack"]
+Compression = Literal["zlib", "zstd"]
+
+_RAW = b"\x00"
+_COMPRESSED = b"\x01"
+
+# Per item in `CompactSession.dump()`: token count and length of the encoded item.
+_DUMP_HEADER = struct.Struct("<QI")
+# Rough CPython overhead per stored item: the bytes object, the list slots and the token
+# count in the prefix sums.
+_ITEM_OVERHEAD = 33 + 8 + 8 + 32
+
+
+class ItemCodec:
+    """Encodes conversation items to compact bytes and back.
+
+    Items are serialized as JSON or msgpack, without the fields that are None. With
+    `compression`, items of at least `min_compress_size` bytes are compressed on their
+    own; smaller ones gain nothing from it and are stored as is behind a one byte
+    marker.
+    """
+
+    def __init__(
+        self,
+        format: ItemFormat = "json",
+        compression: Compression | None = None,
+        level: int | None = None,
+        min_compress_size: int = 256,
+    ) -> None:
+        """Initialize the codec.
+
+        Args:
+            format: Serialization format. "msgpack" requires `pip install msgpack`.
+            compression: Compression of large items, if any. "zstd" requires Python 3.14
+                or `pip install zstandard`.
+            level: Compression level. Defaults to the library's default.
+            min_compress_size: Items smaller than this many bytes aren't compressed.
+        """
+        if format == "msgpack" and msgpack is None:
+            raise ImportError("The msgpack format requires `pip install msgpack`")
+        if compression == "zstd" and zstd is None:
+            raise ImportError("zstd compression requires `pip install zstandard`")
+        self.format = format
+        self.compression = compression
+        self.level = level
+        self.min_compress_size = min_compress_size
+
+    def encode(self, item: Any) -> bytes:
+        if self.format == "json":
+            data = pydantic_core.to_json(item, exclude_none=True)
+        else:
+            data = msgpack.packb(
+                pydantic_core.to_jsonable_python(item, exclude_none=True)
+            )
+        if self.compression is None:
+            return data
+        if len(data) < self.min_compress_size:
+            return _RAW + data
+        return _COMPRESSED + self._compress(data)
+
+    def decode(self, data: bytes) -> Any:
+        data = self._payload(data)
+        if self.format == "json":
+            return pydantic_core.from_json(data)
+        return msgpack.unpackb(data)
+
+    def to_json(self, data: bytes) -> bytes:
+        """Return the JSON of an encoded item."""
+        if self.format == "json":
+            return self._payload(data)
+        return pydantic_core.to_json(self.decode(data))
+
+    def _payload(self, data: bytes) -> bytes:
+        if self.compression is None:
+            return data
+        if data[:1] == _RAW:
+            return data[1:]
+        if self.compression == "zlib":
+            return zlib.decompress(data[1:])
+        return zstd.decompress(data[1:])
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zlib":
+            return zlib.compress(data, -1 if self.level is None else self.level)
+        if self.level is None:
+            return zstd.compress(data)
+        return zstd.compress(data, self.level)
+
+
+class CompactSession:
+    """Conversation history kept as encoded bytes. A drop-in for `Session`.
+
+    Response output objects, such as messages and reasoning items, take several times
+    more memory as pydantic models than as bytes. Here every item is encoded once when
+    added, see `ItemCodec`, and decoded again only by `get_items`.
+
+    `encoded_input()` returns the JSON of the whole history, for callers that write
+    request bodies themselves. With the JSON format, items are joined as stored instead
+    of being decoded and serialized again. Nothing is cached, so the session holds no
+    uncompressed copy of its history.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        codec: ItemCodec | None = None,
+        token_counter: TokenCounter = estimate_tokens,
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            session_id: Identifier of the conversation.
+            codec: How items are stored. Defaults to uncompressed JSON.
+            token_counter: Counts the tokens of an item. Defaults to a length based
+                estimate; see `src.tokens.tiktoken_counter` for exact counts.
+        """
+        self.session_id = session_id
+        self.codec = codec or ItemCodec()
+        self.token_counter = token_counter
+        self._items: list[bytes] = []
+        # _token_prefix[i] is the number of tokens in _items[:i].
+        self._token_prefix: list[int] = [0]
+        self._nbytes = 0
+
+    def get_items(
+        self, limit: int | None = None, max_tokens: int | None = None
+    ) -> list[ResponseInputItemParam]:
+        """Retrieve the conversation history for this session.
+
+        Args:
+            limit: Maximum number of items to retrieve. If None, retrieves all items.
+                   When specified, returns the latest N items in chronological order.
+            max_tokens: Maximum total tokens of the retrieved items. When specified,
+                   returns the longest tail of the history within the budget. A function
+                   call output is never returned without its function call.
+
+        Returns:
+            List of input items representing the conversation history
+        """
+        decode = self.codec.decode
+        if max_tokens is None:
+            if limit is None:
+                encoded = self._items
+            else:
+                encoded = self._items[max(len(self._items) - limit, 0) :]
+            return [decode(data) for data in encoded]
+        start = bisect_left(self._token_prefix, self._token_prefix[-1] - max_tokens)
+        if limit is not None:
+            start = max(start, len(self._items) - limit)
+        items = [decode(data) for data in self._items[start:]]
+        return items[complete_tool_calls_start(items, 0) :]
+
+    def encoded_input(self) -> bytes:
+        """Return the whole history as a JSON array, as sent in a request `input`."""
+        return b"[" + b",".join(map(self.codec.to_json, self._items)) + b"]"
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of the whole history, as counted by `token_counter`."""
+        return self._token_prefix[-1]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the encoded items."""
+        return self._nbytes
+
+    @property
+    def memory_estimate(self) -> int:
+        """Approximate memory held by the session in bytes, with object overhead."""
+        return self._nbytes + len(self._items) * _ITEM_OVERHEAD
+
+    def dump(self) -> bytes:
+        """Serialize the encoded items and their token counts, e.g. to spill to disk.
+
+        The items aren't decoded; `from_dump` with the same codec restores the session.
+        """
+        parts = []
+        for index, data in enumerate(self._items):
+            tokens = self._token_prefix[index + 1] - self._token_prefix[index]
+            parts.append(_DUMP_HEADER.pack(tokens, len(data)))
+            parts.append(data)
+        return b"".join(parts)
+
+    @classmethod
+    def from_dump(
+        cls,
+        session_id: str,
+        data: bytes,
+        codec: ItemCodec | None = None,
+        token_counter: TokenCounter = estimate_tokens,
+    ) -> CompactSession:
+        """Restore a session from the output of `dump()`."""
+        session = cls(session_id, codec, token_counter)
+        view = memoryview(data)
+        offset = 0
+        total = 0
+        while offset < len(view):
+            tokens, size = _DUMP_HEADER.unpack_from(view, offset)
+            offset += _DUMP_HEADER.size
+            session._items.append(bytes(view[offset : offset + size]))
+            offset += size
+            total += tokens
+            session._token_prefix.append(total)
+            session._nbytes += size
+        return session
+
+    def add_items(self, items: list[ResponseInputItemParam]) -> None:
+        """Add new items to the conversation history.
+
+        Args:
+            items: List of input items to add to the history
+        """
+        total = self._token_prefix[-1]
+        for item in items:
+            data = self.codec.encode(item)
+            total += self.token_counter(item)
+            self._token_prefix.append(total)
+            self._items.append(data)
+            self._nbytes += len(data)
+
+    def pop_item(self) -> ResponseInputItemParam | None:
+        """Remove and return the most recent item from the session.
+
+        Returns:
+            The most recent item if it exists, None if the session is empty
+        """
+        if not self._items:
+            return None
+        self._token_prefix.pop()
+        data = self._items.pop()
+        self._nbytes -= len(data)
+        return self.codec.decode(data)
+
+    def clear_session(self) -> None:
+        """Clear all items for this session."""
+        self._items.clear()
+        self._token_prefix = [0]
+        self._nbytes = 0
+
+    def replace_prefix(
+        self,
+        expected: list[ResponseInputItemParam],
+        items: list[ResponseInputItemParam],
+    ) -> bool:
+        """Replace the oldest items with `items`, if they are still `expected`.
+
+        Used to swap older turns for a summary computed in the background. Nothing is
+        changed when the history no longer starts with `expected`, e.g. because it was
+        cleared.
+
+        Returns:
+            Whether the prefix was replaced.
+        """
+        count = len(expected)
+        if len(self._items) < count:
+            return False
+        expected_encoded = [self.codec.encode(item) for item in expected]
+        if self._items[:count] != expected_encoded:
+            # Encodings of equal items can differ, e.g. in key order; compare decoded
+            # items.
+            if [self.codec.decode(data) for data in self._items[:count]] != expected:
+                return False
+        encoded = [self.codec.encode(item) for item in items]
+        prefix = [0]
+        for item in items:
+            prefix.append(prefix[-1] + self.token_counter(item))
+        shift = prefix[-1] - self._token_prefix[count]
+        prefix.extend(tokens + shift for tokens in self._token_prefix[count + 1 :])
+        self._nbytes += sum(map(len, encoded)) - sum(map(len, self._items[:count]))
+        self._items[:count] = encoded
+        self._token_prefix = prefix
+        return True
@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from src import tracing
+from src.client import get_client
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.responses import ResponseInputItemParam
+
+    from src.session import Session
+    from src.sqlite_session import SQLiteSession
+
+logger = logging.getLogger(__name__)
+
+Summarizer = Callable[[list[Any]], Awaitable[str]]
+"""Turns a list of conversation items into the text of a summary."""
+
+SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+DEFAULT_SUMMARY_INSTRUCTIONS = (
+    "Summarize the conversation transcript for the assistant that will continue it. "
+    "Keep the user's goals, facts and decisions, tool results that are still relevant "
+    "and open questions. Drop greetings and repetition. Write at most a few short "
+    "paragraphs."
+)
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, str):
+        return content
+    parts = []
+    for part in content or []:
+        text = (
+            part.get("text") if isinstance(part, dict) else getattr(part, "text", None)
+        )
+        if text:
+            parts.append(text)
+    return " ".join(parts)
+
+
+def render_transcript(items: list[Any], max_chars_per_item: int | None = None) -> str:
+    """Render conversation items as plain text, one line per message, call or result.
+
+    Reasoning items and other item types without text are left out.
+    """
+    lines = []
+    for item in items:
+        data = item if isinstance(item, dict) else item.model_dump(exclude_none=True)
+        item_type = data.get("type", "message")
+        if item_type == "message":
+            line = f"{data.get('role')}: {_content_text(data.get('content'))}"
+        elif item_type == "function_call":
+            line = f"tool call: {data.get('name')}({data.get('arguments')})"
+        elif item_type == "function_call_output":
+            line = f"tool result: {data.get('output')}"
+        else:
+            continue
+        if max_chars_per_item is not None and len(line) > max_chars_per_item:
+            line = line[:max_chars_per_item] + "..."
+        lines.append(line)
+    return "\n".join(lines)
+
+
+class LLMSummarizer:
+    """Summarizes conversation items with a separate `responses.create` call."""
+
+    def __init__(
+        self,
+        model: str = "gpt-5-nano",
+        instructions: str = DEFAULT_SUMMARY_INSTRUCTIONS,
+        client: AsyncOpenAI | None = None,
+        max_chars_per_item: int | None = 4000,
+    ) -> None:
+        """Initialize the summarizer.
+
+        Args:
+            model: Model writing the summary. A small, cheap one is usually enough.
+            instructions: Instructions for the summary.
+            client: OpenAI client. Defaults to the shared client.
+            max_chars_per_item: Items are cut to this length in the transcript sent to
+                the model, so one huge tool result doesn't dominate the summary request.
+        """
+        self.model = model
+        self.instructions = instructions
+        self.client = client
+        self.max_chars_per_item = max_chars_per_item
+
+    async def __call__(self, items: list[Any]) -> str:
+        client = self.client or get_client()
+        response = await client.responses.create(
+            model=self.model,
+            instructions=self.instructions,
+            input=render_transcript(items, self.max_chars_per_item),
+            store=False,
+        )
+        return response.output_text
+
+
+class TruncatingSummarizer:
+    """Summarizes without a model call by keeping the start of every item.
+
+    Cheap and deterministic, for tests, benchmarks and conversations whose older turns
+    only need to be hinted at.
+    """
+
+    def __init__(self, max_chars_per_item: int = 200) -> None:
+        self.max_chars_per_item = max_chars_per_item
+
+    async def __call__(self, items: list[Any]) -> str:
+        return render_transcript(items, self.max_chars_per_item)
+
+
+def summary_item(text: str) -> ResponseInputItemParam:
+    """The message that stands in for the compacted turns."""
+    return {"type": "message", "role": "developer", "content": SUMMARY_PREFIX + text}
+
+
+class SessionCompactor:
+    """Folds the older turns of a session into a summary once it grows too large.
+
+    Call `maybe_compact()` after adding items to the session, typically at the end of a
+    turn. When the history is over `trigger_tokens`, the oldest items are summarized by
+    a background task while the next turns go on; the most recent `keep_recent_tokens`
+    stay as they are. Once the summary is ready, the summarized items are swapped for
+    one summary message, unless the session changed its oldest items in the meantime.
+    From then on, `session.get_items()` returns the compacted history.
+
+    A previous summary is part of the oldest items, so it is folded into the next one.
+    """
+
+    def __init__(
+        self,
+        session: Session | SQLiteSession,
+        summarizer: Summarizer | None = None,
+        trigger_tokens: int = 8000,
+        keep_recent_tokens: int = 2000,
+        min_items: int = 4,
+    ) -> None:
+        """Initialize the compactor.
+
+        Args:
+            session: Session to compact.
+            summarizer: Writes the summary. Defaults to an `LLMSummarizer`.
+            trigger_tokens: Compact when the history has more tokens than this.
+            keep_recent_tokens: Tokens of recent history kept verbatim.
+            min_items: Don't compact fewer items than this.
+        """
+        self.session = session
+        self.summarizer = summarizer or LLMSummarizer()
+        self.trigger_tokens = trigger_tokens
+        self.keep_recent_tokens = keep_recent_tokens
+        self.min_items = min_items
+        self.compactions = 0
+        self.skipped = 0
+        self.failures = 0
+        self.items_compacted = 0
+        self.tokens_saved = 0
+        self.summary_seconds = 0.0
+        self._task: asyncio.Task[bool] | None = None
+
+    def should_compact(self) -> bool:
+        return self.session.total_tokens > self.trigger_tokens
+
+    def maybe_compact(self) -> asyncio.Task[bool] | None:
+        """Start compacting in the background if the session is over the threshold.
+
+        Returns:
+            The task, or None if no compaction was needed or one is already running.
+        """
+        if self._task is not None and not self._task.done():
+            return None
+        if not self.should_compact():
+            return None
+        # An empty context, so the background work isn't traced or profiled as part of
+        # the run that happened to trigger it.
+        self._task = asyncio.create_task(self.compact(), context=contextvars.Context())
+        return self._task
+
+    async def wait(self) -> None:
+        """Wait for the running compaction, if any."""
+        if self._task is not None:
+            await asyncio.shield(self._task)
+
+    async def compact(self) -> bool:
+        """Summarize the older items and swap them for the summary.
+
+        Returns:
+            Whether the session was compacted.
+        """
+        items = self.session.get_items()
+        recent = self.session.get_items(max_tokens=self.keep_recent_tokens)
+        older = items[: len(items) - len(recent)]
+        if len(older) < self.min_items:
+            return False
+
+        with tracing.span(
+            "compaction", {"session_id": self.session.session_id}
+        ) as span:
+            start = time.perf_counter()
+            try:
+                text = await self.summarizer(older)
+            except Exception as e:
+                self.failures += 1
+                logger.warning(
+                    "Compacting session %s failed: %r",
+                    self.session.session_id,
+                    e,
+                    exc_info=True,
+                )
+                span.set_error(e)
+                return False
+            self.summary_seconds += time.perf_counter() - start
+
+            tokens_before = self.session.total_tokens
+            if not self.session.replace_prefix(older, [summary_item(text)]):
+                self.skipped += 1
+                logger.info(
+                    "Session %s changed while compacting", self.session.session_id
+                )
+                return False
+            saved = tokens_before - self.session.total_tokens
+            self.compactions += 1
+            self.items_compacted += len(older)
+            self.tokens_saved += saved
+            span.set_attributes({"items_compacted": len(older), "tokens_saved": saved})
+        logger.info(
+            "Compacted %d items of session %s, saving %d input tokens per request",
+            len(older),
+            self.session.session_id,
+            saved,
+        )
+        return True
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Counters of compactions so far.
+
+        `tokens_saved` is the sum over compactions of the tokens removed from the
+        history, so every later request sends that many fewer input tokens.
+        """
+        return {
+            "compactions": self.compactions,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "items_compacted": self.items_compacted,
+            "tokens_saved": self.tokens_saved,
+            "history_tokens": self.session.total_tokens,
+            "summary_seconds": self.summary_seconds,
+        }
@@ -0,0 +1,352 @@
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Sequence
+
+import httpx
+from openai.types.responses import (
+    Response,
+    ResponseFunctionToolCall,
+    ResponseOutputItem,
+    ResponseOutputMessage,
+    ResponseOutputText,
+    ResponseReasoningItem,
+    ResponseUsage,
+)
+from openai.types.responses.response_reasoning_item import Summary
+from openai.types.responses.response_usage import (
+    InputTokensDetails,
+    OutputTokensDetails,
+)
+
+logger = logging.getLogger(__name__)
+
+Script = (
+    Sequence[list[ResponseOutputItem]]
+    | Callable[[dict[str, Any]], list[ResponseOutputItem]]
+)
+
+
+def message(text: str) -> ResponseOutputMessage:
+    """Build an assistant message output item."""
+    return ResponseOutputMessage(
+        id=f"msg_{uuid.uuid4().hex}",
+        type="message",
+        role="assistant",
+        status="completed",
+        content=[ResponseOutputText(type="output_text", text=text, annotations=[])],
+    )
+
+
+def function_call(
+    name: str, arguments: str, call_id: str | None = None
+) -> ResponseFunctionToolCall:
+    """Build a function call item. `arguments` is the JSON string sent to the tool."""
+    return ResponseFunctionToolCall(
+        id=f"fc_{uuid.uuid4().hex}",
+        type="function_call",
+        call_id=call_id or f"call_{uuid.uuid4().hex}",
+        name=name,
+        arguments=arguments,
+        status="completed",
+    )
+
+
+def reasoning(*summary: str) -> ResponseReasoningItem:
+    """Build a reasoning output item with the given summary paragraphs."""
+    return ResponseReasoningItem(
+        id=f"rs_{uuid.uuid4().hex}",
+        type="reasoning",
+        summary=[Summary(type="summary_text", text=text) for text in summary],
+    )
+
+
+@dataclass
+class FakeLatency:
+    """Timing of fake responses.
+
+    Non-streaming requests wait `ttft` plus `inter_token_delay` per output token before
+    answering. Streaming requests send `response.created` right away, wait `ttft` before
+    the first output event and then `inter_token_delay` between deltas of
+    `chars_per_token` characters.
+    """
+
+    ttft: float = 0.0
+    inter_token_delay: float = 0.0
+    chars_per_token: int = 4
+
+
+class FakeResponsesTransport(httpx.AsyncBaseTransport):
+    """httpx transport that answers `POST /v1/responses` locally with scripted outputs.
+
+    Pass it to an `AsyncOpenAI` client, e.g. with
+    `ClientProvider(ClientConfig(api_key="fake",
+    transport=FakeResponsesTransport(...)))`, to run the orchestrator without network
+    access and with deterministic latency. Both JSON and SSE (`stream=True`) responses
+    are supported.
+    """
+
+    def __init__(
+        self,
+        script: Script | None = None,
+        latency: FakeLatency | None = None,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after: float = 0.0,
+        seed: int | None = None,
+    ) -> None:
+        """Initialize the transport.
+
+        Args:
+            script: Output items of each response. A sequence is replayed in order and
+                starts over when exhausted; a callable gets the request body and returns
+                the items. Defaults to a single "Hello!" message.
+            latency: Timing of the responses. Defaults to no delay.
+            error_rate: Fraction of requests that fail with a 500 error.
+            rate_limit_rate: Fraction of requests that fail with a 429 error.
+            retry_after: Seconds sent in the `retry-after` header of 429 errors.
+            seed: Seed of the random generator deciding which requests fail.
+        """
+        if script is None:
+            script = [[message("Hello!")]]
+        self._next_output: Callable[[dict[str, Any]], list[ResponseOutputItem]]
+        if callable(script):
+            self._next_output = script
+        else:
+            turns = itertools.cycle(script)
+            self._next_output = lambda body: next(turns)
+        self.latency = latency or FakeLatency()
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.rate_limited = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.method != "POST" or not request.url.path.endswith("/responses"):
+            return _error(
+                404, "invalid_request_error", f"Unknown route {request.url.path}"
+            )
+
+        self.requests += 1
+        body = json.loads(await request.aread())
+        roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            self.rate_limited += 1
+            logger.debug("Injecting a 429 error")
+            return _error(
+                429,
+                "rate_limit_error",
+                "Rate limit reached",
+                headers={"retry-after": str(self.retry_after)},
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            self.errors += 1
+            logger.debug("Injecting a 500 error")
+            return _error(500, "server_error", "The server had an error")
+
+        response = self._build_response(body, self._next_output(body))
+        if body.get("stream"):
+            return httpx.Response(
+                200,
+                headers={"content-type": "text/event-stream"},
+                stream=_EventStream(self._events(response)),
+            )
+
+        assert response.usage is not None
+        await asyncio.sleep(
+            self.latency.ttft
+            + response.usage.output_tokens * self.latency.inter_token_delay
+        )
+        return httpx.Response(200, json=response.model_dump(mode="json"))
+
+    def _build_response(
+        self, body: dict[str, Any], output: list[ResponseOutputItem]
+    ) -> Response:
+        input_tokens = self._count_tokens(json.dumps(body.get("input", "")))
+        output_tokens = sum(
+            self._count_tokens(text) for item in output for text in _texts(item)
+        )
+        return Response(
+            id=f"resp_{uuid.uuid4().hex}",
+            object="response",
+            created_at=time.time(),
+            model=body.get("model", "fake"),
+            instructions=body.get("instructions"),
+            previous_response_id=body.get("previous_response_id"),
+            output=output,
+            parallel_tool_calls=True,
+            tool_choice="auto",
+            tools=[],
+            status="completed",
+            usage=ResponseUsage(
+                input_tokens=input_tokens,
+                input_tokens_details=InputTokensDetails(cached_tokens=0),
+                output_tokens=output_tokens,
+                output_tokens_details=OutputTokensDetails(reasoning_tokens=0),
+                total_tokens=input_tokens + output_tokens,
+            ),
+        )
+
+    def _count_tokens(self, text: str) -> int:
+        return -(-len(text) // self.latency.chars_per_token)
+
+    def _chunks(self, text: str) -> list[str]:
+        size = self.latency.chars_per_token
+        return [text[i : i + size] for i in range(0, len(text), size)]
+
+    async def _events(self, response: Response) -> AsyncIterator[dict[str, Any]]:
+        in_progress = response.model_copy(
+            update={"output": [], "status": "in_progress"}
+        )
+        yield {
+            "type": "response.created",
+            "response": in_progress.model_dump(mode="json"),
+        }
+        await asyncio.sleep(self.latency.ttft)
+
+        for index, item in enumerate(response.output):
+            done = item.model_dump(mode="json")
+            if isinstance(item, ResponseOutputMessage):
+                text = (
+                    item.content[0].text
+                    if isinstance(item.content[0], ResponseOutputText)
+                    else ""
+                )
+                part = {"type": "output_text", "text": "", "annotations": []}
+                ids = {"item_id": item.id, "output_index": index, "content_index": 0}
+                yield {
+                    "type": "response.output_item.added",
+                    "output_index": index,
+                    "item": {**done, "content": [], "status": "in_progress"},
+                }
+                yield {"type": "response.content_part.added", **ids, "part": part}
+                for delta in self._chunks(text):
+                    yield {
+                        "type": "response.output_text.delta",
+                        **ids,
+                        "delta": delta,
+                        "logprobs": [],
+                    }
+                    await asyncio.sleep(self.latency.inter_token_delay)
+                yield {
+                    "type": "response.output_text.done",
+                    **ids,
+                    "text": text,
+                    "logprobs": [],
+                }
+                yield {
+                    "type": "response.content_part.done",
+                    **ids,
+                    "part": {**part, "text": text},
+                }
+            elif isinstance(item, ResponseFunctionToolCall):
+                ids = {"item_id": item.id or item.call_id, "output_index": index}
+                yield {
+                    "type": "response.output_item.added",
+                    "output_index": index,
+                    "item": {**done, "arguments": "", "status": "in_progress"},
+                }
+                for delta in self._chunks(item.arguments):
+                    yield {
+                        "type": "response.function_call_arguments.delta",
+                        **ids,
+                        "delta": delta,
+                    }
+                    await asyncio.sleep(self.latency.inter_token_delay)
+                yield {
+                    "type": "response.function_call_arguments.done",
+                    **ids,
+                    "arguments": item.arguments,
+                }
+            elif isinstance(item, ResponseReasoningItem):
+                ids = {"item_id": item.id, "output_index": index}
+                yield {
+                    "type": "response.output_item.added",
+                    "output_index": index,
+                    "item": {**done, "summary": []},
+                }
+                for summary_index, summary in enumerate(item.summary):
+                    part_ids = {**ids, "summary_index": summary_index}
+                    yield {
+                        "type": "response.reasoning_summary_part.added",
+                        **part_ids,
+                        "part": {"type": "summary_text", "text": ""},
+                    }
+                    for delta in self._chunks(summary.text):
+                        yield {
+                            "type": "response.reasoning_summary_text.delta",
+                            **part_ids,
+                            "delta": delta,
+                        }
+                        await asyncio.sleep(self.latency.inter_token_delay)
+                    yield {
+                        "type": "response.reasoning_summary_text.done",
+                        **part_ids,
+                        "text": summary.text,
+                    }
+                    yield {
+                        "type": "response.reasoning_summary_part.done",
+                        **part_ids,
+                        "part": {"type": "summary_text", "text": summary.text},
+                    }
+            else:
+                yield {
+                    "type": "response.output_item.added",
+                    "output_index": index,
+                    "item": done,
+                }
+            yield {
+                "type": "response.output_item.done",
+                "output_index": index,
+                "item": done,
+            }
+
+        yield {
+            "type": "response.completed",
+            "response": response.model_dump(mode="json"),
+        }
+
+
+class _EventStream(httpx.AsyncByteStream):
+    def __init__(self, events: AsyncIterator[dict[str, Any]]) -> None:
+        self._events = events
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        sequence_number = 0
+        async for event in self._events:
+            event["sequence_number"] = sequence_number
+            sequence_number += 1
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+
+    async def aclose(self) -> None:
+        await self._events.aclose()  # type: ignore[attr-defined]
+
+
+def _texts(item: ResponseOutputItem) -> list[str]:
+    if isinstance(item, ResponseOutputMessage):
+        return [
+            part.text for part in item.content if isinstance(part, ResponseOutputText)
+        ]
+    if isinstance(item, ResponseFunctionToolCall):
+        return [item.arguments]
+    if isinstance(item, ResponseReasoningItem):
+        return [summary.text for summary in item.summary]
+    return []
+
+
+def _error(
+    status_code: int, type: str, message: str, headers: dict[str, str] | None = None
+) -> httpx.Response:
+    return httpx.Response(
+        status_code,
+        headers=headers,
+        json={"error": {"message": message, "type": type, "param": None, "code": None}},
+    )
@@ -0,0 +1,86 @@
+import inspect
+from dataclasses import dataclass
+from typing import Any, Callable, get_type_hints
+
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, create_model
+
+
+@dataclass
+class FunctionSchema:
+    """JSON schema and compiled argument validator for a tool function."""
+
+    parameters: dict[str, Any]
+    adapter: TypeAdapter[BaseModel]
+    # Field of the arguments model -> name of the function parameter.
+    parameter_names: dict[str, str]
+
+    def parse_arguments(self, arguments: str) -> BaseModel:
+        """Parse and validate the raw JSON arguments sent by the model in a single pass.
+
+        Raises:
+            pydantic.ValidationError: If the arguments don't match the function
+                signature.
+        """
+        return self.adapter.validate_json(arguments or "{}")
+
+    def call_arguments(self, parsed: BaseModel) -> dict[str, Any]:
+        """Return the keyword arguments for the function from parsed arguments."""
+        return {self.parameter_names[field]: value for field, value in parsed}
+
+
+def function_schema(func: Callable, strict: bool = False) -> FunctionSchema:
+    """Build the parameters schema and argument validator for `func` from its signature.
+
+    Supports any annotation pydantic understands, including nested models, generics,
+    Optional and default values. Unannotated parameters accept any JSON value.
+
+    Args:
+        func: The function to describe.
+        strict: Whether to make the schema compatible with OpenAI strict mode, where
+                every property is required and no object allows additional properties.
+    """
+    type_hints = get_type_hints(func, include_extras=True)
+    fields: dict[str, Any] = {}
+    parameter_names: dict[str, str] = {}
+    for index, param in enumerate(inspect.signature(func).parameters.values()):
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        annotation = type_hints.get(param.name, Any)
+        default = ... if param.default is param.empty else param.default
+        # Fields get neutral names and the parameter name as alias: pydantic would turn
+        # a leading underscore into a private attribute, and names like `json` or `copy`
+        # shadow BaseModel attributes.
+        field = f"arg_{index}"
+        fields[field] = (annotation, Field(default, alias=param.name))
+        parameter_names[field] = param.name
+
+    arguments_model = create_model(
+        f"{func.__name__}_arguments",
+        __config__=ConfigDict(extra="forbid"),
+        **fields,
+    )
+    adapter: TypeAdapter[BaseModel] = TypeAdapter(arguments_model)
+    parameters = adapter.json_schema()
+    parameters.pop("title", None)
+    parameters.setdefault("properties", {})
+    if strict:
+        parameters = _ensure_strict(parameters)
+    return FunctionSchema(
+        parameters=parameters, adapter=adapter, parameter_names=parameter_names
+    )
+
+
+def _ensure_strict(schema: dict[str, Any]) -> dict[str, Any]:
+    """Require every property and forbid additional properties on all nested objects."""
+    if schema.get("type") == "object":
+        schema["additionalProperties"] = False
+        schema["required"] = list(schema.get("properties", {}))
+    for key in ("properties", "$defs"):
+        for sub_schema in schema.get(key, {}).values():
+            _ensure_strict(sub_schema)
+    for key in ("anyOf", "allOf", "oneOf"):
+        for sub_schema in schema.get(key, []):
+            _ensure_strict(sub_schema)
+    if isinstance(schema.get("items"), dict):
+        _ensure_strict(schema["items"])
+    return schema
@@ -0,0 +1,127 @@
+import atexit
+import copy
+import logging
+import queue
+import random
+from logging.handlers import QueueHandler, QueueListener
+
+DEFAULT_FORMAT = "%(levelname)s: %(message)s"
+
+
+class TruncatingFormatter(logging.Formatter):
+    """Formatter that cuts messages longer than `max_length` characters.
+
+    Large payloads such as full responses or tool results are still logged, but only
+    their beginning and the number of characters left out.
+    """
+
+    def __init__(self, fmt: str | None = None, max_length: int | None = 2000) -> None:
+        super().__init__(fmt)
+        self.max_length = max_length
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        if self.max_length is not None and len(record.message) > self.max_length:
+            omitted = len(record.message) - self.max_length
+            record.message = (
+                f"{record.message[: self.max_length]}... [{omitted} chars truncated]"
+            )
+        return super().formatMessage(record)
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps only a fraction `rate` of records at `max_level` or below.
+
+    Records above `max_level`, warnings and errors by default, are always kept.
+    """
+
+    def __init__(self, rate: float, max_level: int = logging.INFO) -> None:
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > self.max_level or random.random() < self.rate
+
+
+class _LazyQueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread.
+
+    The stock `QueueHandler.prepare` formats the message on the calling thread so the
+    record can be pickled. The queue here never leaves the process, so the record is
+    passed as is and `%`-style arguments, including expensive reprs, are only rendered
+    by the listener.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info:
+            # Tracebacks reference frames that may change; render them now.
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+_configured_logger: logging.Logger | None = None
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    logger_name: str | None = None,
+    handler: logging.Handler | None = None,
+    fmt: str = DEFAULT_FORMAT,
+    max_length: int | None = 2000,
+    sample_rate: float = 1.0,
+) -> QueueListener:
+    """Send log records through a queue to a handler running on a background thread.
+
+    Formatting and I/O then happen off the event loop thread; callers only pay for
+    putting the record on the queue. Calling it again replaces the previous
+    configuration.
+
+    Args:
+        level: Level of the configured logger.
+        logger_name: Logger to configure. Defaults to the root logger; pass "src" to
+            only configure this package.
+        handler: Where records end up. Defaults to a `StreamHandler` on stderr.
+        fmt: Format of the records.
+        max_length: Messages longer than this are truncated. None disables truncation.
+        sample_rate: Fraction of INFO and DEBUG records that are kept.
+
+    Returns:
+        The started listener. It is stopped, flushing the queue, at interpreter exit or
+        by `shutdown_logging()`.
+    """
+    global _listener, _queue_handler, _configured_logger
+    shutdown_logging()
+
+    handler = handler or logging.StreamHandler()
+    handler.setFormatter(TruncatingFormatter(fmt, max_length))
+    log_queue: queue.SimpleQueue[logging.LogRecord] = queue.SimpleQueue()
+    queue_handler = _LazyQueueHandler(log_queue)
+    if sample_rate < 1.0:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+
+    logger = logging.getLogger(logger_name)
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+    _queue_handler = queue_handler
+    _configured_logger = logger
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Stop the listener started by `configure_logging`, writing out queued records."""
+    global _listener, _queue_handler, _configured_logger
+    if _configured_logger is not None and _queue_handler is not None:
+        _configured_logger.removeHandler(_queue_handler)
+    if _listener is not None:
+        _listener.stop()
+    _listener = _queue_handler = _configured_logger = None
+
+
+atexit.register(shutdown_logging)
@@ -1,72 +1,634 @@
+from __future__ import annotations
+
+import asyncio
 import logging
-import os
-from openai import AsyncOpenAI
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Iterable
 from openai.types import Reasoning
 from openai.types.responses import (
     Response,
+    ResponseCompletedEvent,
+    ResponseErrorEvent,
+    ResponseFailedEvent,
+    ResponseFunctionCallArgumentsDeltaEvent,
+    ResponseFunctionToolCall,
+    ResponseIncompleteEvent,
+    ResponseOutputItemAddedEvent,
+    ResponseOutputItemDoneEvent,
     ResponseOutputMessage,
     ResponseOutputText,
     ResponseReasoningItem,
+    ResponseReasoningSummaryTextDeltaEvent,
+    ResponseTextDeltaEvent,
 )
-from openai.types.responses.response_input_param import ResponseInputParam
-from openai.types.responses.response_text_config_param import ResponseTextConfigParam
+from openai.types.responses.response_input_item_param import FunctionCallOutput
+
+from pydantic import BaseModel
+
+from src import profiling, tracing
+from src.client import get_client
+from src.rate_limit import RateLimiter
+from src.streaming import (
+    IterationCompletedEvent,
+    IterationStartedEvent,
+    PartialOutputEvent,
+    ReasoningDeltaEvent,
+    ResponseStreamError,
+    StreamEvent,
+    StreamedRun,
+    StreamingArguments,
+    TextDeltaEvent,
+    ToolCallArgumentsDeltaEvent,
+    ToolCallCompletedEvent,
+    ToolCallStartedEvent,
+    ToolResultEvent,
+)
+from src.structured_output import StructuredOutputParser, output_type_for
+from src.tool import ToolManager
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+    from openai.types.responses.response_input_param import ResponseInputParam
+    from openai.types.responses.response_text_config_param import (
+        ResponseTextConfigParam,
+    )
+
+    from src.response_cache import ResponseCache
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 
+def build_request(
+    input: ResponseInputParam,
+    previous_response_id: str | None = None,
+    output_type: ResponseTextConfigParam | None = None,
+    tool_manager: ToolManager | None = None,
+) -> dict[str, Any]:
+    """Build the keyword arguments of the `responses.create` call of an iteration."""
+    request: dict[str, Any] = {
+        "model": "gpt-5-nano",
+        "instructions": "You are a helpful assistant.",
+        "input": input,
+        "reasoning": Reasoning(summary="auto"),
+    }
+    if previous_response_id is not None:
+        request["previous_response_id"] = previous_response_id
+    if output_type is not None:
+        request["text"] = output_type
+    if tool_manager is not None:
+        request["tools"] = tool_manager.tools
+    return request
+
+
 async def run(
     input: ResponseInputParam,
     previous_response_id: str | None = None,
     max_iterations: int = 10,
     output_type: ResponseTextConfigParam | None = None,
+    tool_manager: ToolManager | None = None,
+    client: AsyncOpenAI | None = None,
+    rate_limiter: RateLimiter | None = None,
+    response_cache: ResponseCache | None = None,
+    profile: bool = False,
 ) -> tuple[Response, str | None]:
     """
     Abstract the logic of calling llm in a loop for agentic behaviour.
 
-    This acts like orchestrator.
+    This acts like orchestrator. When a `tool_manager` is given, its tools are sent to
+    the model and every function call in a response is executed concurrently before the
+    outputs are sent back on the next iteration. `client` defaults to the shared client
+    from `src.client.get_client()`. A `rate_limiter` is applied to every
+    `responses.create` call. With a `response_cache`, identical requests are answered
+    from disk without calling the API or taking rate limit capacity. `profile=True`
+    forces this run to be profiled by the profiler set with
+    `src.profiling.set_profiler()`, which otherwise samples runs by rate.
     """
+    client = client or get_client()
 
-    current_iteration = 0
-    agent_should_stop = False
-    while True:
-        if current_iteration >= max_iterations:
-            logger.info("Max iterations reached. Exiting.")
-            break
-
-        response = await async_client.responses.create(  # type: ignore[call-overload] # Not sure why mypy is complaining
-            model="gpt-5-nano",
-            instructions="You are a helpful assistant.",
-            input=input,
-            reasoning=Reasoning(summary="auto"),
-            previous_response_id=previous_response_id,
-            text=output_type,
+    with (
+        tracing.span("run", {"max_iterations": max_iterations}) as run_span,
+        profiling.profile_run(force=profile),
+    ):
+        current_iteration = 0
+        iterations = 0
+        agent_should_stop = False
+        while True:
+            if current_iteration >= max_iterations:
+                logger.info("Max iterations reached. Exiting.")
+                break
+
+            iterations = current_iteration + 1
+            with tracing.span(
+                "iteration", {"iteration": current_iteration}
+            ) as iteration_span:
+                response = await _create_response(
+                    client,
+                    build_request(
+                        input, previous_response_id, output_type, tool_manager
+                    ),
+                    rate_limiter,
+                    response_cache,
+                )
+
+                previous_response_id = response.id
+                final_output = None
+                function_calls: list[ResponseFunctionToolCall] = []
+
+                for output in response.output:
+                    if isinstance(output, ResponseReasoningItem):
+                        if output.summary:
+                            for summary_item in output.summary:
+                                logger.info("Reasoning summary: %s", summary_item.text)
+                        else:
+                            logger.info("Reasoning summary: None")
+                    elif isinstance(output, ResponseOutputMessage):
+                        if isinstance(output.content[0], ResponseOutputText):
+                            logger.info("Final response: %s", output.content[0].text)
+                            final_output = output.content[0].text
+                            agent_should_stop = True
+                        else:
+                            logger.warning(
+                                "Unsupported output type: %s", output.content[0]
+                            )
+                    elif isinstance(output, ResponseFunctionToolCall):
+                        logger.info("Tool call: %s(%s)", output.name, output.arguments)
+                        function_calls.append(output)
+                    else:
+                        logger.warning("Unsupported output type: %s", output)
+
+                iteration_span.set_attribute("function_calls", len(function_calls))
+                if function_calls and tool_manager is not None:
+                    # The previous response already holds the calls, so only the outputs
+                    # are sent.
+                    input = await execute_tool_calls(  # type: ignore[assignment]
+                        tool_manager, function_calls
+                    )
+                    agent_should_stop = False
+
+                if agent_should_stop:
+                    break
+
+            current_iteration += 1
+        run_span.set_attributes({"iterations": iterations, "response_id": response.id})
+        return response, final_output
+
+
+async def _create_response(
+    client: AsyncOpenAI,
+    request: dict[str, Any],
+    rate_limiter: RateLimiter | None,
+    response_cache: ResponseCache | None,
+) -> Response:
+    with (
+        tracing.span("responses.create", {"model": request["model"]}) as llm_span,
+        profiling.phase("llm"),
+    ):
+        if response_cache is not None:
+            cached = await asyncio.to_thread(response_cache.get, request)
+            llm_span.set_attribute("cache_hit", cached is not None)
+            if cached is not None:
+                return cached
+
+        reserved_tokens = await rate_limiter.acquire() if rate_limiter else 0
+        response = await client.responses.create(**request)
+        if rate_limiter:
+            rate_limiter.record_usage(reserved_tokens, response.usage)
+        if llm_span.recording:
+            llm_span.set_attribute("response_id", response.id)
+            llm_span.set_attributes(tracing.usage_attributes(response.usage))
+
+        if response_cache is not None:
+            await asyncio.to_thread(response_cache.set, request, response)
+        return response
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one input of `run_many`."""
+
+    index: int
+    input: ResponseInputParam
+    response: Response | None = None
+    final_output: str | None = None
+    error: Exception | None = None
+
+
+async def run_many(
+    inputs: Iterable[ResponseInputParam] | AsyncIterable[ResponseInputParam],
+    max_concurrency: int = 8,
+    rate_limiter: RateLimiter | None = None,
+    **run_kwargs: Any,
+) -> AsyncIterator[BatchResult]:
+    """
+    Run many independent inputs through `run` with bounded concurrency.
+
+    Inputs are pulled from `inputs` only when a worker is free, and workers wait when
+    the consumer falls behind, so neither side buffers more than `max_concurrency`
+    items. Results are yielded in completion order with the index of their input. Errors
+    of a run are returned on its result instead of stopping the batch. An error raised
+    by `inputs` itself stops pulling inputs and is raised once the runs in flight have
+    been yielded.
+
+    Args:
+        inputs: Inputs to run, as an iterable or async iterable.
+        max_concurrency: Maximum number of runs in flight, at least 1.
+        rate_limiter: Requests-per-minute and tokens-per-minute limits shared by all
+            runs.
+        **run_kwargs: Passed to `run` for every input.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+    source = _enumerate_inputs(inputs)
+    source_lock = asyncio.Lock()
+    results: asyncio.Queue[BatchResult | None] = asyncio.Queue(maxsize=max_concurrency)
+    # Errors of the input iterator, or of a worker, that end the batch for the consumer.
+    errors: list[BaseException] = []
+
+    async def worker() -> None:
+        while True:
+            async with source_lock:
+                try:
+                    index, item = await anext(source)
+                except StopAsyncIteration:
+                    return
+                except Exception as e:  # noqa: BLE001
+                    # Raised to the consumer once the runs in flight are yielded. A
+                    # failed async generator is finished, so the other workers stop too.
+                    errors.append(e)
+                    return
+            try:
+                response, final_output = await run(
+                    item, rate_limiter=rate_limiter, **run_kwargs
+                )
+                result = BatchResult(index, item, response, final_output)
+            except Exception as e:
+                logger.warning("Batch input %s failed: %r", index, e, exc_info=True)
+                result = BatchResult(index, item, error=e)
+            await results.put(result)
+
+    async def close_when_done() -> None:
+        outcomes = await asyncio.gather(*workers, return_exceptions=True)
+        errors.extend(
+            outcome for outcome in outcomes if isinstance(outcome, BaseException)
+        )
+        await results.put(None)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    closer = asyncio.create_task(close_when_done())
+    try:
+        while (result := await results.get()) is not None:
+            yield result
+        if errors:
+            raise errors[0]
+    finally:
+        for task in [*workers, closer]:
+            task.cancel()
+
+
+async def _enumerate_inputs(
+    inputs: Iterable[ResponseInputParam] | AsyncIterable[ResponseInputParam],
+) -> AsyncIterator[tuple[int, ResponseInputParam]]:
+    index = 0
+    if isinstance(inputs, AsyncIterable):
+        async for item in inputs:
+            yield index, item
+            index += 1
+    else:
+        for item in inputs:
+            yield index, item
+            index += 1
+
+
+async def execute_tool_calls(
+    tool_manager: ToolManager, function_calls: list[ResponseFunctionToolCall]
+) -> list[FunctionCallOutput]:
+    """Execute all function calls from one response concurrently.
+
+    A call that fails, including one to an unknown tool or with invalid arguments,
+    doesn't stop the others: its error is sent back to the model as the output of that
+    call.
+
+    Returns:
+        One `FunctionCallOutput` per call, in the same order as `function_calls`.
+    """
+    with profiling.phase("tools"):
+        results = await asyncio.gather(
+            *(
+                tool_manager.execute_function(call.name, call.arguments)
+                for call in function_calls
+            ),
+            return_exceptions=True,
+        )
+    return _function_call_outputs(function_calls, results)
+
+
+def _function_call_outputs(
+    function_calls: list[ResponseFunctionToolCall], results: list[str | BaseException]
+) -> list[FunctionCallOutput]:
+    outputs = []
+    for call, result in zip(function_calls, results):
+        if isinstance(result, BaseException):
+            if not isinstance(result, Exception):
+                raise result
+            logger.warning(
+                "Tool call %s(%s) failed: %r", call.name, call.arguments, result
+            )
+            result = f"Error: {result}"
+        else:
+            logger.info("Tool response: %s", result)
+        outputs.append(
+            FunctionCallOutput(
+                call_id=call.call_id,
+                output=result,
+                type="function_call_output",
+            )
         )
+    return outputs
+
+
+def run_streamed(
+    input: ResponseInputParam,
+    previous_response_id: str | None = None,
+    max_iterations: int = 10,
+    output_type: ResponseTextConfigParam | None = None,
+    tool_manager: ToolManager | None = None,
+    output_model: type[BaseModel] | None = None,
+    client: AsyncOpenAI | None = None,
+    response_cache: ResponseCache | None = None,
+) -> StreamedRun:
+    """
+    Streaming version of `run`.
+
+    Drives the same tool loop over `stream=True` responses. Iterate
+    `StreamedRun.stream_events()` to get normalized events as they arrive; the final
+    `Response` and output text are set on the returned object when the stream ends.
+
+    Each function call starts executing in the background as soon as its arguments are
+    complete, overlapping with the rest of the stream. All of them are joined before the
+    next `responses.create` call. As in `run`, the error of a failed call is sent back
+    to the model as its output.
+
+    With an `output_model`, the output text is parsed as it streams and
+    `PartialOutputEvent`s carry progressively filled instances of the model. Each field
+    is validated as soon as it closes; on a violation the request is aborted and
+    `StructuredOutputError` is raised. `output_type` defaults to a non-strict JSON
+    schema of the model.
+
+    With a `response_cache`, the events of every completed stream are recorded, and a
+    repeated request replays them instead of calling the API.
+    """
+    if output_model is not None and output_type is None:
+        output_type = output_type_for(output_model)
+    streamed = StreamedRun()
+    streamed._events = _stream_run(
+        streamed,
+        client,
+        input,
+        previous_response_id,
+        max_iterations,
+        output_type,
+        tool_manager,
+        output_model,
+        response_cache,
+    )
+    return streamed
+
+
+async def _stream_run(
+    streamed: StreamedRun,
+    client: AsyncOpenAI | None,
+    input: ResponseInputParam,
+    previous_response_id: str | None,
+    max_iterations: int,
+    output_type: ResponseTextConfigParam | None,
+    tool_manager: ToolManager | None,
+    output_model: type[BaseModel] | None,
+    response_cache: ResponseCache | None,
+) -> AsyncIterator[StreamEvent]:
+    # Resolved here so the client belongs to the loop that consumes the stream.
+    client = client or get_client()
+    # Spans are never made current across a `yield`: the consumer's code runs in this
+    # generator's context between events, so its spans would nest under ours, and a
+    # consumer that stops early would keep a stale current span. Parents are passed
+    # explicitly instead.
+    run_span = tracing.start_span(
+        "run", {"max_iterations": max_iterations, "stream": True}
+    )
+    with run_span:
+        iterations = 0
+        for current_iteration in range(max_iterations):
+            iterations = current_iteration + 1
+            iteration_span = tracing.start_span(
+                "iteration", {"iteration": current_iteration}, parent=run_span
+            )
+            with iteration_span:
+                yield IterationStartedEvent(iteration=current_iteration)
+
+                request = build_request(
+                    input, previous_response_id, output_type, tool_manager
+                )
+                llm_span = tracing.start_span(
+                    "responses.create",
+                    {"model": request["model"], "stream": True},
+                    parent=iteration_span,
+                )
+                with llm_span:
+                    started_at = time.perf_counter()
+                    first_token_at: float | None = None
+                    stream, cache_hit = await _create_stream(
+                        client, request, response_cache
+                    )
+                    llm_span.set_attribute("cache_hit", cache_hit)
+
+                    response: Response | None = None
+                    function_calls: list[ResponseFunctionToolCall] = []
+                    tool_tasks: list[asyncio.Task[str]] = []
+                    # item id -> call id, argument deltas only carry the item id
+                    call_ids: dict[str, str] = {}
+                    # call id -> arguments streamed so far
+                    arguments: dict[str, StreamingArguments] = {}
+                    output_parser = (
+                        StructuredOutputParser(output_model) if output_model else None
+                    )
+                    try:
+                        async for event in stream:
+                            if (
+                                llm_span.recording
+                                and first_token_at is None
+                                and isinstance(event, _TOKEN_EVENTS)
+                            ):
+                                first_token_at = time.perf_counter()
+                            if isinstance(
+                                event, ResponseReasoningSummaryTextDeltaEvent
+                            ):
+                                yield ReasoningDeltaEvent(delta=event.delta)
+                            elif isinstance(event, ResponseTextDeltaEvent):
+                                yield TextDeltaEvent(delta=event.delta)
+                                if output_parser is not None:
+                                    completed_fields = output_parser.feed(event.delta)
+                                    yield PartialOutputEvent(
+                                        output=output_parser.partial,
+                                        completed_fields=completed_fields,
+                                    )
+                            elif isinstance(event, ResponseOutputItemAddedEvent):
+                                if isinstance(event.item, ResponseFunctionToolCall):
+                                    call_ids[event.item.id or event.item.call_id] = (
+                                        event.item.call_id
+                                    )
+                                    arguments[event.item.call_id] = StreamingArguments()
+                                    yield ToolCallStartedEvent(
+                                        call_id=event.item.call_id, name=event.item.name
+                                    )
+                            elif isinstance(
+                                event, ResponseFunctionCallArgumentsDeltaEvent
+                            ):
+                                call_id = call_ids.get(event.item_id, event.item_id)
+                                call_arguments = arguments.setdefault(
+                                    call_id, StreamingArguments()
+                                )
+                                yield ToolCallArgumentsDeltaEvent(
+                                    call_id=call_id,
+                                    delta=event.delta,
+                                    arguments=call_arguments,
+                                    completed_fields=call_arguments.append(event.delta),
+                                )
+                            elif isinstance(event, ResponseOutputItemDoneEvent):
+                                if isinstance(event.item, ResponseFunctionToolCall):
+                                    call = event.item
+                                    function_calls.append(call)
+                                    if tool_manager is not None:
+                                        # The task copies the context, so the tool
+                                        # call span is a child of the iteration.
+                                        with tracing.use_span(iteration_span):
+                                            tool_tasks.append(
+                                                asyncio.create_task(
+                                                    tool_manager.execute_function(
+                                                        call.name, call.arguments
+                                                    )
+                                                )
+                                            )
+                                    yield ToolCallCompletedEvent(
+                                        call_id=call.call_id,
+                                        name=call.name,
+                                        arguments=call.arguments,
+                                    )
+                            elif isinstance(
+                                event, (ResponseCompletedEvent, ResponseIncompleteEvent)
+                            ):
+                                # An incomplete response, e.g. cut off by
+                                # `max_output_tokens`, is returned as is, like in `run`.
+                                response = event.response
+                            elif isinstance(event, ResponseFailedEvent):
+                                error = event.response.error
+                                raise ResponseStreamError(
+                                    error.message if error else "Response failed",
+                                    error.code if error else None,
+                                )
+                            elif isinstance(event, ResponseErrorEvent):
+                                raise ResponseStreamError(event.message, event.code)
+
+                        if response is None:
+                            raise RuntimeError(
+                                "Stream ended without a completed response"
+                            )
+                        if llm_span.recording:
+                            llm_span.set_attributes(
+                                _stream_attributes(response, started_at, first_token_at)
+                            )
+                        llm_span.end()
+
+                        previous_response_id = response.id
+                        streamed.response = response
+                        streamed.final_output = _final_output(response)
+                        if (
+                            output_parser is not None
+                            and streamed.final_output is not None
+                        ):
+                            streamed.final_output_model = output_parser.result()
+                        yield IterationCompletedEvent(
+                            iteration=current_iteration, response=response
+                        )
+
+                        if not tool_tasks:
+                            break
+
+                        iteration_span.set_attribute(
+                            "function_calls", len(function_calls)
+                        )
+                        results = await asyncio.gather(
+                            *tool_tasks, return_exceptions=True
+                        )
+                    finally:
+                        # Don't leave tools running or the request open if the stream
+                        # failed, the output was invalid or the consumer stopped early.
+                        for task in tool_tasks:
+                            task.cancel()
+                        await stream.close()
+
+                outputs = _function_call_outputs(function_calls, results)
+                for call, output in zip(function_calls, outputs):
+                    yield ToolResultEvent(
+                        call_id=call.call_id, name=call.name, output=output["output"]
+                    )
+                input = outputs  # type: ignore[assignment]
+        else:
+            logger.info("Max iterations reached. Exiting.")
+
+        run_span.set_attribute("iterations", iterations)
+        streamed.is_complete = True
+
+
+_TOKEN_EVENTS = (
+    ResponseTextDeltaEvent,
+    ResponseReasoningSummaryTextDeltaEvent,
+    ResponseFunctionCallArgumentsDeltaEvent,
+)
+
+
+def _stream_attributes(
+    response: Response, started_at: float, first_token_at: float | None
+) -> dict[str, Any]:
+    """Span attributes of a completed stream: TTFT, output tokens/s and usage."""
+    attributes: dict[str, Any] = {
+        "response_id": response.id,
+        **tracing.usage_attributes(response.usage),
+    }
+    if first_token_at is not None:
+        attributes["ttft"] = first_token_at - started_at
+        generation_time = time.perf_counter() - first_token_at
+        if response.usage is not None and generation_time > 0:
+            attributes["tokens_per_second"] = (
+                response.usage.output_tokens / generation_time
+            )
+    return attributes
+
+
+async def _create_stream(
+    client: AsyncOpenAI, request: dict[str, Any], response_cache: ResponseCache | None
+) -> tuple[Any, bool]:
+    """Open a response stream, replayed from `response_cache` if possible.
+
+    Returns:
+        The stream and whether it is a cache hit.
+    """
+    if response_cache is None:
+        return await client.responses.create(**request, stream=True), False
+    from src.response_cache import RecordingStream, ReplayStream
+
+    events = await asyncio.to_thread(response_cache.get_events, request)
+    if events is not None:
+        return ReplayStream(events), True
+    stream = await client.responses.create(**request, stream=True)
+    return RecordingStream(response_cache, request, stream), False
+
 
-        previous_response_id = response.id
-        final_output = None
-
-        for output in response.output:
-            if isinstance(output, ResponseReasoningItem):
-                if output.summary:
-                    for summary_item in output.summary:
-                        logger.info(f"Reasoning summary: {summary_item.text}")
-                else:
-                    logger.info("Reasoning summary: None")
-            elif isinstance(output, ResponseOutputMessage):
-                if isinstance(output.content[0], ResponseOutputText):
-                    logger.info(f"Final response: {output.content[0].text}")
-                    final_output = output.content[0].text
-                    agent_should_stop = True
-                else:
-                    logger.warning(f"Unsupported output type: {output.content[0]}")
-            else:
-                logger.warning(f"Unsupported output type: {output}")
-
-        breakpoint()
-        if agent_should_stop:
-            break
-
-        current_iteration += 1
-    return response, final_output
+def _final_output(response: Response) -> str | None:
+    """Return the text of the last output message in `response`, if any."""
+    final_output = None
+    for output in response.output:
+        if isinstance(output, ResponseOutputMessage) and isinstance(
+            output.content[0], ResponseOutputText
+        ):
+            final_output = output.content[0].text
+    return final_output
@@ -0,0 +1,257 @@
+import json
+import re
+from typing import Any
+
+_STRING_SPECIAL = re.compile(r'["\\]')
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+
+class PartialJSONParser:
+    """Incremental JSON parser exposing the partially parsed value after every chunk.
+
+    Each call to `feed` only looks at the new chunk, so parsing a document streamed in
+    many small deltas is linear in its size. Objects and arrays are visible as soon as
+    they open and are filled in place. Strings are visible while they stream; numbers,
+    booleans and null only once they're complete.
+    """
+
+    def __init__(self) -> None:
+        self._root: Any = None
+        self._stack: list[dict[str, Any] | list[Any]] = []
+        # Key or index of each open container in its parent, used to report completed
+        # fields.
+        self._frame_keys: list[str | int | None] = []
+        self._pending_key: str | None = None
+        self._state = "value"
+        self._string_chunks: list[str] = []
+        self._string_is_key = False
+        self._string_slot: tuple[Any, str | int | None] | None = None
+        self._string_has_unicode_escape = False
+        self._escape: str | None = None
+        self._scalar: list[str] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether a complete JSON value has been parsed."""
+        return self._state == "done"
+
+    @property
+    def value(self) -> Any:
+        """The value parsed so far, including the string currently being streamed."""
+        if self._state == "string" and not self._string_is_key:
+            partial = "".join(self._string_chunks)
+            self._string_chunks = [partial]
+            self._write_string(partial)
+        return self._root
+
+    def feed(self, chunk: str) -> list[str]:
+        """Parse the next chunk of JSON text.
+
+        Returns:
+            Names of top-level object fields whose values were completed by this chunk.
+
+        Raises:
+            ValueError: If the text is not valid JSON.
+        """
+        completed: list[str] = []
+        i = 0
+        n = len(chunk)
+        while i < n:
+            state = self._state
+            if state == "string":
+                i = self._feed_string(chunk, i, completed)
+                continue
+            char = chunk[i]
+            if state == "scalar":
+                if char in _SCALAR_END:
+                    self._finish_scalar(completed)
+                else:
+                    self._scalar.append(char)
+                    i += 1
+                continue
+            i += 1
+            if char in _WHITESPACE:
+                continue
+            if state == "value":
+                self._start_value(char)
+            elif state == "value_or_end":
+                if char == "]":
+                    self._close(char, completed)
+                else:
+                    self._start_value(char)
+            elif state in ("key", "key_or_end"):
+                if char == '"':
+                    self._start_string(is_key=True)
+                elif char == "}" and state == "key_or_end":
+                    self._close(char, completed)
+                else:
+                    raise ValueError(f"Expected an object key, got {char!r}")
+            elif state == "colon":
+                if char != ":":
+                    raise ValueError(f"Expected ':', got {char!r}")
+                self._state = "value"
+            elif state == "after_value":
+                if char == ",":
+                    self._state = (
+                        "key" if isinstance(self._stack[-1], dict) else "value"
+                    )
+                elif char in "}]":
+                    self._close(char, completed)
+                else:
+                    raise ValueError(f"Expected ',' or a closing bracket, got {char!r}")
+            else:
+                raise ValueError(f"Unexpected {char!r} after the end of the JSON value")
+        return completed
+
+    def _feed_string(self, chunk: str, i: int, completed: list[str]) -> int:
+        if self._escape is not None:
+            char = chunk[i]
+            if self._escape == "":
+                if char == "u":
+                    self._escape = "u"
+                    self._string_has_unicode_escape = True
+                elif char in _ESCAPES:
+                    self._string_chunks.append(_ESCAPES[char])
+                    self._escape = None
+                else:
+                    raise ValueError(f"Invalid escape '\\{char}' in a string")
+            else:
+                if char not in _HEX_DIGITS:
+                    raise ValueError(f"Invalid \\u escape, got {char!r}")
+                self._escape += char
+                if len(self._escape) == 5:
+                    self._string_chunks.append(chr(int(self._escape[1:], 16)))
+                    self._escape = None
+            return i + 1
+
+        match = _STRING_SPECIAL.search(chunk, i)
+        if match is None:
+            self._string_chunks.append(chunk[i:])
+            return len(chunk)
+        end = match.start()
+        if end > i:
+            self._string_chunks.append(chunk[i:end])
+        if chunk[end] == "\\":
+            self._escape = ""
+        else:
+            self._finish_string(completed)
+        return end + 1
+
+    def _start_value(self, char: str) -> None:
+        if char == "{":
+            self._open({})
+            self._state = "key_or_end"
+        elif char == "[":
+            self._open([])
+            self._state = "value_or_end"
+        elif char == '"':
+            self._start_string(is_key=False)
+            self._string_slot = self._add_value("")
+        elif char in _SCALAR_END or char == ":":
+            # Also rejects a trailing comma in an array, where a value must follow.
+            raise ValueError(f"Expected a value, got {char!r}")
+        else:
+            self._scalar = [char]
+            self._state = "scalar"
+
+    def _start_string(self, is_key: bool) -> None:
+        self._state = "string"
+        self._string_is_key = is_key
+        self._string_chunks = []
+        self._string_has_unicode_escape = False
+
+    def _finish_string(self, completed: list[str]) -> None:
+        value = "".join(self._string_chunks)
+        if self._string_has_unicode_escape:
+            # Join surrogate pairs that were decoded one \u escape at a time. Lone
+            # surrogates are kept, as json.loads does.
+            value = value.encode("utf-16", "surrogatepass").decode(
+                "utf-16", "surrogatepass"
+            )
+        self._string_chunks = []
+        if self._string_is_key:
+            self._pending_key = value
+            self._state = "colon"
+            return
+        assert self._string_slot is not None
+        self._write_string(value)
+        _, key = self._string_slot
+        self._string_slot = None
+        self._value_done(completed, key)
+
+    def _write_string(self, value: str) -> None:
+        assert self._string_slot is not None
+        container, key = self._string_slot
+        if container is None:
+            self._root = value
+        else:
+            container[key] = value
+
+    def _finish_scalar(self, completed: list[str]) -> None:
+        text = "".join(self._scalar)
+        self._scalar = []
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON value {text!r}") from None
+        _, key = self._add_value(value)
+        self._value_done(completed, key)
+
+    def _add_value(self, value: Any) -> tuple[Any, str | int | None]:
+        """Put a new value in its parent container and return where it was stored."""
+        if not self._stack:
+            self._root = value
+            return (None, None)
+        top = self._stack[-1]
+        if isinstance(top, dict):
+            assert self._pending_key is not None
+            top[self._pending_key] = value
+            return (top, self._pending_key)
+        top.append(value)
+        return (top, len(top) - 1)
+
+    def _open(self, container: dict[str, Any] | list[Any]) -> None:
+        _, key = self._add_value(container)
+        self._stack.append(container)
+        self._frame_keys.append(key)
+
+    def _close(self, char: str, completed: list[str]) -> None:
+        if isinstance(self._stack[-1], dict) != (char == "}"):
+            expected = "}" if isinstance(self._stack[-1], dict) else "]"
+            raise ValueError(
+                f"Expected {expected!r} to close the container, got {char!r}"
+            )
+        self._stack.pop()
+        key = self._frame_keys.pop()
+        self._value_done(completed, key)
+
+    def _value_done(self, completed: list[str], key: str | int | None) -> None:
+        if not self._stack:
+            self._state = "done"
+            return
+        if (
+            len(self._stack) == 1
+            and isinstance(self._stack[0], dict)
+            and isinstance(key, str)
+        ):
+            completed.append(key)
+        self._state = "after_value"
+
+
+def parse_partial_json(text: str) -> Any:
+    """Parse a possibly incomplete JSON document and return what was parsed so far."""
+    parser = PartialJSONParser()
+    parser.feed(text)
+    return parser.value
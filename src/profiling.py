@@ -0,0 +1,309 @@
+import cProfile
+import contextvars
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import FrameType
+from typing import Any, ContextManager, Iterator, Literal
+
+logger = logging.getLogger(__name__)
+
+ProfileMode = Literal["cprofile", "sampling", "tracemalloc"]
+"""How a profiled run is measured.
+
+- "cprofile": deterministic profile of the event loop thread, dumped as a `.prof` file.
+- "sampling": stacks of all threads sampled at an interval, dumped as folded stacks for
+  flame graph tools.
+- "tracemalloc": allocations, dumped as the top allocating lines.
+"""
+
+_current_profile: contextvars.ContextVar["RunProfile | None"] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+@dataclass
+class PhaseStats:
+    """CPU time, wall time and allocations of one phase, summed over its calls.
+
+    CPU time is process-wide, so it includes tools running on worker threads as well as
+    other tasks that ran on the event loop while the phase was awaiting.
+    """
+
+    calls: int = 0
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    allocated_bytes: int = 0
+
+    def add(self, other: "PhaseStats") -> None:
+        self.calls += other.calls
+        self.cpu_time += other.cpu_time
+        self.wall_time += other.wall_time
+        self.allocated_bytes += other.allocated_bytes
+
+
+@dataclass
+class RunProfile:
+    """Measurements of one profiled run."""
+
+    id: str
+    mode: ProfileMode
+    phases: dict[str, PhaseStats] = field(
+        default_factory=lambda: defaultdict(PhaseStats)
+    )
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Add the CPU time, wall time and net allocations of the block to `name`."""
+        tracing_memory = tracemalloc.is_tracing()
+        memory_before = tracemalloc.get_traced_memory()[0] if tracing_memory else 0
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        try:
+            yield
+        finally:
+            stats = self.phases[name]
+            stats.calls += 1
+            stats.cpu_time += time.process_time() - cpu_before
+            stats.wall_time += time.perf_counter() - wall_before
+            if tracing_memory:
+                stats.allocated_bytes += (
+                    tracemalloc.get_traced_memory()[0] - memory_before
+                )
+
+
+class _StackSampler(threading.Thread):
+    """Samples the stacks of all other threads at a fixed interval."""
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="profiling-sampler", daemon=True)
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        names = {}
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == self.ident:
+                    continue
+                if thread_id not in names:
+                    names = {
+                        thread.ident: thread.name for thread in threading.enumerate()
+                    }
+                self.stacks[_fold(names.get(thread_id, str(thread_id)), frame)] += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+
+def _fold(thread_name: str, frame: FrameType | None) -> str:
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join([thread_name, *reversed(stack)])
+
+
+class Profiler:
+    """Profiles selected runs and writes a report per run.
+
+    A run is profiled when it is forced (`run(..., profile=True)`) or picked with
+    probability `sample_rate`. Only one run is profiled at a time, because cProfile, the
+    sampler and tracemalloc all measure the whole process; runs that start while another
+    is being profiled are skipped.
+
+    Per-phase and per-tool measurements are also summed over all profiled runs in
+    `phases` and can be written with `dump_summary()` at any time.
+    """
+
+    def __init__(
+        self,
+        mode: ProfileMode = "cprofile",
+        sample_rate: float = 0.0,
+        output_dir: str | Path = "profiles",
+        sampling_interval: float = 0.005,
+        top_allocations: int = 25,
+    ) -> None:
+        """Initialize the profiler.
+
+        Args:
+            mode: How profiled runs are measured. See `ProfileMode`.
+            sample_rate: Fraction of runs profiled without being forced.
+            output_dir: Where reports are written.
+            sampling_interval: Seconds between stack samples in "sampling" mode.
+            top_allocations: Number of allocating lines reported in "tracemalloc" mode.
+        """
+        self.mode = mode
+        self.sample_rate = sample_rate
+        self.output_dir = Path(output_dir)
+        self.sampling_interval = sampling_interval
+        self.top_allocations = top_allocations
+        self.phases: dict[str, PhaseStats] = defaultdict(PhaseStats)
+        self.runs_profiled = 0
+        self._active = False
+
+    def should_profile(self, force: bool = False) -> bool:
+        """Decide whether a run that is starting gets profiled."""
+        if self._active:
+            if force:
+                logger.warning("Another run is being profiled; skipping forced profile")
+            return False
+        return force or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    @contextmanager
+    def profile_run(self) -> Iterator[RunProfile]:
+        """Profile the block as one run and write its report when it ends."""
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        profile = RunProfile(id=profile_id, mode=self.mode)
+        self._active = True
+        token = _current_profile.set(profile)
+        collector = self._start()
+        try:
+            with profile.phase("run"):
+                yield profile
+        finally:
+            report = self._stop(collector)
+            try:
+                _current_profile.reset(token)
+            except ValueError:
+                # Ended from another context, e.g. a finalized async generator.
+                pass
+            self._active = False
+            self.runs_profiled += 1
+            for name, stats in profile.phases.items():
+                self.phases[name].add(stats)
+            self._write_report(profile, report)
+
+    def _start(self) -> Any:
+        if self.mode == "cprofile":
+            collector = cProfile.Profile()
+            collector.enable()
+            return collector
+        if self.mode == "sampling":
+            sampler = _StackSampler(self.sampling_interval)
+            sampler.start()
+            return sampler
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        return started_tracing, tracemalloc.take_snapshot()
+
+    def _stop(self, collector: Any) -> Any:
+        if self.mode == "cprofile":
+            collector.disable()
+            return collector
+        if self.mode == "sampling":
+            collector.stop()
+            return collector.stacks
+        started_tracing, before = collector
+        after = tracemalloc.take_snapshot()
+        if started_tracing:
+            tracemalloc.stop()
+        return after.compare_to(before, "lineno")[: self.top_allocations]
+
+    def _write_report(self, profile: RunProfile, report: Any) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        base = self.output_dir / profile.id
+        if self.mode == "cprofile":
+            report.dump_stats(base.with_suffix(".prof"))
+        elif self.mode == "sampling":
+            with base.with_suffix(".folded").open("w") as f:
+                for stack, count in report.most_common():
+                    f.write(f"{stack} {count}\n")
+        else:
+            base.with_suffix(".txt").write_text(
+                "\n".join(str(stat) for stat in report) + "\n"
+            )
+        summary = {
+            "id": profile.id,
+            "mode": profile.mode,
+            "phases": _phases_dict(profile.phases),
+        }
+        base.with_suffix(".json").write_text(json.dumps(summary, indent=2))
+        logger.info("Profile written to %s.*", base)
+
+    def dump_summary(self, path: str | Path | None = None) -> Path:
+        """Write the per-phase and per-tool totals of all profiled runs so far."""
+        path = Path(path) if path is not None else self.output_dir / "summary.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        summary = {
+            "runs_profiled": self.runs_profiled,
+            "phases": _phases_dict(self.phases),
+        }
+        path.write_text(json.dumps(summary, indent=2))
+        return path
+
+    def reset(self) -> None:
+        """Forget the totals of previous runs."""
+        self.phases.clear()
+        self.runs_profiled = 0
+
+
+def _phases_dict(phases: dict[str, PhaseStats]) -> dict[str, dict[str, Any]]:
+    result = {name: asdict(stats) for name, stats in sorted(phases.items())}
+    if "run" in phases:
+        # Time in the run outside the LLM calls and tools: the orchestrator's own loop.
+        own = PhaseStats(**asdict(phases["run"]))
+        for name in ["llm", "tools"]:
+            if name in phases:
+                own.cpu_time -= phases[name].cpu_time
+                own.wall_time -= phases[name].wall_time
+                own.allocated_bytes -= phases[name].allocated_bytes
+        result["orchestrator"] = asdict(own)
+    return result
+
+
+_profiler: Profiler | None = None
+_default_profiler: Profiler | None = None
+
+
+def set_profiler(profiler: Profiler | None) -> None:
+    """Profile sampled and forced runs with `profiler`, or stop profiling with None."""
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler() -> Profiler | None:
+    """Return the active profiler, or None if profiling is disabled."""
+    return _profiler
+
+
+_NULL_CONTEXT = nullcontext()
+
+
+def profile_run(force: bool = False) -> ContextManager[Any]:
+    """Context manager that profiles a run if the active profiler selects it.
+
+    A forced run is profiled with a default `Profiler` when none is set.
+    """
+    global _default_profiler
+    profiler = _profiler
+    if profiler is None:
+        if not force:
+            return _NULL_CONTEXT
+        if _default_profiler is None:
+            _default_profiler = Profiler()
+        profiler = _default_profiler
+    if not profiler.should_profile(force):
+        return _NULL_CONTEXT
+    return profiler.profile_run()
+
+
+def phase(name: str) -> ContextManager[Any]:
+    """Context manager measuring phase `name` of the run being profiled, if any."""
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_CONTEXT
+    return profile.phase(name)
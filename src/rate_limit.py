@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseUsage
+
+
+class TokenBucket:
+    """Token bucket that refills continuously at a per-minute rate.
+
+    Waiters are served in FIFO order. The level may go negative when actual usage turns
+    out higher than what was reserved; later callers then wait until the debt is
+    refilled.
+    """
+
+    def __init__(self, per_minute: float, capacity: float | None = None) -> None:
+        """Initialize the bucket.
+
+        Args:
+            per_minute: Refill rate in units per minute.
+            capacity: Maximum burst size. Defaults to one minute's worth of units.
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(
+            self.capacity, self._level + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        """Units currently available."""
+        self._refill()
+        return self._level
+
+    async def acquire(self, amount: float = 1.0) -> float:
+        """Wait until `amount` units are available and take them.
+
+        Returns:
+            The units taken. Amounts over the capacity could never be available, so
+            only the capacity is taken for them.
+        """
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._level >= amount:
+                    self._level -= amount
+                    return amount
+                await asyncio.sleep((amount - self._level) / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Take `amount` more units, or give them back if negative, without waiting."""
+        self._refill()
+        self._level = min(self.capacity, self._level - amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for `responses.create` calls.
+
+    Token usage isn't known before a request is made, so each request reserves an
+    estimate and the difference is settled with the `usage` of the response.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float | None = None,
+        tokens_per_minute: float | None = None,
+        estimated_tokens_per_request: int = 1000,
+    ) -> None:
+        """Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum request rate. If None, requests aren't limited.
+            tokens_per_minute: Maximum token rate. If None, tokens aren't limited.
+            estimated_tokens_per_request: Tokens reserved before each request.
+        """
+        self.requests = (
+            TokenBucket(requests_per_minute) if requests_per_minute else None
+        )
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.estimated_tokens_per_request = estimated_tokens_per_request
+
+    async def acquire(self) -> float:
+        """Wait for capacity for one request.
+
+        Returns:
+            The number of tokens reserved, to be passed to `record_usage`.
+        """
+        if self.requests is not None:
+            await self.requests.acquire()
+        if self.tokens is None:
+            return 0
+        return await self.tokens.acquire(self.estimated_tokens_per_request)
+
+    def record_usage(self, reserved: float, usage: ResponseUsage | None) -> None:
+        """Settle a reservation with the tokens the response actually used."""
+        if self.tokens is None or usage is None:
+            return
+        self.tokens.adjust(usage.total_tokens - reserved)
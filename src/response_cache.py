@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+import pydantic_core
+from openai.types.responses import (
+    Response,
+    ResponseCompletedEvent,
+    ResponseIncompleteEvent,
+    ResponseStreamEvent,
+)
+from pydantic import TypeAdapter
+
+_stream_event_adapter: TypeAdapter[ResponseStreamEvent] = TypeAdapter(
+    ResponseStreamEvent
+)
+
+
+class ResponseCache:
+    """On-disk cache of `responses.create` results, keyed by a hash of the payload.
+
+    Entries are stored in SQLite and evicted least recently used first once the total
+    size exceeds `max_bytes`; larger payloads aren't cached. Streamed responses are
+    stored as their list of events so they can be replayed as a stream.
+
+    Methods are blocking and thread-safe; the orchestrator calls them from a worker
+    thread so disk access doesn't stall the event loop. Hits don't write to the
+    database: their access times are kept in memory and written with the next stored
+    entry or on `close()`.
+    """
+
+    def __init__(
+        self, path: str | Path = ".cache/responses.sqlite3", max_bytes: int = 1 << 30
+    ):
+        """Initialize the cache.
+
+        Args:
+            path: SQLite database file. Parent directories are created if needed.
+            max_bytes: Maximum total size of the cached payloads.
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, body BLOB NOT NULL, size INTEGER NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_access"
+            " ON responses (last_access)"
+        )
+        self._db.commit()
+        self._total_bytes = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+        # key -> last access time of hits not yet written to the database
+        self._accessed: dict[str, float] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(request: dict[str, Any], stream: bool = False) -> str:
+        """Hash the canonical JSON of a request payload."""
+        payload = pydantic_core.to_jsonable_python(request, exclude_none=True)
+        canonical = json.dumps(
+            payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        digest = hashlib.sha256(canonical.encode()).hexdigest()
+        return f"{digest}:stream" if stream else digest
+
+    def get(self, request: dict[str, Any]) -> Response | None:
+        """Return the cached response for a request, if any."""
+        body = self._load(self.make_key(request))
+        return Response.model_validate_json(body) if body is not None else None
+
+    def set(self, request: dict[str, Any], response: Response) -> None:
+        """Cache the response to a request."""
+        self._store(self.make_key(request), response.model_dump_json().encode())
+
+    def get_events(self, request: dict[str, Any]) -> list[ResponseStreamEvent] | None:
+        """Return the recorded stream events for a request, if any."""
+        body = self._load(self.make_key(request, stream=True))
+        if body is None:
+            return None
+        return [
+            _stream_event_adapter.validate_python(event) for event in json.loads(body)
+        ]
+
+    def set_events(
+        self, request: dict[str, Any], events: list[ResponseStreamEvent]
+    ) -> None:
+        """Record the stream events of a request."""
+        body = pydantic_core.to_json(
+            [event.model_dump(mode="json") for event in events]
+        )
+        self._store(self.make_key(request, stream=True), body)
+
+    def _load(self, key: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._accessed[key] = time.time()
+            return row[0]
+
+    def _store(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            # It could only be stored by evicting everything else, itself included.
+            return
+        with self._lock:
+            old = self._db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None:
+                self._total_bytes -= old[0]
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, body, size, last_access)"
+                " VALUES (?, ?, ?, ?)",
+                (key, body, len(body), time.time()),
+            )
+            self._accessed.pop(key, None)
+            self._total_bytes += len(body)
+            # Eviction goes by last access, so hits must be written first.
+            self._write_access_times()
+            self._evict()
+            self._db.commit()
+
+    def _write_access_times(self) -> None:
+        if self._accessed:
+            self._db.executemany(
+                "UPDATE responses SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes:
+            row = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 1"
+            ).fetchone()
+            if row is None:
+                break
+            self._db.execute("DELETE FROM responses WHERE key = ?", (row[0],))
+            self._total_bytes -= row[1]
+            self.evictions += 1
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit, miss and eviction counters plus the number and total size of entries."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": self._total_bytes,
+        }
+
+    def clear(self) -> None:
+        """Remove all cached responses."""
+        with self._lock:
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._accessed.clear()
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        """Write pending access times and close the database connection."""
+        with self._lock:
+            self._write_access_times()
+            self._db.commit()
+            self._db.close()
+
+
+class ReplayStream:
+    """Re-emits recorded stream events in place of a live response stream."""
+
+    def __init__(self, events: list[ResponseStreamEvent]) -> None:
+        self._events = events
+
+    async def __aiter__(self) -> AsyncIterator[ResponseStreamEvent]:
+        for event in self._events:
+            yield event
+
+    async def close(self) -> None:
+        pass
+
+
+class RecordingStream:
+    """Passes a live stream through and caches its events if it returns a response."""
+
+    def __init__(
+        self, cache: ResponseCache, request: dict[str, Any], stream: Any
+    ) -> None:
+        self._cache = cache
+        self._request = request
+        self._stream = stream
+
+    async def __aiter__(self) -> AsyncIterator[ResponseStreamEvent]:
+        events: list[ResponseStreamEvent] = []
+        async for event in self._stream:
+            events.append(event)
+            yield event
+            if isinstance(event, (ResponseCompletedEvent, ResponseIncompleteEvent)):
+                await asyncio.to_thread(self._cache.set_events, self._request, events)
+
+    async def close(self) -> None:
+        await self._stream.close()
@@ -1,4 +1,12 @@
-from openai.types.responses import ResponseInputItemParam
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import TYPE_CHECKING, Any, Sequence
+
+from src.tokens import TokenCounter, estimate_tokens
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseInputItemParam
 
 
 class Session:
@@ -6,25 +14,58 @@ class Session:
 
     Stores messages in chronological order to maintain context
     without requiring explicit memory management.
+
+    The token count of every item is computed once when it is added and kept as a
+    running sum, so `get_items(max_tokens=...)` finds the window in O(log n). Change the
+    history through the methods rather than `messages` directly to keep the counts in
+    sync.
     """
 
-    def __init__(self, session_id: str) -> None:
+    def __init__(
+        self, session_id: str, token_counter: TokenCounter = estimate_tokens
+    ) -> None:
+        """Initialize the session.
+
+        Args:
+            session_id: Identifier of the conversation.
+            token_counter: Counts the tokens of an item. Defaults to a length based
+                estimate; see `src.tokens.tiktoken_counter` for exact counts.
+        """
         self.session_id = session_id
+        self.token_counter = token_counter
         self.messages: list[ResponseInputItemParam] = []
+        # _token_prefix[i] is the number of tokens in messages[:i].
+        self._token_prefix: list[int] = [0]
 
-    def get_items(self, limit: int | None = None) -> list[ResponseInputItemParam]:
+    def get_items(
+        self, limit: int | None = None, max_tokens: int | None = None
+    ) -> list[ResponseInputItemParam]:
         """Retrieve the conversation history for this session.
 
         Args:
             limit: Maximum number of items to retrieve. If None, retrieves all items.
                    When specified, returns the latest N items in chronological order.
+            max_tokens: Maximum total tokens of the retrieved items. When specified,
+                   returns the longest tail of the history within the budget. A function
+                   call output is never returned without its function call.
 
         Returns:
             List of input items representing the conversation history
         """
-        if limit is None:
-            return self.messages[:]
-        return self.messages[-limit:]
+        if max_tokens is None:
+            if limit is None:
+                return self.messages[:]
+            return self.messages[max(len(self.messages) - limit, 0) :]
+        # First index whose tail fits: prefix[start] >= total - max_tokens.
+        start = bisect_left(self._token_prefix, self._token_prefix[-1] - max_tokens)
+        if limit is not None:
+            start = max(start, len(self.messages) - limit)
+        return self.messages[complete_tool_calls_start(self.messages, start) :]
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of the whole history, as counted by `token_counter`."""
+        return self._token_prefix[-1]
 
     def add_items(self, items: list[ResponseInputItemParam]) -> None:
         """Add new items to the conversation history.
@@ -32,6 +73,10 @@ class Session:
         Args:
             items: List of input items to add to the history
         """
+        total = self._token_prefix[-1]
+        for item in items:
+            total += self.token_counter(item)
+            self._token_prefix.append(total)
         self.messages.extend(items)
 
     def pop_item(self) -> ResponseInputItemParam | None:
@@ -42,8 +87,67 @@ class Session:
         """
         if not self.messages:
             return None
+        self._token_prefix.pop()
         return self.messages.pop()
 
     def clear_session(self) -> None:
         """Clear all items for this session."""
         self.messages.clear()
+        self._token_prefix = [0]
+
+    def replace_prefix(
+        self,
+        expected: list[ResponseInputItemParam],
+        items: list[ResponseInputItemParam],
+    ) -> bool:
+        """Replace the oldest items with `items`, if they are still `expected`.
+
+        Used to swap older turns for a summary computed in the background. Nothing is
+        changed when the history no longer starts with `expected`, e.g. because it was
+        cleared.
+
+        Returns:
+            Whether the prefix was replaced.
+        """
+        count = len(expected)
+        if self.messages[:count] != expected:
+            return False
+        prefix = [0]
+        for item in items:
+            prefix.append(prefix[-1] + self.token_counter(item))
+        shift = prefix[-1] - self._token_prefix[count]
+        prefix.extend(tokens + shift for tokens in self._token_prefix[count + 1 :])
+        self.messages[:count] = items
+        self._token_prefix = prefix
+        return True
+
+
+def _field(item: Any, name: str) -> Any:
+    if isinstance(item, dict):
+        return item.get(name)
+    return getattr(item, name, None)
+
+
+def complete_tool_calls_start(items: Sequence[Any], start: int) -> int:
+    """Move the start of a window past function call outputs cut off from their calls.
+
+    The API rejects a `function_call_output` whose `function_call` isn't in the input,
+    so when a window would begin between the two, everything up to the orphaned output
+    is dropped as well.
+
+    Returns:
+        The new start, at least `start`.
+    """
+    call_ids = set()
+    for index in range(start, len(items)):
+        item = items[index]
+        item_type = _field(item, "type")
+        if item_type == "function_call":
+            call_ids.add(_field(item, "call_id"))
+        elif (
+            item_type == "function_call_output"
+            and _field(item, "call_id") not in call_ids
+        ):
+            start = index + 1
+            call_ids.clear()
+    return start
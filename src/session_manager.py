@@ -0,0 +1,297 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Protocol
+
+from src.compact_session import CompactSession, ItemCodec
+from src.tokens import TokenCounter, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore(Protocol):
+    """Where the session manager spills sessions evicted from memory.
+
+    Methods are blocking; the manager calls them from a worker thread.
+    """
+
+    def keys(self) -> list[str]: ...
+
+    def get(self, session_id: str) -> bytes | None: ...
+
+    def put(self, session_id: str, data: bytes) -> None: ...
+
+    def delete(self, session_id: str) -> None: ...
+
+    def close(self) -> None: ...
+
+
+class SQLiteSessionStore:
+    """Keeps spilled sessions as one blob per session in a SQLite file."""
+
+    def __init__(self, path: str | Path = ".sessions/spill.sqlite3") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spilled_sessions ("
+            " session_id TEXT PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self._db.commit()
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return [
+                row[0]
+                for row in self._db.execute("SELECT session_id FROM spilled_sessions")
+            ]
+
+    def get(self, session_id: str) -> bytes | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT data FROM spilled_sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row[0] if row is not None else None
+
+    def put(self, session_id: str, data: bytes) -> None:
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO spilled_sessions (session_id, data)"
+                " VALUES (?, ?)",
+                (session_id, data),
+            )
+            self._db.commit()
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM spilled_sessions WHERE session_id = ?", (session_id,)
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+@dataclass
+class _Entry:
+    session: CompactSession
+    memory: int = 0
+
+
+@dataclass
+class _Shard:
+    """Sessions whose id hashes to one shard, with LRU order and memory cap."""
+
+    # Least recently used first.
+    sessions: OrderedDict[str, _Entry] = field(default_factory=OrderedDict)
+    on_disk: set[str] = field(default_factory=set)
+    locks: dict[str, asyncio.Lock] = field(default_factory=dict)
+    lock_users: dict[str, int] = field(default_factory=dict)
+    memory: int = 0
+    eviction_task: asyncio.Task[None] | None = None
+
+
+class SessionManager:
+    """Hosts many sessions in one process under a memory cap.
+
+    Sessions are `CompactSession`s, sharded by a hash of their id. Each shard keeps its
+    sessions in least recently used order and gets an equal part of `max_memory_bytes`.
+    When a shard goes over its part, idle sessions are spilled to `store` by a
+    background task, least recently used first, and transparently loaded again on their
+    next use.
+
+    Use a session through `session()`, which holds a per-session lock, so concurrent
+    turns of one conversation run one after the other while other conversations proceed:
+
+        async with manager.session("conversation_1") as session:
+            session.add_items([...])
+            _, output = await run(session.get_items())
+    """
+
+    def __init__(
+        self,
+        max_memory_bytes: int = 256 * 1024 * 1024,
+        num_shards: int = 16,
+        store: SessionStore | None = None,
+        codec: ItemCodec | None = None,
+        token_counter: TokenCounter = estimate_tokens,
+    ) -> None:
+        """Initialize the manager.
+
+        Args:
+            max_memory_bytes: Approximate memory for the sessions kept in memory.
+            num_shards: Number of shards.
+            store: Where evicted sessions go. Defaults to a `SQLiteSessionStore`.
+                Sessions already in the store are loaded from it on first use.
+            codec: How sessions store their items.
+            token_counter: Token counter of the sessions.
+        """
+        self.max_memory_bytes = max_memory_bytes
+        self.store = store if store is not None else SQLiteSessionStore()
+        self.codec = codec or ItemCodec()
+        self.token_counter = token_counter
+        self._shards = [_Shard() for _ in range(num_shards)]
+        for session_id in self.store.keys():
+            self._shard(session_id).on_disk.add(session_id)
+        self.hits = 0
+        self.reloads = 0
+        self.created = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def _shard(self, session_id: str) -> _Shard:
+        # A stable hash, unlike `hash()`, so the layout is the same in every process.
+        return self._shards[zlib.crc32(session_id.encode()) % len(self._shards)]
+
+    @property
+    def _shard_memory_cap(self) -> int:
+        return self.max_memory_bytes // len(self._shards)
+
+    @asynccontextmanager
+    async def _locked(self, shard: _Shard, session_id: str) -> AsyncIterator[None]:
+        lock = shard.locks.get(session_id)
+        if lock is None:
+            lock = shard.locks[session_id] = asyncio.Lock()
+        shard.lock_users[session_id] = shard.lock_users.get(session_id, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            shard.lock_users[session_id] -= 1
+            if not shard.lock_users[session_id]:
+                del shard.lock_users[session_id]
+                del shard.locks[session_id]
+
+    @asynccontextmanager
+    async def session(self, session_id: str) -> AsyncIterator[CompactSession]:
+        """Lock a session, loading or creating it, and yield it for the block."""
+        shard = self._shard(session_id)
+        async with self._locked(shard, session_id):
+            entry = await self._load(shard, session_id)
+            try:
+                yield entry.session
+            finally:
+                memory = entry.session.memory_estimate
+                shard.memory += memory - entry.memory
+                entry.memory = memory
+        if shard.memory > self._shard_memory_cap and (
+            shard.eviction_task is None or shard.eviction_task.done()
+        ):
+            shard.eviction_task = asyncio.create_task(self._evict(shard))
+
+    async def _load(self, shard: _Shard, session_id: str) -> _Entry:
+        entry = shard.sessions.get(session_id)
+        if entry is not None:
+            self.hits += 1
+            shard.sessions.move_to_end(session_id)
+            return entry
+        data = None
+        if session_id in shard.on_disk:
+            data = await asyncio.to_thread(self.store.get, session_id)
+        if data is not None:
+            session = CompactSession.from_dump(
+                session_id, data, self.codec, self.token_counter
+            )
+            self.reloads += 1
+        else:
+            session = CompactSession(session_id, self.codec, self.token_counter)
+            self.created += 1
+        entry = _Entry(session, session.memory_estimate)
+        shard.sessions[session_id] = entry
+        shard.memory += entry.memory
+        return entry
+
+    async def _evict(self, shard: _Shard) -> None:
+        while shard.memory > self._shard_memory_cap:
+            # The least recently used session that isn't in use.
+            session_id = next(
+                (key for key in shard.sessions if key not in shard.locks), None
+            )
+            if session_id is None:
+                return
+            async with self._locked(shard, session_id):
+                entry = shard.sessions.get(session_id)
+                if entry is None:
+                    continue
+                try:
+                    await asyncio.to_thread(
+                        self.store.put, session_id, entry.session.dump()
+                    )
+                except Exception as e:
+                    logger.warning(
+                        "Spilling session %s failed: %r", session_id, e, exc_info=True
+                    )
+                    return
+                del shard.sessions[session_id]
+                shard.on_disk.add(session_id)
+                shard.memory -= entry.memory
+                self.evictions += 1
+                self.evicted_bytes += entry.memory
+
+    async def delete(self, session_id: str) -> None:
+        """Remove a session from memory and from the store."""
+        shard = self._shard(session_id)
+        async with self._locked(shard, session_id):
+            entry = shard.sessions.pop(session_id, None)
+            if entry is not None:
+                shard.memory -= entry.memory
+            if session_id in shard.on_disk:
+                shard.on_disk.discard(session_id)
+                await asyncio.to_thread(self.store.delete, session_id)
+
+    async def flush(self) -> None:
+        """Write all sessions in memory to the store, keeping them in memory."""
+        for shard in self._shards:
+            for session_id in list(shard.sessions):
+                async with self._locked(shard, session_id):
+                    entry = shard.sessions.get(session_id)
+                    if entry is None:
+                        continue
+                    await asyncio.to_thread(
+                        self.store.put, session_id, entry.session.dump()
+                    )
+                    shard.on_disk.add(session_id)
+
+    async def close(self) -> None:
+        """Write all sessions to the store and close it."""
+        for shard in self._shards:
+            if shard.eviction_task is not None:
+                await shard.eviction_task
+        await self.flush()
+        self.store.close()
+
+    def __contains__(self, session_id: str) -> bool:
+        shard = self._shard(session_id)
+        return session_id in shard.sessions or session_id in shard.on_disk
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Session counts, memory estimates and cache and eviction counters."""
+        in_memory = {key for shard in self._shards for key in shard.sessions}
+        on_disk = {key for shard in self._shards for key in shard.on_disk}
+        return {
+            "sessions": len(in_memory | on_disk),
+            "sessions_in_memory": len(in_memory),
+            "sessions_on_disk_only": len(on_disk - in_memory),
+            "memory_bytes": sum(shard.memory for shard in self._shards),
+            "max_memory_bytes": self.max_memory_bytes,
+            "shard_memory_bytes": [shard.memory for shard in self._shards],
+            "hits": self.hits,
+            "reloads": self.reloads,
+            "created": self.created,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+        }
@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+import pydantic_core
+
+from src.session import complete_tool_calls_start
+from src.tokens import TokenCounter, estimate_tokens
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseInputItemParam
+
+
+class SQLiteSession:
+    """Conversation history of a session, persisted in SQLite. A drop-in for `Session`.
+
+    Items of all sessions live in one table keyed by `(session_id, seq)`, so reading the
+    last items or popping the most recent one is a lookup in the primary key index
+    rather than a scan. The database runs in WAL mode and writes take the write lock up
+    front, so any number of threads or worker processes can share a file, each with its
+    own `SQLiteSession`.
+
+    Items are stored as JSON: response output objects added with `add_items` come back
+    from `get_items` as the equivalent dicts, which the API accepts as input. Each row
+    also keeps the token count of its item and of all items before it, so the start of a
+    `get_items(max_tokens=...)` window is a single index seek.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        path: str | Path = ".sessions/sessions.sqlite3",
+        timeout: float = 30.0,
+        token_counter: TokenCounter = estimate_tokens,
+    ) -> None:
+        """Open the session.
+
+        Args:
+            session_id: Identifier of the conversation.
+            path: SQLite database file. Parent directories are created if needed.
+            timeout: Seconds to wait for another connection's write lock before failing.
+            token_counter: Counts the tokens of an item. Defaults to a length based
+                estimate; see `src.tokens.tiktoken_counter` for exact counts.
+        """
+        self.session_id = session_id
+        self.token_counter = token_counter
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; writes manage their own transactions in `_write`.
+        self._db = sqlite3.connect(self.path, timeout=timeout, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS session_items ("
+            " session_id TEXT NOT NULL, seq INTEGER NOT NULL, item BLOB NOT NULL,"
+            " tokens INTEGER NOT NULL, prefix_tokens INTEGER NOT NULL,"
+            " PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS session_items_prefix_tokens"
+            " ON session_items (session_id, prefix_tokens)"
+        )
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        # BEGIN IMMEDIATE takes the write lock before reading the last seq, so
+        # concurrent writers can't pick the same one.
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._db
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _last(self) -> tuple[int, int] | None:
+        """Return the seq of the most recent item and the token total of the session."""
+        return self._db.execute(
+            "SELECT seq, prefix_tokens + tokens FROM session_items WHERE session_id = ?"
+            " ORDER BY seq DESC LIMIT 1",
+            (self.session_id,),
+        ).fetchone()
+
+    def get_items(
+        self, limit: int | None = None, max_tokens: int | None = None
+    ) -> list[ResponseInputItemParam]:
+        """Retrieve the conversation history for this session.
+
+        Args:
+            limit: Maximum number of items to retrieve. If None, retrieves all items.
+                   When specified, returns the latest N items in chronological order.
+            max_tokens: Maximum total tokens of the retrieved items. When specified,
+                   returns the longest tail of the history within the budget. A function
+                   call output is never returned without its function call.
+
+        Returns:
+            List of input items representing the conversation history
+        """
+        if max_tokens is None:
+            if limit is None:
+                rows = self._db.execute(
+                    "SELECT item FROM session_items WHERE session_id = ? ORDER BY seq",
+                    (self.session_id,),
+                ).fetchall()
+            else:
+                rows = self._db.execute(
+                    "SELECT item FROM session_items WHERE session_id = ?"
+                    " ORDER BY seq DESC LIMIT ?",
+                    (self.session_id, limit),
+                ).fetchall()
+                rows.reverse()
+            return [json.loads(row[0]) for row in rows]
+
+        # Read the total and the window in one snapshot, safe from concurrent writers.
+        self._db.execute("BEGIN")
+        try:
+            last = self._last()
+            if last is None:
+                return []
+            # Prefix sums grow with seq: the window starts at the first item with at
+            # least `total - max_tokens` tokens before it.
+            start = self._db.execute(
+                "SELECT seq FROM session_items"
+                " WHERE session_id = ? AND prefix_tokens >= ?"
+                " ORDER BY prefix_tokens, seq LIMIT 1",
+                (self.session_id, last[1] - max_tokens),
+            ).fetchone()
+            if start is None:
+                return []
+            rows = self._db.execute(
+                "SELECT item FROM session_items WHERE session_id = ? AND seq >= ?"
+                " ORDER BY seq DESC LIMIT ?",
+                (self.session_id, start[0], -1 if limit is None else limit),
+            ).fetchall()
+        finally:
+            self._db.execute("COMMIT")
+        rows.reverse()
+        items = [json.loads(row[0]) for row in rows]
+        return items[complete_tool_calls_start(items, 0) :]
+
+    @property
+    def total_tokens(self) -> int:
+        """Tokens of the whole history, as counted by `token_counter`."""
+        last = self._last()
+        return last[1] if last is not None else 0
+
+    def add_items(self, items: list[ResponseInputItemParam]) -> None:
+        """Add new items to the conversation history in one transaction.
+
+        Args:
+            items: List of input items to add to the history
+        """
+        if not items:
+            return
+        encoded = [pydantic_core.to_json(item, exclude_none=True) for item in items]
+        tokens = [self.token_counter(item) for item in items]
+        with self._write() as db:
+            seq, prefix = self._last() or (-1, 0)
+            rows = []
+            for item, item_tokens in zip(encoded, tokens):
+                seq += 1
+                rows.append((self.session_id, seq, item, item_tokens, prefix))
+                prefix += item_tokens
+            db.executemany(
+                "INSERT INTO session_items"
+                " (session_id, seq, item, tokens, prefix_tokens)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def pop_item(self) -> ResponseInputItemParam | None:
+        """Remove and return the most recent item from the session.
+
+        Returns:
+            The most recent item if it exists, None if the session is empty
+        """
+        with self._write() as db:
+            row = db.execute(
+                "SELECT seq, item FROM session_items WHERE session_id = ?"
+                " ORDER BY seq DESC LIMIT 1",
+                (self.session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "DELETE FROM session_items WHERE session_id = ? AND seq = ?",
+                (self.session_id, row[0]),
+            )
+        return json.loads(row[1])
+
+    def clear_session(self) -> None:
+        """Clear all items for this session."""
+        with self._write() as db:
+            db.execute(
+                "DELETE FROM session_items WHERE session_id = ?", (self.session_id,)
+            )
+
+    def replace_prefix(
+        self,
+        expected: list[ResponseInputItemParam],
+        items: list[ResponseInputItemParam],
+    ) -> bool:
+        """Replace the oldest items with `items` atomically if they are `expected`.
+
+        Used to swap older turns for a summary computed in the background. Nothing is
+        changed when the history no longer starts with `expected`, e.g. because another
+        process compacted or cleared it first.
+
+        Returns:
+            Whether the prefix was replaced.
+        """
+        if not expected:
+            return False
+        encoded = [pydantic_core.to_json(item, exclude_none=True) for item in items]
+        tokens = [self.token_counter(item) for item in items]
+        with self._write() as db:
+            rows = db.execute(
+                "SELECT seq, item, prefix_tokens + tokens FROM session_items"
+                " WHERE session_id = ? ORDER BY seq LIMIT ?",
+                (self.session_id, len(expected)),
+            ).fetchall()
+            if (
+                len(rows) < len(expected)
+                or [json.loads(row[1]) for row in rows] != expected
+            ):
+                return False
+            last_seq, removed_tokens = rows[-1][0], rows[-1][2]
+            db.execute(
+                "DELETE FROM session_items WHERE session_id = ? AND seq <= ?",
+                (self.session_id, last_seq),
+            )
+            # The replacement takes the seqs right before the first item that is kept.
+            prefix = 0
+            new_rows = []
+            for offset, (item, item_tokens) in enumerate(zip(encoded, tokens)):
+                seq = last_seq - len(items) + 1 + offset
+                new_rows.append((self.session_id, seq, item, item_tokens, prefix))
+                prefix += item_tokens
+            db.executemany(
+                "INSERT INTO session_items"
+                " (session_id, seq, item, tokens, prefix_tokens)"
+                " VALUES (?, ?, ?, ?, ?)",
+                new_rows,
+            )
+            db.execute(
+                "UPDATE session_items SET prefix_tokens = prefix_tokens + ?"
+                " WHERE session_id = ? AND seq > ?",
+                (prefix - removed_tokens, self.session_id, last_seq),
+            )
+        return True
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._db.close()
@@ -0,0 +1,186 @@
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Literal, Union
+
+from openai.types.responses import Response
+from pydantic import BaseModel
+
+from src.partial_json import PartialJSONParser
+
+
+class StreamingArguments:
+    """Accumulates the streamed JSON arguments of a function call.
+
+    Deltas are kept in a list and joined once, so building large arguments is linear in
+    their size. Each delta is also fed to an incremental parser, so fields like
+    `file_path` can be read from `partial` before the rest of the arguments have
+    streamed.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[str] = []
+        self._parser = PartialJSONParser()
+        self._parse_error: ValueError | None = None
+        self.completed_fields: list[str] = []
+
+    def append(self, delta: str) -> list[str]:
+        """Add a delta and return the top-level fields it completed."""
+        self._chunks.append(delta)
+        if self._parse_error is not None:
+            return []
+        try:
+            completed = self._parser.feed(delta)
+        except ValueError as e:
+            # Keep accumulating the raw text; the model may still produce something
+            # usable.
+            self._parse_error = e
+            return []
+        self.completed_fields.extend(completed)
+        return completed
+
+    @property
+    def partial(self) -> Any:
+        """The arguments parsed so far, or None if they aren't valid JSON."""
+        if self._parse_error is not None:
+            return None
+        return self._parser.value
+
+    @property
+    def text(self) -> str:
+        """The raw arguments text received so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+
+class ResponseStreamError(RuntimeError):
+    """The response stream reported that the response failed."""
+
+    def __init__(self, message: str, code: str | None = None) -> None:
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class IterationStartedEvent:
+    """A new `responses.create` call is about to be made."""
+
+    iteration: int
+    type: Literal["iteration_started"] = "iteration_started"
+
+
+@dataclass
+class ReasoningDeltaEvent:
+    """A chunk of the reasoning summary."""
+
+    delta: str
+    type: Literal["reasoning_delta"] = "reasoning_delta"
+
+
+@dataclass
+class TextDeltaEvent:
+    """A chunk of the assistant's output text."""
+
+    delta: str
+    type: Literal["text_delta"] = "text_delta"
+
+
+@dataclass
+class PartialOutputEvent:
+    """The structured output parsed so far, sent after every output text delta.
+
+    Only emitted when `run_streamed` is given an `output_model`. `completed_fields`
+    lists the fields this delta completed; they have already been validated.
+    """
+
+    output: BaseModel
+    completed_fields: list[str]
+    type: Literal["partial_output"] = "partial_output"
+
+
+@dataclass
+class ToolCallStartedEvent:
+    """The model started a function call. Its arguments follow as deltas."""
+
+    call_id: str
+    name: str
+    type: Literal["tool_call_started"] = "tool_call_started"
+
+
+@dataclass
+class ToolCallArgumentsDeltaEvent:
+    """A chunk of a function call's JSON arguments.
+
+    `arguments` holds everything received so far for the call, including the partially
+    parsed object, and `completed_fields` the top-level fields this chunk completed.
+    """
+
+    call_id: str
+    delta: str
+    arguments: StreamingArguments
+    completed_fields: list[str]
+    type: Literal["tool_call_arguments_delta"] = "tool_call_arguments_delta"
+
+
+@dataclass
+class ToolCallCompletedEvent:
+    """The model finished a function call and its arguments are complete."""
+
+    call_id: str
+    name: str
+    arguments: str
+    type: Literal["tool_call_completed"] = "tool_call_completed"
+
+
+@dataclass
+class ToolResultEvent:
+    """A function call was executed and its output will be sent to the model."""
+
+    call_id: str
+    name: str
+    output: str
+    type: Literal["tool_result"] = "tool_result"
+
+
+@dataclass
+class IterationCompletedEvent:
+    """A `responses.create` call finished streaming."""
+
+    iteration: int
+    response: Response
+    type: Literal["iteration_completed"] = "iteration_completed"
+
+
+StreamEvent = Union[
+    IterationStartedEvent,
+    ReasoningDeltaEvent,
+    TextDeltaEvent,
+    PartialOutputEvent,
+    ToolCallStartedEvent,
+    ToolCallArgumentsDeltaEvent,
+    ToolCallCompletedEvent,
+    ToolResultEvent,
+    IterationCompletedEvent,
+]
+
+
+class StreamedRun:
+    """Handle to a streaming run.
+
+    Iterate `stream_events()` to drive the run. Once the stream is exhausted, `response`
+    holds the final `Response` and `final_output` the final output text. With an output
+    model, `final_output_model` holds the validated output.
+    """
+
+    def __init__(self) -> None:
+        self.response: Response | None = None
+        self.final_output: str | None = None
+        self.final_output_model: BaseModel | None = None
+        self.is_complete = False
+        self._events: AsyncIterator[StreamEvent] | None = None
+
+    def stream_events(self) -> AsyncIterator[StreamEvent]:
+        """Return the events of the run. Can only be consumed once."""
+        if self._events is None:
+            raise RuntimeError("Stream events have already been consumed")
+        events, self._events = self._events, None
+        return events
@@ -0,0 +1,117 @@
+from typing import Annotated, Any, Generic, TypeVar
+
+from openai.types.responses import (
+    ResponseFormatTextJSONSchemaConfigParam,
+    ResponseTextConfigParam,
+)
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from src.partial_json import PartialJSONParser
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class StructuredOutputError(ValueError):
+    """The streamed output can't match the output model."""
+
+    def __init__(self, message: str, field: str | None = None) -> None:
+        super().__init__(message)
+        self.field = field
+
+
+def output_type_for(
+    model: type[BaseModel], strict: bool = False
+) -> ResponseTextConfigParam:
+    """Build the `text` config that asks the model for JSON matching `model`."""
+    return ResponseTextConfigParam(
+        format=ResponseFormatTextJSONSchemaConfigParam(
+            type="json_schema",
+            name=model.__name__,
+            schema=model.model_json_schema(),
+            strict=strict,
+        ),
+    )
+
+
+class StructuredOutputParser(Generic[T]):
+    """Parses streamed JSON output text into progressively filled instances of a model.
+
+    Every top-level field is validated as soon as its value closes, so a schema
+    violation is reported while the rest of the output is still being generated.
+    """
+
+    def __init__(self, model: type[T]) -> None:
+        self.model = model
+        # One compiled validator per field, built once and reused for every delta.
+        self._field_adapters: dict[str, TypeAdapter[Any]] = {}
+        for name, field in model.model_fields.items():
+            annotation: Any = field.annotation
+            if field.metadata:
+                # Keep constraints such as Field(gt=0) that pydantic stores as metadata.
+                annotation = Annotated[(annotation, *field.metadata)]
+            self._field_adapters[name] = TypeAdapter(annotation)
+        self._parser = PartialJSONParser()
+        self._validated: dict[str, Any] = {}
+
+    def feed(self, delta: str) -> list[str]:
+        """Parse the next chunk of output text.
+
+        Returns:
+            The fields that were completed and validated by this chunk.
+
+        Raises:
+            StructuredOutputError: If the text isn't JSON or a completed field is
+                invalid.
+        """
+        try:
+            completed = self._parser.feed(delta)
+        except ValueError as e:
+            raise StructuredOutputError(f"Output is not valid JSON: {e}") from e
+        value = self._parser.value
+        if value is None:
+            return completed
+        if not isinstance(value, dict):
+            raise StructuredOutputError("Output is not a JSON object")
+
+        for name in completed:
+            adapter = self._field_adapters.get(name)
+            if adapter is None:
+                if self.model.model_config.get("extra") == "forbid":
+                    raise StructuredOutputError(
+                        f"Unexpected field '{name}'", field=name
+                    )
+                continue
+            try:
+                self._validated[name] = adapter.validate_python(value[name])
+            except ValidationError as e:
+                raise StructuredOutputError(
+                    f"Invalid value for '{name}': {e}", field=name
+                ) from e
+        return completed
+
+    @property
+    def partial(self) -> T:
+        """An instance holding the fields received so far.
+
+        Completed fields are validated; fields that are still streaming hold their raw
+        partial value and missing fields are left unset.
+        """
+        raw = self._parser.value or {}
+        values = {
+            name: value for name, value in raw.items() if name in self._field_adapters
+        }
+        values.update(self._validated)
+        return self.model.model_construct(_fields_set=set(values), **values)
+
+    def result(self) -> T:
+        """Validate the complete output against the model."""
+        if not self._parser.done:
+            raise StructuredOutputError(
+                "Output ended before the JSON object was complete"
+            )
+        try:
+            return self.model.model_validate(self._parser.value)
+        except ValidationError as e:
+            raise StructuredOutputError(
+                f"Output doesn't match {self.model.__name__}: {e}"
+            ) from e
@@ -0,0 +1,49 @@
+import json
+from typing import Any, Callable
+
+TokenCounter = Callable[[Any], int]
+"""Counts the input tokens of a conversation item, a param dict or an output object."""
+
+
+def _to_jsonable(value: Any) -> Any:
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json", exclude_none=True)
+    return str(value)
+
+
+def estimate_tokens(item: Any) -> int:
+    """Estimate the tokens of an item as a quarter of the length of its JSON.
+
+    This is the usual rule of thumb for English text and needs no tokenizer. It
+    overcounts the JSON keys and undercounts non-Latin scripts; use `tiktoken_counter()`
+    when the budget has to be exact.
+    """
+    text = json.dumps(
+        item, default=_to_jsonable, ensure_ascii=False, separators=(",", ":")
+    )
+    return -(-len(text) // 4)
+
+
+def tiktoken_counter(encoding_name: str = "o200k_base") -> TokenCounter:
+    """Return a counter that tokenizes the JSON of an item with tiktoken.
+
+    Args:
+        encoding_name: tiktoken encoding. "o200k_base" is used by the GPT-4o, GPT-4.1
+            and o-series models.
+    """
+    try:
+        import tiktoken  # type: ignore[import-not-found]
+    except ImportError:
+        # tiktoken is an optional dependency, installed with the `tokens` extra.
+        raise ImportError(
+            "Counting tokens with tiktoken requires `pip install tiktoken`"
+        )
+    encoding = tiktoken.get_encoding(encoding_name)
+
+    def count(item: Any) -> int:
+        text = json.dumps(
+            item, default=_to_jsonable, ensure_ascii=False, separators=(",", ":")
+        )
+        return len(encoding.encode(text, disallowed_special=()))
+
+    return count
@@ -1,26 +1,80 @@
-import json
+from __future__ import annotations
+
+import asyncio
+import inspect
 import os
-from typing import Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Literal
 import logging
 
-# Configure logging
-from openai import AsyncOpenAI
-from openai.types.responses import (
-    FunctionTool,
-)
+from src import profiling, tracing
+from src.function_schema import FunctionSchema, function_schema
+from src.tool_cache import ToolResultCache
+from src.tool_serializer import ResultSerializer
+
+if TYPE_CHECKING:
+    from openai.types.responses import FunctionTool
 
 
-async_client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
+ExecutionMode = Literal["inline", "thread", "process"]
+"""Where a sync tool runs: on the event loop thread, a thread pool or a process pool."""
+
+
+@dataclass
+class RegisteredFunction:
+    """A registered tool function and how it should be executed."""
+
+    func: Callable
+    execution_mode: ExecutionMode
+    schema: FunctionSchema
+    cache: bool = False
+    serializer: Callable[[Any], str] | None = None
+
+
+def _call_function(func: Callable, args: dict[str, Any]) -> Any:
+    """Call `func` with keyword arguments. Module level so it can be pickled."""
+    return func(**args)
+
+
+def _noop() -> None:
+    """Used to start worker processes ahead of the first tool call."""
+
 
 class ToolManager:
     """Manages function tools and their execution."""
 
-    def __init__(self) -> None:
-        self._functions: dict[str, Callable] = {}
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        max_processes: int | None = None,
+        result_cache: ToolResultCache | None = None,
+        result_serializer: Callable[[Any], str] | None = None,
+    ) -> None:
+        """Initialize the tool manager.
+
+        Args:
+            max_workers: Size of the thread pool used to run sync tools off the event
+                         loop. If None, the `ThreadPoolExecutor` default is used.
+            max_processes: Size of the process pool used by tools registered with
+                           `execution_mode="process"`. If None, the number of CPUs is
+                           used.
+            result_cache: Cache used by tools registered with `cache=True`. If None, a
+                          cache with default size and TTL is created.
+            result_serializer: Turns tool return values into the string sent to the
+                               model. If None, a `ResultSerializer` with default
+                               settings is used.
+        """
+        self.result_cache = result_cache or ToolResultCache()
+        self.result_serializer = result_serializer or ResultSerializer()
+        self._functions: dict[str, RegisteredFunction] = {}
         self._tools: list[FunctionTool] = []
+        self._max_workers = max_workers
+        self._max_processes = max_processes
+        self._executor: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
 
     def register_function(
         self,
@@ -28,47 +82,46 @@ class ToolManager:
         name: str | None = None,
         description: str | None = None,
         strict: bool = False,
+        execution_mode: ExecutionMode = "thread",
+        cache: bool = False,
+        serializer: Callable[[Any], str] | None = None,
     ) -> FunctionTool:
-        """Register a function as a tool."""
-        # Convert Python type annotations to JSON schema format
-        annotations = func.__annotations__.copy()
-        annotations.pop("return", None)
-
-        properties = {}
-        required = []
-
-        for param_name, param_type in annotations.items():
-            if param_type is str:
-                properties[param_name] = {"type": "string"}
-            elif param_type is int:
-                properties[param_name] = {"type": "integer"}
-            elif param_type is float:
-                properties[param_name] = {"type": "number"}
-            elif param_type is bool:
-                properties[param_name] = {"type": "boolean"}
-            elif param_type is list:
-                properties[param_name] = {"type": "array"}
-            elif param_type is dict:
-                properties[param_name] = {"type": "object"}
-            else:
-                properties[param_name] = {"type": "string"}
-
-            required.append(param_name)
-
-        parameters: dict[str, object] = {
-            "type": "object",
-            "properties": properties,
-            "required": required,
-            "additionalProperties": False,
-        }
+        """Register a function as a tool.
+
+        Args:
+            func: The function to expose to the model.
+            name: Tool name. Defaults to the function name.
+            description: Tool description. Defaults to the function docstring.
+            strict: Whether the model must follow the parameters schema exactly.
+            execution_mode: How a sync function is run. `"inline"` calls it on the event
+                            loop thread, `"thread"` on the manager's thread pool and
+                            `"process"` on the manager's process pool for CPU-bound
+                            work. In process mode the function and its arguments must
+                            be picklable, so the function has to be importable by its
+                            qualified name. Ignored for coroutine functions, which are
+                            always awaited.
+            cache: Whether results are cached by arguments. Only enable it for
+                   idempotent functions.
+            serializer: Overrides the manager's result serializer for this function.
+        """
+        from openai.types.responses import FunctionTool
+
+        if execution_mode == "process" and inspect.iscoroutinefunction(func):
+            raise ValueError("Coroutine functions can't use execution_mode='process'")
+
+        # The schema and argument validator are built once here and reused on every
+        # call.
+        schema = function_schema(func, strict=strict)
 
         function_name = name or func.__name__
-        self._functions[function_name] = func
+        self._functions[function_name] = RegisteredFunction(
+            func, execution_mode, schema, cache, serializer
+        )
 
         tool = FunctionTool(
             name=function_name,
             description=description or func.__doc__,
-            parameters=parameters,
+            parameters=schema.parameters,
             type="function",
             strict=strict,
         )
@@ -76,14 +129,85 @@ class ToolManager:
         self._tools.append(tool)
         return tool
 
-    def execute_function(self, name: str, arguments: str) -> str:
-        """Execute a registered function by name with JSON arguments."""
-        if name not in self._functions:
-            raise ValueError(f"Function '{name}' not found in registry")
-
-        args = json.loads(arguments)
-        func = self._functions[name]
-        return json.dumps(func(**args))
+    async def execute_function(self, name: str, arguments: str) -> str:
+        """Execute a registered function by name with JSON arguments.
+
+        Coroutine functions are awaited directly. Sync functions run according to their
+        execution mode so that a slow tool doesn't block the event loop. Results of
+        tools registered with `cache=True` are served from the result cache when
+        possible.
+        """
+        with (
+            tracing.span("tool_call", {"tool.name": name}) as span,
+            profiling.phase(f"tool:{name}"),
+        ):
+            if name not in self._functions:
+                raise ValueError(f"Function '{name}' not found in registry")
+
+            registered = self._functions[name]
+            span.set_attribute("tool.execution_mode", registered.execution_mode)
+            # Raises pydantic.ValidationError before the tool runs if the arguments are
+            # invalid.
+            parsed = registered.schema.parse_arguments(arguments)
+            args = registered.schema.call_arguments(parsed)
+            if registered.cache:
+                key = self.result_cache.make_key(
+                    name, parsed.model_dump(mode="json", by_alias=True)
+                )
+                return await self.result_cache.get_or_compute(
+                    key, lambda: self._call(registered, args)
+                )
+            return await self._call(registered, args)
+
+    async def _call(self, registered: RegisteredFunction, args: dict[str, Any]) -> str:
+        """Run a registered function according to its execution mode."""
+        func = registered.func
+        if inspect.iscoroutinefunction(func):
+            result = await func(**args)
+        elif registered.execution_mode == "inline":
+            result = func(**args)
+        else:
+            loop = asyncio.get_running_loop()
+            executor = (
+                self._get_process_pool()
+                if registered.execution_mode == "process"
+                else self._get_executor()
+            )
+            # func and args are pickled together once per call when sent to a worker
+            # process.
+            result = await loop.run_in_executor(executor, _call_function, func, args)
+        serializer = registered.serializer or self.result_serializer
+        return serializer(result)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Create the thread pool on first use."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="tool"
+            )
+        return self._executor
+
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use. It's kept warm for later calls."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self._max_processes)
+        return self._process_pool
+
+    def warm_up(self) -> None:
+        """Start the worker processes now instead of on the first process-mode call."""
+        pool = self._get_process_pool()
+        workers = self._max_processes or os.cpu_count() or 1
+        for future in [pool.submit(_noop) for _ in range(workers)]:
+            future.result()
+
+    def shutdown(self) -> None:
+        """Shut down the thread and process pools used for sync tools."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
+            self._process_pool = None
 
     @property
     def tools(self) -> list[FunctionTool]:
@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable
+
+
+class ToolResultCache:
+    """Caches serialized tool results keyed on the tool name and its arguments.
+
+    Entries are evicted least recently used first once `max_size` is reached and expire
+    after `ttl` seconds. Concurrent calls with the same key share one execution.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float | None = 300.0) -> None:
+        """Initialize the cache.
+
+        Args:
+            max_size: Maximum number of results to keep.
+            ttl: Seconds a result stays valid. If None, results never expire.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(name: str, args: dict[str, Any]) -> str:
+        """Build a cache key that doesn't depend on argument order or whitespace."""
+        return (
+            name
+            + ":"
+            + json.dumps(args, sort_keys=True, separators=(",", ":"), default=str)
+        )
+
+    def get(self, key: str) -> str | None:
+        """Return the cached result for `key`, or None if it's missing or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str) -> None:
+        """Store a result, evicting least recently used entries if the cache is full."""
+        expires_at = (
+            time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        )
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_compute(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        """Return the cached result for `key`, computing it at most once if missing.
+
+        If the same key is already being computed, the caller waits for that result
+        instead of starting another execution. Failed computations are not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._compute_and_store(key, compute))
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shielded so that one cancelled caller doesn't cancel the result for the
+        # others.
+        return await asyncio.shield(future)
+
+    async def _compute_and_store(
+        self, key: str, compute: Callable[[], Awaitable[str]]
+    ) -> str:
+        value = await compute()
+        self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        self._entries.clear()
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Hit, miss, coalesced, eviction and size counters."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,106 @@
+import dataclasses
+import json
+from typing import Any, Literal
+
+import pydantic_core
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    # orjson is an optional dependency, installed with the `fast` extra.
+    orjson = None  # type: ignore[assignment]
+
+SerializerBackend = Literal["auto", "orjson", "pydantic", "json"]
+OverflowStrategy = Literal["truncate", "summarize"]
+
+
+def _to_jsonable(value: Any) -> Any:
+    """Fallback for objects the JSON backend doesn't know how to encode."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    return str(value)
+
+
+class ResultSerializer:
+    """Turns tool return values into the string sent back to the model.
+
+    Strings and bytes are passed through as they are, pydantic models use
+    `model_dump_json` and everything else is encoded with the configured JSON backend.
+    Outputs longer than `max_chars` are truncated or summarized so a single tool can't
+    flood the context.
+    """
+
+    def __init__(
+        self,
+        backend: SerializerBackend = "auto",
+        max_chars: int | None = None,
+        overflow: OverflowStrategy = "truncate",
+    ) -> None:
+        """Initialize the serializer.
+
+        Args:
+            backend: JSON encoder for dicts, lists and other values. `"auto"` uses
+                     orjson if it's installed and pydantic's Rust encoder otherwise.
+            max_chars: Maximum length of a serialized result. If None, results aren't
+                capped.
+            overflow: What to do with results over `max_chars`. `"truncate"` cuts the
+                      text, `"summarize"` describes the shape of the value with a short
+                      preview.
+        """
+        if backend == "orjson" and orjson is None:
+            raise ImportError("The orjson backend requires `pip install orjson`")
+        if backend == "auto":
+            backend = "orjson" if orjson is not None else "pydantic"
+        self.backend = backend
+        self.max_chars = max_chars
+        self.overflow = overflow
+
+    def __call__(self, result: Any) -> str:
+        output = self._serialize(result)
+        if self.max_chars is not None and len(output) > self.max_chars:
+            if self.overflow == "summarize":
+                return self._summarize(result, output)
+            return self._truncate(output)
+        return output
+
+    def _serialize(self, result: Any) -> str:
+        if isinstance(result, str):
+            return result
+        if isinstance(result, bytes):
+            return result.decode("utf-8", errors="replace")
+        if isinstance(result, BaseModel):
+            return result.model_dump_json()
+        if self.backend == "orjson":
+            try:
+                return orjson.dumps(
+                    result, default=_to_jsonable, option=orjson.OPT_NON_STR_KEYS
+                ).decode()
+            except TypeError:
+                # Values orjson refuses, such as integers over 64 bits.
+                return pydantic_core.to_json(result, fallback=_to_jsonable).decode()
+        if self.backend == "pydantic":
+            return pydantic_core.to_json(result, fallback=_to_jsonable).decode()
+        return json.dumps(result, default=_to_jsonable)
+
+    def _truncate(self, output: str) -> str:
+        assert self.max_chars is not None
+        omitted = len(output) - self.max_chars
+        return f"{output[: self.max_chars]}... [truncated {omitted} characters]"
+
+    def _summarize(self, result: Any, output: str) -> str:
+        assert self.max_chars is not None
+        summary: dict[str, Any] = {"truncated": True, "type": type(result).__name__}
+        if isinstance(result, (list, tuple, dict, str, bytes)):
+            summary["length"] = len(result)
+        if isinstance(result, dict):
+            summary["keys"] = [str(key) for key in list(result)[:20]]
+        summary["total_chars"] = len(output)
+        summary["preview"] = output[: self.max_chars // 2]
+        return json.dumps(summary)
@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterator, Protocol, Sequence
+
+if TYPE_CHECKING:
+    from openai.types.responses import ResponseUsage
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """A timed operation of a run: the run, an iteration, an LLM call or a tool call.
+
+    Times are in nanoseconds since the epoch. Spans of one run share a `trace_id` and
+    point to their parent with `parent_id`.
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    start_time: int = 0
+    end_time: int | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: str | None = None
+    _tracer: "Tracer | None" = field(default=None, repr=False, compare=False)
+    _start_counter: int = field(default=0, repr=False, compare=False)
+
+    recording = True
+
+    @property
+    def duration(self) -> float | None:
+        """Duration in seconds, once the span has ended."""
+        return (
+            (self.end_time - self.start_time) / 1e9
+            if self.end_time is not None
+            else None
+        )
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def set_error(self, error: BaseException) -> None:
+        """Mark the span as failed, unless it has already ended."""
+        if self.end_time is not None:
+            return
+        self.status = "error"
+        self.error = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        """End the span and hand it to the tracer. Ending twice has no effect."""
+        if self.end_time is not None:
+            return
+        self.end_time = self.start_time + time.perf_counter_ns() - self._start_counter
+        if self._tracer is not None:
+            self._tracer._on_end(self)
+
+    def __enter__(self) -> "Span":
+        return self
+
+    def __exit__(
+        self, exc_type: Any, exc: BaseException | None, traceback: Any
+    ) -> None:
+        """End the span, marking it as failed if the block raised.
+
+        Unlike `Tracer.span`, this doesn't make the span current, so it can be used
+        around a `yield` in an async generator. A generator closed early
+        (`GeneratorExit`) isn't an error.
+        """
+        if exc is not None and not isinstance(exc, GeneratorExit):
+            self.set_error(exc)
+        self.end()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "duration": self.duration,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span when tracing is disabled. All methods do nothing."""
+
+    recording = False
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def set_error(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(Protocol):
+    """Receives finished spans, one trace at a time."""
+
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemoryExporter:
+    """Keeps finished spans in a list, e.g. for tests or in-process analysis."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self.spans.extend(spans)
+
+    def clear(self) -> None:
+        self.spans.clear()
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JSONLExporter:
+    """Appends every finished span as one JSON line to a file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a")
+
+    def export(self, spans: Sequence[Span]) -> None:
+        for span in spans:
+            self._file.write(json.dumps(span.to_dict(), default=str) + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+class OTLPJSONExporter:
+    """Writes spans in the OTLP/JSON trace format, one export request per line.
+
+    The file can be ingested by an OpenTelemetry Collector with the `otlpjsonfile`
+    receiver, or each line posted as is to an OTLP/HTTP `/v1/traces` endpoint.
+    """
+
+    def __init__(
+        self, path: str | Path, service_name: str = "mini-openai-agents"
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.service_name = service_name
+        self._file = self.path.open("a")
+
+    def export(self, spans: Sequence[Span]) -> None:
+        self._file.write(json.dumps(to_otlp(spans, self.service_name)) + "\n")
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        self._file.close()
+
+
+def to_otlp(spans: Sequence[Span], service_name: str) -> dict[str, Any]:
+    """Convert spans to an OTLP/JSON `ExportTraceServiceRequest`."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": _otlp_attributes({"service.name": service_name})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [_otlp_span(span) for span in spans],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+def _otlp_span(span: Span) -> dict[str, Any]:
+    data: dict[str, Any] = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        # CLIENT for calls to the API, INTERNAL for everything else.
+        "kind": 3 if span.name == "responses.create" else 1,
+        "startTimeUnixNano": str(span.start_time),
+        "endTimeUnixNano": str(span.end_time),
+        "attributes": _otlp_attributes(span.attributes),
+        "status": {"code": 2, "message": span.error}
+        if span.status == "error"
+        else {"code": 1},
+    }
+    if span.parent_id is not None:
+        data["parentSpanId"] = span.parent_id
+    return data
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict[str, Any]]:
+    result = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            otlp_value: dict[str, Any] = {"boolValue": value}
+        elif isinstance(value, int):
+            otlp_value = {"intValue": str(value)}
+        elif isinstance(value, float):
+            otlp_value = {"doubleValue": value}
+        else:
+            otlp_value = {"stringValue": str(value)}
+        result.append({"key": key, "value": otlp_value})
+    return result
+
+
+class Tracer:
+    """Creates spans and sends each finished trace to the exporters.
+
+    Spans are buffered until the root span of their trace ends, then exported together.
+    Spans that end after their root, such as cancelled tool calls, are exported on their
+    own.
+    """
+
+    def __init__(self, exporters: Sequence[SpanExporter]) -> None:
+        self.exporters = list(exporters)
+        self._pending: dict[
+            str, list[Span]
+        ] = {}  # trace id of an open root span -> ended spans
+
+    def start_span(
+        self,
+        name: str,
+        attributes: dict[str, Any] | None = None,
+        parent: Span | None = None,
+    ) -> Span:
+        """Start a span without making it current.
+
+        The span is a child of `parent`, or of the current span if no parent is given.
+        """
+        if parent is None:
+            parent = _current_span.get()
+        if parent is not None:
+            trace_id = parent.trace_id
+        else:
+            trace_id = os.urandom(16).hex()
+            self._pending[trace_id] = []
+        return Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            start_time=time.time_ns(),
+            attributes=attributes or {},
+            _tracer=self,
+            _start_counter=time.perf_counter_ns(),
+        )
+
+    @contextmanager
+    def span(
+        self, name: str, attributes: dict[str, Any] | None = None
+    ) -> Iterator[Span]:
+        """Start a span, make it current for the block and end it afterwards."""
+        span = self.start_span(name, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+    def _on_end(self, span: Span) -> None:
+        if span.parent_id is None:
+            self._export([*self._pending.pop(span.trace_id, []), span])
+        elif span.trace_id in self._pending:
+            self._pending[span.trace_id].append(span)
+        else:
+            self._export([span])
+
+    def _export(self, spans: list[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(spans)
+            except Exception as e:
+                logger.warning(
+                    "Span exporter %s failed: %r",
+                    type(exporter).__name__,
+                    e,
+                    exc_info=True,
+                )
+
+    def shutdown(self) -> None:
+        """Export spans of unfinished traces and shut the exporters down."""
+        for spans in self._pending.values():
+            self._export(spans)
+        self._pending.clear()
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+
+_tracer: Tracer | None = None
+
+
+def set_tracer(tracer: Tracer | None) -> None:
+    """Enable tracing with `tracer`, or disable it with None."""
+    global _tracer
+    _tracer = tracer
+
+
+def get_tracer() -> Tracer | None:
+    """Return the active tracer, or None if tracing is disabled."""
+    return _tracer
+
+
+def span(name: str, attributes: dict[str, Any] | None = None) -> Any:
+    """Context manager for a span that is current for its block.
+
+    Returns a shared no-op span when tracing is disabled, so instrumented code costs one
+    function call and can check `span.recording` before computing expensive attributes.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.span(name, attributes)
+
+
+def start_span(
+    name: str,
+    attributes: dict[str, Any] | None = None,
+    parent: Span | _NoopSpan | None = None,
+) -> Span | _NoopSpan:
+    """Start a span that isn't made current and must be ended with `end()`.
+
+    The span is a child of `parent`, or of the current span if no parent is given. Spans
+    can also be used as context managers that end them; use this rather than `span()` in
+    async generators, where a current span would leak into the consumer's context across
+    `yield`.
+    """
+    if _tracer is None:
+        return NOOP_SPAN
+    return _tracer.start_span(
+        name, attributes, parent if isinstance(parent, Span) else None
+    )
+
+
+@contextmanager
+def use_span(span: Span | _NoopSpan) -> Iterator[None]:
+    """Make `span` the current span for a block that doesn't `yield` to a consumer.
+
+    Tasks created in the block copy the context, so their spans become children of
+    `span`.
+    """
+    if not isinstance(span, Span):
+        yield
+        return
+    token = _current_span.set(span)
+    try:
+        yield
+    finally:
+        _current_span.reset(token)
+
+
+def usage_attributes(usage: ResponseUsage | None) -> dict[str, int]:
+    """Span attributes for the token usage of a response."""
+    if usage is None:
+        return {}
+    return {
+        "usage.input_tokens": usage.input_tokens,
+        "usage.cached_tokens": usage.input_tokens_details.cached_tokens,
+        "usage.output_tokens": usage.output_tokens,
+        "usage.reasoning_tokens": usage.output_tokens_details.reasoning_tokens,
+        "usage.total_tokens": usage.total_tokens,
+    }
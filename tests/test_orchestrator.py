@@ -0,0 +1,252 @@
+import asyncio
+from types import SimpleNamespace
+from typing import Any, Iterator
+
+import pytest
+from openai.types.responses import (
+    Response,
+    ResponseError,
+    ResponseErrorEvent,
+    ResponseFailedEvent,
+    ResponseIncompleteEvent,
+    ResponseInputParam,
+    ResponseStreamEvent,
+    ResponseTextDeltaEvent,
+)
+
+from src import tracing
+from src.fake_responses import message
+from src.orchestrator import BatchResult, run_many, run_streamed
+from src.streaming import ResponseStreamError, StreamedRun, TextDeltaEvent
+
+INPUT: ResponseInputParam = [{"role": "user", "content": "Hello"}]
+
+
+class FakeStream:
+    def __init__(self, events: list[ResponseStreamEvent]) -> None:
+        self.events = events
+        self.closed = False
+
+    async def __aiter__(self) -> Any:
+        for event in self.events:
+            yield event
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def echo_client(fail_on: str | None = None) -> Any:
+    """Client answering each request with the content of its first input message."""
+
+    async def create(**kwargs: Any) -> Response:
+        await asyncio.sleep(0)
+        content = kwargs["input"][0]["content"]
+        if content == fail_on:
+            raise RuntimeError(f"Failed on {content}")
+        return response(output=[message(content)])
+
+    return SimpleNamespace(responses=SimpleNamespace(create=create))
+
+
+def user_input(content: str) -> ResponseInputParam:
+    return [{"role": "user", "content": content}]
+
+
+def stream_client(*streams: FakeStream) -> Any:
+    remaining = list(streams)
+
+    async def create(**kwargs: Any) -> FakeStream:
+        return remaining.pop(0)
+
+    return SimpleNamespace(responses=SimpleNamespace(create=create))
+
+
+def response(**fields: Any) -> Response:
+    defaults: dict[str, Any] = {
+        "id": "resp_1",
+        "created_at": 0,
+        "model": "gpt-4o-mini",
+        "object": "response",
+        "output": [],
+        "parallel_tool_calls": True,
+        "tool_choice": "auto",
+        "tools": [],
+    }
+    return Response(**{**defaults, **fields})
+
+
+async def consume(streamed: StreamedRun) -> None:
+    async for _ in streamed.stream_events():
+        pass
+
+
+def test_stream_returns_incomplete_response() -> None:
+    incomplete = response(output=[message("Partial answer")], status="incomplete")
+    stream = FakeStream(
+        [
+            ResponseIncompleteEvent(
+                type="response.incomplete", response=incomplete, sequence_number=0
+            )
+        ]
+    )
+    streamed = run_streamed(INPUT, client=stream_client(stream))
+
+    asyncio.run(consume(streamed))
+
+    assert streamed.is_complete
+    assert streamed.response == incomplete
+    assert streamed.final_output == "Partial answer"
+    assert stream.closed
+
+
+def test_stream_raises_server_message_of_failed_response() -> None:
+    failed = response(
+        status="failed", error=ResponseError(code="server_error", message="Boom")
+    )
+    stream = FakeStream(
+        [
+            ResponseFailedEvent(
+                type="response.failed", response=failed, sequence_number=0
+            )
+        ]
+    )
+    streamed = run_streamed(INPUT, client=stream_client(stream))
+
+    with pytest.raises(ResponseStreamError, match="Boom") as exc_info:
+        asyncio.run(consume(streamed))
+
+    assert exc_info.value.code == "server_error"
+    assert stream.closed
+
+
+def test_stream_raises_server_message_of_error_event() -> None:
+    stream = FakeStream(
+        [
+            ResponseErrorEvent(
+                type="error",
+                code="rate_limit_exceeded",
+                message="Slow down",
+                param=None,
+                sequence_number=0,
+            )
+        ]
+    )
+    streamed = run_streamed(INPUT, client=stream_client(stream))
+
+    with pytest.raises(ResponseStreamError, match="Slow down") as exc_info:
+        asyncio.run(consume(streamed))
+
+    assert exc_info.value.code == "rate_limit_exceeded"
+    assert not streamed.is_complete
+
+
+def test_stopping_early_does_not_mark_spans_as_failed() -> None:
+    stream = FakeStream(
+        [
+            ResponseTextDeltaEvent(
+                type="response.output_text.delta",
+                item_id="msg_1",
+                output_index=0,
+                content_index=0,
+                delta="Hel",
+                logprobs=[],
+                sequence_number=0,
+            )
+        ]
+    )
+    exporter = tracing.InMemoryExporter()
+    tracing.set_tracer(tracing.Tracer([exporter]))
+
+    async def stop_at_first_text() -> None:
+        events = run_streamed(INPUT, client=stream_client(stream)).stream_events()
+        async for event in events:
+            if isinstance(event, TextDeltaEvent):
+                break
+        await events.aclose()  # type: ignore[attr-defined]
+
+    try:
+        asyncio.run(stop_at_first_text())
+    finally:
+        tracing.set_tracer(None)
+
+    assert stream.closed
+    assert {span.name: span.status for span in exporter.spans} == {
+        "responses.create": "ok",
+        "iteration": "ok",
+        "run": "ok",
+    }
+
+
+def test_run_many_rejects_max_concurrency_below_one() -> None:
+    async def consume_batch() -> None:
+        async for _ in run_many([INPUT], max_concurrency=0):
+            pass
+
+    with pytest.raises(ValueError, match="max_concurrency"):
+        asyncio.run(consume_batch())
+
+
+def test_run_many_returns_run_errors_on_their_results() -> None:
+    async def collect() -> list[BatchResult]:
+        inputs = [user_input(str(i)) for i in range(5)]
+        return [
+            result
+            async for result in run_many(
+                inputs, max_concurrency=2, client=echo_client(fail_on="3")
+            )
+        ]
+
+    results = sorted(asyncio.run(collect()), key=lambda result: result.index)
+
+    assert [result.final_output for result in results] == ["0", "1", "2", None, "4"]
+    assert str(results[3].error) == "Failed on 3"
+
+
+def test_run_many_pulls_inputs_only_as_results_are_consumed() -> None:
+    max_concurrency = 2
+    pulled = 0
+
+    def inputs() -> Iterator[ResponseInputParam]:
+        nonlocal pulled
+        for i in range(100):
+            pulled += 1
+            yield user_input(str(i))
+
+    async def consume_slowly() -> list[int]:
+        pulled_after_each_result = []
+        batch = run_many(
+            inputs(), max_concurrency=max_concurrency, client=echo_client()
+        )
+        async for _ in batch:
+            # Let the workers run as far ahead as they can.
+            for _ in range(20):
+                await asyncio.sleep(0)
+            pulled_after_each_result.append(pulled)
+            if len(pulled_after_each_result) == 10:
+                break
+        await batch.aclose()  # type: ignore[attr-defined]
+        return pulled_after_each_result
+
+    pulled_after_each_result = asyncio.run(consume_slowly())
+
+    # Each worker holds at most one result and the queue `max_concurrency` more.
+    for consumed, pulled_so_far in enumerate(pulled_after_each_result, 1):
+        assert pulled_so_far <= consumed + 2 * max_concurrency
+
+
+def test_run_many_raises_input_error_after_runs_in_flight() -> None:
+    def inputs() -> Iterator[ResponseInputParam]:
+        yield user_input("0")
+        yield user_input("1")
+        raise ValueError("Bad input source")
+
+    results: list[BatchResult] = []
+
+    async def collect() -> None:
+        async for result in run_many(inputs(), max_concurrency=4, client=echo_client()):
+            results.append(result)
+
+    with pytest.raises(ValueError, match="Bad input source"):
+        asyncio.run(collect())
+
+    assert sorted(result.final_output or "" for result in results) == ["0", "1"]
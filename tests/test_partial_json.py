@@ -0,0 +1,129 @@
+import json
+import random
+from typing import Any
+
+import pytest
+
+from src.partial_json import PartialJSONParser, parse_partial_json
+
+SEEDS = range(200)
+
+
+def random_value(rng: random.Random, depth: int = 0) -> Any:
+    kinds = ["int", "float", "bool", "null", "string"]
+    if depth < 4:
+        kinds += ["object", "array"] * 2
+    kind = rng.choice(kinds)
+    if kind == "int":
+        return rng.randint(-(10**12), 10**12)
+    if kind == "float":
+        return rng.uniform(-1e6, 1e6)
+    if kind == "bool":
+        return rng.random() < 0.5
+    if kind == "null":
+        return None
+    if kind == "string":
+        return random_string(rng)
+    if kind == "object":
+        return {
+            random_string(rng): random_value(rng, depth + 1)
+            for _ in range(rng.randint(0, 5))
+        }
+    return [random_value(rng, depth + 1) for _ in range(rng.randint(0, 5))]
+
+
+def random_string(rng: random.Random) -> str:
+    alphabet = 'ab z"\\/\n\té中\U0001f600'
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 8)))
+
+
+def random_chunks(rng: random.Random, text: str) -> list[str]:
+    chunks = []
+    i = 0
+    while i < len(text):
+        size = rng.choice([1, 1, 2, 3, 5, 8, 40])
+        chunks.append(text[i : i + size])
+        i += size
+    return chunks
+
+
+def dumps(rng: random.Random, value: Any) -> str:
+    return json.dumps(
+        value,
+        ensure_ascii=rng.random() < 0.5,
+        indent=rng.choice([None, 0, 2]),
+        separators=rng.choice([None, (",", ":")]),
+    )
+
+
+def feed_all(chunks: list[str]) -> PartialJSONParser:
+    parser = PartialJSONParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+    return parser
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_chunking_matches_json_loads(seed: int) -> None:
+    rng = random.Random(seed)
+    # Trailing whitespace ends a top-level number, which could otherwise still continue.
+    text = dumps(rng, random_value(rng)) + "\n"
+
+    parser = feed_all(random_chunks(rng, text))
+
+    assert parser.done
+    assert parser.value == json.loads(text)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_random_corruption_is_rejected_like_json_loads(seed: int) -> None:
+    rng = random.Random(seed)
+    text = dumps(rng, random_value(rng)) + "\n"
+    position = rng.randrange(len(text) - 1)  # Keep the trailing whitespace.
+    text = text[:position] + rng.choice('{}[],:"0 -.etx\\') + text[position + 1 :]
+    try:
+        expected = json.loads(text)
+    except json.JSONDecodeError:
+        # Invalid text either raises or, like a prefix of a valid document, never
+        # completes.
+        try:
+            parser = feed_all(random_chunks(rng, text))
+        except ValueError:
+            return
+        assert not parser.done
+    else:
+        parser = feed_all(random_chunks(rng, text))
+        assert parser.done
+        assert parser.value == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"a": 1]',
+        "[1}",
+        "[1,]",
+        '{"a": 1,}',
+        "[,1]",
+        '{"a" 1}',
+        '{"a":}',
+        "[1 2]",
+        "[1]]",
+        "[tru]",
+        '["\\x"]',
+        '["\\u12g4"]',
+    ],
+)
+def test_invalid_json_raises(text: str) -> None:
+    with pytest.raises(ValueError):
+        parse_partial_json(text)
+
+
+def test_partial_values_grow_with_the_document() -> None:
+    parser = PartialJSONParser()
+    assert parser.feed('{"name": "Ka') == []
+    assert parser.value == {"name": "Ka"}
+    assert parser.feed('thmandu", "tags": [1, ') == ["name"]
+    assert parser.value == {"name": "Kathmandu", "tags": [1]}
+    assert parser.feed("2]}") == ["tags"]
+    assert parser.done
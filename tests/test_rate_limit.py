@@ -0,0 +1,105 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from openai.types.responses import ResponseUsage
+
+from src import rate_limit
+from src.rate_limit import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    clock = FakeClock()
+    # Only the rate_limit module sees the fake clock; the event loop keeps the real one.
+    monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(
+        rate_limit, "asyncio", SimpleNamespace(Lock=asyncio.Lock, sleep=clock.sleep)
+    )
+    return clock
+
+
+def usage(total_tokens: int) -> ResponseUsage:
+    return ResponseUsage.model_validate(
+        {
+            "input_tokens": total_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": 0,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": total_tokens,
+        }
+    )
+
+
+def test_bucket_refills_at_its_rate(clock: FakeClock) -> None:
+    bucket = TokenBucket(per_minute=60)
+    asyncio.run(bucket.acquire(60))
+    assert bucket.level == 0
+
+    clock.now += 10
+
+    assert bucket.level == 10
+    clock.now += 100
+    assert bucket.level == 60
+
+
+def test_bucket_waits_for_missing_units(clock: FakeClock) -> None:
+    bucket = TokenBucket(per_minute=60)
+    asyncio.run(bucket.acquire(50))
+
+    asyncio.run(bucket.acquire(20))
+
+    assert clock.now == 10
+    assert bucket.level == 0
+
+
+def test_bucket_takes_at_most_its_capacity(clock: FakeClock) -> None:
+    bucket = TokenBucket(per_minute=60, capacity=10)
+
+    assert asyncio.run(bucket.acquire(25)) == 10
+    assert bucket.level == 0
+
+
+def test_bucket_adjust_refunds_and_charges(clock: FakeClock) -> None:
+    bucket = TokenBucket(per_minute=60)
+    asyncio.run(bucket.acquire(40))
+
+    bucket.adjust(-30)
+    assert bucket.level == 50
+    bucket.adjust(70)
+    assert bucket.level == -20
+    bucket.adjust(-1000)
+    assert bucket.level == 60
+
+
+def test_limiter_settles_reservation_with_usage(clock: FakeClock) -> None:
+    limiter = RateLimiter(tokens_per_minute=1000, estimated_tokens_per_request=300)
+
+    reserved = asyncio.run(limiter.acquire())
+    limiter.record_usage(reserved, usage(100))
+
+    assert reserved == 300
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == 900
+
+
+def test_limiter_refunds_only_what_was_taken(clock: FakeClock) -> None:
+    limiter = RateLimiter(tokens_per_minute=1000, estimated_tokens_per_request=5000)
+
+    reserved = asyncio.run(limiter.acquire())
+    limiter.record_usage(reserved, usage(100))
+
+    assert reserved == 1000
+    assert limiter.tokens is not None
+    assert limiter.tokens.level == 900
@@ -0,0 +1,63 @@
+from pathlib import Path
+
+from openai.types.responses import Response
+
+from src.fake_responses import message
+from src.response_cache import ResponseCache
+
+
+def response(text: str) -> Response:
+    return Response(
+        id="resp_1",
+        created_at=0,
+        model="gpt-4o-mini",
+        object="response",
+        output=[message(text)],
+        parallel_tool_calls=True,
+        tool_choice="auto",
+        tools=[],
+    )
+
+
+def request(content: str) -> dict[str, str]:
+    return {"model": "gpt-4o-mini", "input": content}
+
+
+def test_entries_round_trip(tmp_path: Path) -> None:
+    cache = ResponseCache(tmp_path / "responses.sqlite3")
+    cached = response("A")
+    cache.set(request("a"), cached)
+
+    assert cache.get(request("a")) == cached
+    assert cache.get(request("b")) is None
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path: Path) -> None:
+    size = len(response("A").model_dump_json())
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=2 * size)
+    cache.set(request("a"), response("A"))
+    cache.set(request("b"), response("B"))
+    cache.get(request("a"))
+
+    cache.set(request("c"), response("C"))
+
+    assert cache.get(request("b")) is None
+    assert cache.get(request("a")) is not None
+    assert cache.get(request("c")) is not None
+    assert cache.stats["evictions"] == 1
+
+
+def test_oversized_body_keeps_existing_entries(tmp_path: Path) -> None:
+    size = len(response("A").model_dump_json())
+    cache = ResponseCache(tmp_path / "responses.sqlite3", max_bytes=2 * size)
+    cached = response("A")
+    cache.set(request("a"), cached)
+
+    cache.set(request("big"), response("B" * 3 * size))
+
+    assert cache.get(request("big")) is None
+    assert cache.get(request("a")) == cached
+    assert cache.stats["evictions"] == 0
+    assert cache.stats["bytes"] == size
@@ -0,0 +1,136 @@
+import asyncio
+from pathlib import Path
+
+from src.session_manager import SessionManager, SQLiteSessionStore
+
+
+class DictStore:
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    def keys(self) -> list[str]:
+        return list(self.data)
+
+    def get(self, session_id: str) -> bytes | None:
+        return self.data.get(session_id)
+
+    def put(self, session_id: str, data: bytes) -> None:
+        self.data[session_id] = data
+
+    def delete(self, session_id: str) -> None:
+        self.data.pop(session_id, None)
+
+    def close(self) -> None:
+        pass
+
+
+async def settle(manager: SessionManager) -> None:
+    """Wait for the background eviction tasks of `manager`."""
+    for shard in manager._shards:
+        if shard.eviction_task is not None:
+            await shard.eviction_task
+
+
+def test_turns_of_one_session_run_one_after_the_other() -> None:
+    manager = SessionManager(store=DictStore())
+    log: list[str] = []
+
+    async def turn(session_id: str, name: str) -> None:
+        async with manager.session(session_id) as session:
+            log.append(f"{name} start")
+            await asyncio.sleep(0.01)
+            session.add_items([{"role": "user", "content": name}])
+            log.append(f"{name} end")
+
+    async def main() -> None:
+        await asyncio.gather(turn("a", "a1"), turn("a", "a2"), turn("b", "b1"))
+
+    asyncio.run(main())
+
+    assert log.index("a1 end") < log.index("a2 start")
+    # Another session isn't held up by the lock of "a".
+    assert log.index("b1 start") < log.index("a1 end")
+    assert all(not shard.locks for shard in manager._shards)
+
+
+def test_evicted_session_is_reloaded_with_its_items(tmp_path: Path) -> None:
+    store = SQLiteSessionStore(tmp_path / "spill.sqlite3")
+    manager = SessionManager(max_memory_bytes=1, num_shards=1, store=store)
+    items = [
+        {"role": "user", "content": "What's the weather?"},
+        {"role": "assistant", "content": "Sunny."},
+    ]
+
+    async def main() -> None:
+        async with manager.session("a") as session:
+            session.add_items(items)  # type: ignore[arg-type]
+        await settle(manager)
+        assert manager.stats["evictions"] == 1
+        assert manager.stats["sessions_in_memory"] == 0
+        assert "a" in manager
+
+        async with manager.session("a") as session:
+            assert session.get_items() == items
+            assert session.total_tokens > 0
+
+    asyncio.run(main())
+
+    assert manager.stats["reloads"] == 1
+    assert manager.stats["created"] == 1
+
+
+def test_sessions_in_use_are_not_evicted() -> None:
+    manager = SessionManager(max_memory_bytes=1, num_shards=1, store=DictStore())
+
+    async def main() -> None:
+        async with manager.session("a") as session:
+            session.add_items([{"role": "user", "content": "hello"}])
+            async with manager.session("b") as other:
+                other.add_items([{"role": "user", "content": "hi"}])
+            await settle(manager)
+            assert "a" in manager._shards[0].sessions
+            assert "b" not in manager._shards[0].sessions
+
+    asyncio.run(main())
+
+
+def test_sessions_survive_a_restart(tmp_path: Path) -> None:
+    path = tmp_path / "spill.sqlite3"
+    item = {"role": "user", "content": "Remember me"}
+
+    async def write() -> None:
+        manager = SessionManager(store=SQLiteSessionStore(path))
+        async with manager.session("a") as session:
+            session.add_items([item])  # type: ignore[list-item]
+        await manager.close()
+
+    async def read() -> list[object]:
+        manager = SessionManager(store=SQLiteSessionStore(path))
+        assert "a" in manager
+        async with manager.session("a") as session:
+            items: list[object] = list(session.get_items())
+        await manager.close()
+        return items
+
+    asyncio.run(write())
+
+    assert asyncio.run(read()) == [item]
+
+
+def test_delete_removes_session_from_memory_and_store() -> None:
+    store = DictStore()
+    manager = SessionManager(store=store)
+
+    async def main() -> None:
+        async with manager.session("a") as session:
+            session.add_items([{"role": "user", "content": "hello"}])
+        await manager.flush()
+        assert "a" in store.data
+
+        await manager.delete("a")
+
+    asyncio.run(main())
+
+    assert "a" not in manager
+    assert store.data == {}
+    assert manager.stats["memory_bytes"] == 0
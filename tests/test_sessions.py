@@ -0,0 +1,197 @@
+import random
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+from src.compact_session import CompactSession, ItemCodec
+from src.session import Session
+from src.sqlite_session import SQLiteSession
+
+BACKENDS = ["memory", "sqlite", "compact", "compact-msgpack"]
+
+
+def count_tokens(item: Any) -> int:
+    text = item.get("content") or item.get("arguments") or item.get("output") or ""
+    return len(text) + 1
+
+
+def make_session(backend: str, path: Path, session_id: str = "test") -> Any:
+    if backend == "memory":
+        return Session(session_id, token_counter=count_tokens)
+    if backend == "sqlite":
+        return SQLiteSession(
+            session_id, path / "sessions.sqlite3", token_counter=count_tokens
+        )
+    if backend == "compact":
+        return CompactSession(session_id, token_counter=count_tokens)
+    # Optional dependencies, installed with the `compact` extra.
+    pytest.importorskip("msgpack")
+    pytest.importorskip("zstandard")
+    return CompactSession(
+        session_id,
+        codec=ItemCodec(format="msgpack", compression="zstd", min_compress_size=16),
+        token_counter=count_tokens,
+    )
+
+
+@pytest.fixture(params=BACKENDS)
+def session_factory(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> Callable[..., Any]:
+    return lambda session_id="test": make_session(request.param, tmp_path, session_id)
+
+
+def random_history(rng: random.Random, turns: int) -> list[dict[str, Any]]:
+    def text() -> str:
+        return "x" * rng.randint(0, 40)
+
+    items: list[dict[str, Any]] = []
+    for turn in range(turns):
+        items.append({"role": "user", "content": text()})
+        for call in range(rng.randint(0, 2)):
+            call_id = f"call_{turn}_{call}"
+            items.append(
+                {
+                    "type": "function_call",
+                    "call_id": call_id,
+                    "name": "lookup",
+                    "arguments": text(),
+                }
+            )
+            items.append(
+                {"type": "function_call_output", "call_id": call_id, "output": text()}
+            )
+        items.append({"role": "assistant", "content": text()})
+    return items
+
+
+def expected_window(
+    items: list[dict[str, Any]], limit: int | None, max_tokens: int | None
+) -> list[dict[str, Any]]:
+    """Reference implementation of `get_items`, written for clarity over speed."""
+    start = 0
+    if limit is not None:
+        start = max(len(items) - limit, 0)
+    if max_tokens is None:
+        return items[start:]
+    while sum(count_tokens(item) for item in items[start:]) > max_tokens:
+        start += 1
+    # Drop outputs whose call was cut off, along with everything before them.
+    while True:
+        calls = set()
+        for index in range(start, len(items)):
+            item = items[index]
+            if item.get("type") == "function_call":
+                calls.add(item["call_id"])
+            elif item.get("type") == "function_call_output":
+                if item["call_id"] not in calls:
+                    start = index + 1
+                    break
+        else:
+            return items[start:]
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_get_items_windows_match_reference(
+    seed: int, session_factory: Callable[..., Any]
+) -> None:
+    rng = random.Random(seed)
+    items = random_history(rng, rng.randint(0, 12))
+    session = session_factory()
+    session.add_items(items)
+    total = sum(count_tokens(item) for item in items)
+
+    assert session.total_tokens == total
+    for limit in [None, 0, 1, 3, len(items), len(items) + 5]:
+        for max_tokens in [None, 0, 10, total // 3, total // 2, total, total + 10]:
+            assert session.get_items(limit=limit, max_tokens=max_tokens) == (
+                expected_window(items, limit, max_tokens)
+            ), (limit, max_tokens)
+
+
+def test_window_never_starts_with_an_orphaned_output(
+    session_factory: Callable[..., Any],
+) -> None:
+    session = session_factory()
+    session.add_items(
+        [
+            {"role": "user", "content": "weather?"},
+            {
+                "type": "function_call",
+                "call_id": "call_1",
+                "name": "lookup",
+                "arguments": "x" * 50,
+            },
+            {"type": "function_call_output", "call_id": "call_1", "output": "sunny"},
+            {"role": "assistant", "content": "It's sunny."},
+        ]
+    )
+
+    assert session.get_items(max_tokens=20) == [
+        {"role": "assistant", "content": "It's sunny."}
+    ]
+
+
+def test_pop_and_clear_keep_token_counts(session_factory: Callable[..., Any]) -> None:
+    session = session_factory()
+    session.add_items([{"role": "user", "content": "abc"}])
+    session.add_items([{"role": "assistant", "content": "defgh"}])
+
+    assert session.pop_item() == {"role": "assistant", "content": "defgh"}
+    assert session.total_tokens == 4
+    assert session.get_items(max_tokens=4) == [{"role": "user", "content": "abc"}]
+
+    session.clear_session()
+    assert session.pop_item() is None
+    assert session.total_tokens == 0
+    assert session.get_items(max_tokens=100) == []
+
+
+def test_replace_prefix_swaps_oldest_items(session_factory: Callable[..., Any]) -> None:
+    items = random_history(random.Random(0), 6)
+    session = session_factory()
+    session.add_items(items)
+    summary = [{"role": "user", "content": "Summary of turns so far"}]
+
+    assert session.replace_prefix(items[:5], summary)
+
+    expected = summary + items[5:]
+    assert session.get_items() == expected
+    assert session.total_tokens == sum(count_tokens(item) for item in expected)
+    for max_tokens in [0, 15, 60, 1000]:
+        assert session.get_items(max_tokens=max_tokens) == (
+            expected_window(expected, None, max_tokens)
+        )
+    session.add_items([{"role": "user", "content": "more"}])
+    assert session.get_items(limit=2) == [
+        items[-1],
+        {"role": "user", "content": "more"},
+    ]
+
+
+def test_replace_prefix_leaves_changed_history_alone(
+    session_factory: Callable[..., Any],
+) -> None:
+    items = random_history(random.Random(1), 3)
+    session = session_factory()
+    session.add_items(items)
+    summary = [{"role": "user", "content": "Summary"}]
+
+    assert not session.replace_prefix([{"role": "user", "content": "other"}], summary)
+    assert not session.replace_prefix(items + items, summary)
+    session.clear_session()
+    assert not session.replace_prefix(items[:2], summary)
+    assert session.get_items() == []
+
+
+def test_sessions_with_different_ids_are_separate(
+    session_factory: Callable[..., Any],
+) -> None:
+    first = session_factory("first")
+    second = session_factory("second")
+    first.add_items([{"role": "user", "content": "one"}])
+    second.add_items([{"role": "user", "content": "two"}])
+
+    assert first.get_items() == [{"role": "user", "content": "one"}]
+    assert second.get_items() == [{"role": "user", "content": "two"}]
@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src import tool_cache
+from src.tool_cache import ToolResultCache
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> SimpleNamespace:
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        tool_cache, "time", SimpleNamespace(monotonic=lambda: clock.now)
+    )
+    return clock
+
+
+def test_make_key_ignores_argument_order() -> None:
+    assert ToolResultCache.make_key("add", {"a": 1, "b": 2}) == (
+        ToolResultCache.make_key("add", {"b": 2, "a": 1})
+    )
+    assert ToolResultCache.make_key("add", {"a": 1}) != (
+        ToolResultCache.make_key("sub", {"a": 1})
+    )
+
+
+def test_concurrent_calls_share_one_execution() -> None:
+    cache = ToolResultCache()
+    calls = 0
+
+    async def compute() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def call_many() -> list[str]:
+        return await asyncio.gather(
+            *(cache.get_or_compute("key", compute) for _ in range(5))
+        )
+
+    assert asyncio.run(call_many()) == ["result"] * 5
+    assert calls == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["coalesced"] == 4
+    assert asyncio.run(cache.get_or_compute("key", compute)) == "result"
+    assert cache.stats["hits"] == 1
+
+
+def test_failed_computation_is_shared_and_not_cached() -> None:
+    cache = ToolResultCache()
+    calls = 0
+
+    async def fail() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def call_twice() -> tuple[str | BaseException, str | BaseException]:
+        return await asyncio.gather(
+            cache.get_or_compute("key", fail),
+            cache.get_or_compute("key", fail),
+            return_exceptions=True,
+        )
+
+    results = asyncio.run(call_twice())
+
+    assert [str(result) for result in results] == ["boom", "boom"]
+    assert calls == 1
+    assert cache.get("key") is None
+
+
+def test_cancelled_caller_does_not_cancel_others() -> None:
+    cache = ToolResultCache()
+
+    async def compute() -> str:
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def cancel_one() -> str:
+        first = asyncio.create_task(cache.get_or_compute("key", compute))
+        second = asyncio.create_task(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(cancel_one()) == "result"
+    assert cache.get("key") == "result"
+
+
+def test_entries_expire_after_ttl(clock: SimpleNamespace) -> None:
+    cache = ToolResultCache(ttl=10)
+    cache.set("key", "result")
+
+    clock.now = 9.9
+    assert cache.get("key") == "result"
+    clock.now = 10.1
+    assert cache.get("key") is None
+    assert cache.stats["size"] == 0
+
+
+def test_entries_without_ttl_never_expire(clock: SimpleNamespace) -> None:
+    cache = ToolResultCache(ttl=None)
+    cache.set("key", "result")
+
+    clock.now = 1e9
+
+    assert cache.get("key") == "result"
+
+
+def test_least_recently_used_entry_is_evicted() -> None:
+    cache = ToolResultCache(max_size=2)
+    cache.set("a", "A")
+    cache.set("b", "B")
+    cache.get("a")
+
+    cache.set("c", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A"
+    assert cache.get("c") == "C"
+    assert cache.stats["evictions"] == 1
+    assert cache.stats["size"] == 2